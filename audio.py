@@ -0,0 +1,101 @@
+import pygame
+from config import *
+from resources import ResourceLoader
+
+
+class AudioManager:
+    """音效声部管理（进程级）
+
+    每个分组使用预留的混音器通道；同一音效在合并间隔内只播放一次；
+    所有分组同时发声的数量有上限，超出时抢占优先级更低的声音，否则丢弃。
+    """
+
+    _channels = None  # 分组 -> 预留的 Channel 列表
+    _voices = {}  # Channel -> (音效名, 优先级)
+    _last_played = {}  # 音效名 -> 上次播放的时间（毫秒）
+    _counters = {}  # 音效名 -> {'played', 'coalesced', 'dropped', 'preempted'}
+
+    @staticmethod
+    def _setup():
+        """设置通道数并按分组预留通道（Sound.play() 自动分配时不会占用这些通道）"""
+        pygame.mixer.set_num_channels(max(AUDIO_CHANNELS, sum(AUDIO_GROUPS.values())))
+        pygame.mixer.set_reserved(sum(AUDIO_GROUPS.values()))
+        AudioManager._channels = {}
+        index = 0
+        for group, count in AUDIO_GROUPS.items():
+            AudioManager._channels[group] = [pygame.mixer.Channel(index + i) for i in range(count)]
+            index += count
+
+    @staticmethod
+    def _count(name, counter):
+        counters = AudioManager._counters.get(name)
+        if counters is None:
+            counters = AudioManager._counters[name] = {'played': 0, 'coalesced': 0, 'dropped': 0, 'preempted': 0}
+        counters[counter] += 1
+
+    @staticmethod
+    def play(name, now=None):
+        """播放音效，返回是否真正播放；now 为当前时间（毫秒），默认取 pygame 计时"""
+        if not pygame.mixer.get_init():
+            return False  # 无头模式或混音器初始化失败
+        if AudioManager._channels is None:
+            AudioManager._setup()
+        group, priority, coalesce_ms = SOUND_SETTINGS.get(name, DEFAULT_SOUND_SETTINGS)
+        if now is None:
+            now = pygame.time.get_ticks()
+
+        # 合并间隔内的相同音效听不出区别，直接丢弃
+        last = AudioManager._last_played.get(name)
+        if last is not None and now - last < coalesce_ms:
+            AudioManager._count(name, 'coalesced')
+            return False
+
+        voices = AudioManager._voices
+        for channel in [channel for channel in voices if not channel.get_busy()]:
+            del voices[channel]
+
+        sound = ResourceLoader.load_sound(name)
+        if not isinstance(sound, pygame.mixer.Sound):
+            return False  # 音效文件加载失败
+
+        group_channels = AudioManager._channels[group]
+        channel = next((channel for channel in group_channels if channel not in voices), None)
+        if channel is None:
+            # 分组的通道都在用：抢占组内优先级最低的声音
+            victim = min(group_channels, key=lambda c: voices[c][1])
+        elif len(voices) >= AUDIO_VOICE_CAP:
+            # 达到全局上限：抢占所有分组中优先级最低的声音
+            victim = min(voices, key=lambda c: voices[c][1])
+        else:
+            victim = None
+        if victim is not None:
+            if voices[victim][1] >= priority:
+                AudioManager._count(name, 'dropped')
+                return False
+            AudioManager._count(voices.pop(victim)[0], 'preempted')
+            victim.stop()
+            if channel is None:
+                channel = victim
+
+        channel.play(sound)
+        voices[channel] = (name, priority)
+        AudioManager._last_played[name] = now
+        AudioManager._count(name, 'played')
+        return True
+
+    @staticmethod
+    def stats():
+        """返回各音效的播放/合并/丢弃/被抢占次数和合计"""
+        total = {'played': 0, 'coalesced': 0, 'dropped': 0, 'preempted': 0}
+        for counters in AudioManager._counters.values():
+            for key, value in counters.items():
+                total[key] += value
+        return {
+            'total': total,
+            'sounds': {name: dict(counters) for name, counters in AudioManager._counters.items()},
+            'voices': len(AudioManager._voices),
+        }
+
+    @staticmethod
+    def reset_stats():
+        AudioManager._counters.clear()
@@ -0,0 +1,258 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor
+
+# 汇总报告默认写到标准输出，不能让 pygame 的欢迎信息混进去（必须在导入 pygame 之前设置）
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from config import *
+from headless import HeadlessRunner
+
+
+ENEMY_TYPE_NAMES = {
+    ENEMY_NORMAL: 'normal',
+    ENEMY_FAST: 'fast',
+    ENEMY_ARMOR: 'armor',
+    ENEMY_TARGET: 'target',
+}
+
+DIRECTION_INPUTS = {UP: INPUT_UP, DOWN: INPUT_DOWN, LEFT: INPUT_LEFT, RIGHT: INPUT_RIGHT}
+
+
+class IdleBot:
+    """不操作的玩家（只看敌人能否独自攻破司令部）"""
+
+    def __init__(self, seed):
+        pass
+
+    def __call__(self, tick, scene):
+        return 0
+
+
+class HunterBot:
+    """简单的脚本玩家：向最近的敌人对齐，同一行/列时转向并开火，卡住时随机换方向并开火打砖
+
+    使用自己的随机数生成器（由对局种子决定），同一种子的对局结果可复现。
+    """
+
+    def __init__(self, seed):
+        self.rng = random.Random(seed)
+        self.last_position = None
+        self.stuck_ticks = 0
+        self.wander_ticks = 0
+        self.wander_direction = UP
+
+    def __call__(self, tick, scene):
+        player = scene.player
+        position = player.rect.topleft
+        if position == self.last_position:
+            self.stuck_ticks += 1
+        else:
+            self.stuck_ticks = 0
+        self.last_position = position
+
+        # 卡住时朝随机方向走一段，沿途开火打开通路
+        if self.stuck_ticks >= BOT_STUCK_TICKS:
+            self.stuck_ticks = 0
+            self.wander_ticks = BOT_WANDER_TICKS
+            self.wander_direction = self.rng.choice((UP, DOWN, LEFT, RIGHT))
+        if self.wander_ticks > 0:
+            self.wander_ticks -= 1
+            return DIRECTION_INPUTS[self.wander_direction] | INPUT_FIRE
+
+        if not scene.enemies:
+            return 0
+        px, py = player.rect.center
+        target = min(scene.enemies, key=lambda enemy: abs(enemy.rect.centerx - px) + abs(enemy.rect.centery - py))
+        dx = target.rect.centerx - px
+        dy = target.rect.centery - py
+        if abs(dx) <= BOT_ALIGN_TOLERANCE:
+            direction = DOWN if dy > 0 else UP
+        elif abs(dy) <= BOT_ALIGN_TOLERANCE:
+            direction = RIGHT if dx > 0 else LEFT
+        elif abs(dx) < abs(dy):
+            # 先沿偏差较小的轴对齐
+            return DIRECTION_INPUTS[RIGHT if dx > 0 else LEFT]
+        else:
+            return DIRECTION_INPUTS[DOWN if dy > 0 else UP]
+        # 已对齐：朝向目标后开火（开火在本帧移动之前，用的是上一帧的朝向）
+        mask = DIRECTION_INPUTS[direction]
+        if player.direction == direction:
+            mask |= INPUT_FIRE
+        return mask
+
+
+BOTS = {
+    'idle': IdleBot,
+    'hunter': HunterBot,
+}
+
+_runners = {}  # 工作进程内复用的模拟器：(关卡, 生成配置) -> HeadlessRunner
+
+
+def _runner_for(level, map_size, spawn_profile, seed):
+    """取得本进程的模拟器：固定关卡复用同一个场景原地重开，随机地图由种子决定只能每局新建"""
+    if map_size is not None:
+        return HeadlessRunner(level, seed=seed, map_size=map_size, spawn_profile=spawn_profile)
+    runner = _runners.get((level, spawn_profile))
+    if runner is None:
+        runner = _runners[(level, spawn_profile)] = HeadlessRunner(level, seed=seed, spawn_profile=spawn_profile)
+    else:
+        runner.scene.reset(seed)
+    return runner
+
+
+def play_match(seed, level=1, map_size=None, spawn_profile=None, bot='hunter', max_ticks=FPS * 600):
+    """在当前进程中无头模拟一局，返回精简的结果记录"""
+    runner = _runner_for(level, map_size, spawn_profile, seed)
+    stats = runner.run(max_ticks, BOTS[bot](seed))
+    scene = runner.scene
+    if scene.victory:
+        result = 'win'
+    elif scene.game_over:
+        result = scene.defeat_reason or 'loss'
+    else:
+        result = 'timeout'
+    return {
+        'seed': seed,
+        'result': result,
+        'ticks': stats['ticks'],
+        'seconds': stats['seconds'],
+        'kills': {ENEMY_TYPE_NAMES[enemy_type]: count for enemy_type, count in scene.kills_by_type.items()},
+        'spawned': scene.spawned_enemies,
+        'lives': scene.player.lives,
+        'fruits': scene.fruits_collected,
+    }
+
+
+def match_seeds(count, seed=None):
+    """由批次种子生成每局的种子（同一批次种子得到同样的对局序列）"""
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for _ in range(count)]
+
+
+def run_matches(seeds, jobs=None, on_record=None, **options):
+    """在进程池中并行模拟 seeds 中的每一局，结果按种子顺序逐条回传给 on_record，返回全部记录
+
+    jobs 为工作进程数（默认 CPU 核数），为 1 时直接在当前进程中运行。
+    """
+    play = partial(play_match, **options)
+    records = []
+    if jobs == 1:
+        results = map(play, seeds)
+        executor = None
+    else:
+        workers = jobs or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=workers)
+        # 每个任务包含多局，减少进程间通信的开销
+        results = executor.map(play, seeds, chunksize=max(1, min(BATCH_MAX_CHUNK, len(seeds) // (workers * 4))))
+    try:
+        for record in results:
+            records.append(record)
+            if on_record is not None:
+                on_record(record)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+    return records
+
+
+def _summary(values):
+    ordered = sorted(values)
+    count = len(ordered)
+    if not count:
+        return None
+    return {
+        'mean': sum(ordered) / count,
+        'p50': ordered[count // 2],
+        'p95': ordered[min(count - 1, int(0.95 * count))],
+        'max': ordered[-1],
+    }
+
+
+def aggregate(records, wall_seconds):
+    """汇总胜率、对局长度、各类型敌人的击毁数和模拟吞吐量"""
+    matches = len(records)
+    outcomes = {}
+    kills = dict.fromkeys(ENEMY_TYPE_NAMES.values(), 0)
+    for record in records:
+        outcomes[record['result']] = outcomes.get(record['result'], 0) + 1
+        for name, count in record['kills'].items():
+            kills[name] += count
+    total_ticks = sum(record['ticks'] for record in records)
+    sim_seconds = sum(record['seconds'] for record in records)
+
+    return {
+        'matches': matches,
+        'win_rate': outcomes.get('win', 0) / matches if matches else 0.0,
+        'outcomes': outcomes,
+        'match_ticks': _summary([record['ticks'] for record in records]),
+        'win_ticks': _summary([record['ticks'] for record in records if record['result'] == 'win']),
+        'kills': kills,
+        'kills_per_match': {name: count / matches for name, count in kills.items()} if matches else {},
+        'fruits_collected': sum(record['fruits'] for record in records),
+        'throughput': {
+            'total_ticks': total_ticks,
+            'wall_seconds': wall_seconds,
+            'ticks_per_second': total_ticks / wall_seconds if wall_seconds > 0 else 0.0,  # 所有进程合计
+            'worker_ticks_per_second': total_ticks / sim_seconds if sim_seconds > 0 else 0.0,  # 单个进程
+            'matches_per_second': matches / wall_seconds if wall_seconds > 0 else 0.0,
+        },
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TankWar 多进程批量对局（平衡性统计）")
+    parser.add_argument('--matches', type=int, default=100, help="对局数")
+    parser.add_argument('--jobs', type=int, default=None, help="工作进程数（默认 CPU 核数，1 表示不使用进程池）")
+    parser.add_argument('--seed', type=int, default=None, help="批次种子，决定每局的种子")
+    parser.add_argument('--bot', default='hunter', choices=sorted(BOTS), help="玩家脚本")
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--map-size', help="使用随机生成的地图，尺寸 列x行（如 128x128）")
+    parser.add_argument('--spawn-profile', default=DEFAULT_SPAWN_PROFILE, choices=sorted(SPAWN_PROFILES),
+                        help="敌人生成配置")
+    parser.add_argument('--max-ticks', type=int, default=FPS * 600, help="每局最多模拟的帧数（超出记为超时）")
+    parser.add_argument('--records', help="把每局的结果逐行写入 JSONL 文件")
+    parser.add_argument('--output', help="把汇总报告写入 JSON 文件（默认输出到标准输出）")
+    args = parser.parse_args(argv)
+
+    map_size = tuple(int(value) for value in args.map_size.lower().split('x')) if args.map_size else None
+    seeds = match_seeds(args.matches, args.seed)
+    records_file = open(args.records, 'w') if args.records else None
+    done = 0
+
+    def on_record(record):
+        nonlocal done
+        done += 1
+        if records_file is not None:
+            records_file.write(json.dumps(record, separators=(',', ':')) + '\n')
+        if done % BATCH_PROGRESS_INTERVAL == 0 or done == len(seeds):
+            print(f"已完成 {done}/{len(seeds)} 局", file=sys.stderr)
+
+    start = time.perf_counter()
+    try:
+        records = run_matches(seeds, args.jobs, on_record, level=args.level, map_size=map_size,
+                              spawn_profile=args.spawn_profile, bot=args.bot, max_ticks=args.max_ticks)
+    finally:
+        if records_file is not None:
+            records_file.close()
+    report = aggregate(records, time.perf_counter() - start)
+    report['params'] = {'seed': args.seed, 'bot': args.bot, 'level': args.level, 'map_size': map_size,
+                        'spawn_profile': args.spawn_profile, 'max_ticks': args.max_ticks}
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+# JSON 报告默认写到标准输出，不能让 pygame 的欢迎信息混进去（必须在导入 pygame 之前设置）
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import numpy as np
+from config import *
+from headless import init_headless, InputKeys
+from game_scene import GameScene
+from tanks import EnemyTank
+
+
+class Scenario:
+    """压力场景参数：敌人数量、常驻炮弹数量、被摧毁红砖比例、随机地图尺寸（为空时使用关卡 1）、玩家是否移动"""
+
+    def __init__(self, name, enemies=0, bullets=0, destroyed=0.0, seed=1, map_size=None, moving_player=False):
+        self.name = name
+        self.enemies = enemies
+        self.bullets = bullets
+        self.destroyed = destroyed
+        self.seed = seed
+        self.map_size = map_size
+        self.moving_player = moving_player
+
+    def params(self):
+        return {'enemies': self.enemies, 'bullets': self.bullets, 'destroyed': self.destroyed, 'seed': self.seed,
+                'map_size': self.map_size, 'moving_player': self.moving_player}
+
+
+DEFAULT_SCENARIOS = [
+    Scenario('baseline'),
+    Scenario('enemies_20', enemies=20),
+    Scenario('bullets_100', enemies=5, bullets=100),
+    Scenario('terrain_50pct', enemies=5, destroyed=0.5),
+    Scenario('stress', enemies=50, bullets=200, destroyed=0.3),
+    Scenario('large_map', enemies=50, bullets=200, map_size=(512, 512)),
+    # 玩家不断移动，追踪玩家的流场在大地图上持续重建
+    Scenario('large_map_moving_player', enemies=50, map_size=(512, 512), moving_player=True),
+]
+
+
+def _free_positions(scene, size, rng):
+    """找出不与阻挡地形重叠的位置（按格子对齐，随机顺序）"""
+    width = len(scene.map.matrix[0]) * TILE_SIZE
+    height = len(scene.map.matrix) * TILE_SIZE
+    fits = scene.map.free_cells(-(-size // TILE_SIZE))
+    # 整个矩形都在关卡地形范围内
+    fits[:, -(-(width - size) // TILE_SIZE):] = False
+    fits[-(-(height - size) // TILE_SIZE):, :] = False
+    positions = [(col * TILE_SIZE, row * TILE_SIZE) for row, col in np.argwhere(fits).tolist()]
+    rng.shuffle(positions)
+    return positions
+
+
+def build_scene(screen, scenario):
+    """按场景参数构建 GameScene"""
+    scene = GameScene(screen, seed=scenario.seed, map_size=scenario.map_size)
+    rng = random.Random(scenario.seed)
+    scene.total_enemies = 10 ** 9  # 压测期间不会胜利结束
+    scene.player.invincible = True
+    scene.player.invincible_timer = 10 ** 9
+
+    bricks = [(col, row) for row, col in np.argwhere(scene.map.tiles == TILE_BRICK).tolist()]
+    for col, row in rng.sample(bricks, int(len(bricks) * scenario.destroyed)):
+        scene.map.set_tile(col, row, TILE_EMPTY)
+
+    positions = _free_positions(scene, TANK_SIZE + 8, rng)
+    for i in range(min(scenario.enemies, len(positions))):
+        x, y = positions[i]
+        scene.add_enemy(EnemyTank(x, y, rng.choice((ENEMY_NORMAL, ENEMY_FAST, ENEMY_ARMOR, ENEMY_TARGET)), scene.rng,
+                                   scene.world))
+    scene.spawned_enemies = len(scene.enemies)
+    return scene, rng, _free_positions(scene, BULLET_SIZE, rng)
+
+
+def _top_up_bullets(scene, count, positions, rng):
+    """把场上炮弹补足到 count 颗（不计入计时）"""
+    owners = scene.enemies.sprites() or [scene.player]
+    for _ in range(count - scene.bullets.count):
+        x, y = rng.choice(positions)
+        scene.bullets.spawn(rng.choice(owners), x, y, rng.choice((UP, DOWN, LEFT, RIGHT)), TANK_LEVEL_1)
+
+
+def _percentiles(samples):
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def pick(fraction):
+        return ordered[min(count - 1, int(fraction * count))] * 1000.0
+
+    return {
+        'mean_ms': sum(ordered) / count * 1000.0,
+        'p50_ms': pick(0.50),
+        'p95_ms': pick(0.95),
+        'p99_ms': pick(0.99),
+        'max_ms': ordered[-1] * 1000.0,
+    }
+
+
+def run_scenario(screen, scenario, ticks, warmup=60):
+    """分别计时 update() 和 draw()，返回该场景的统计结果"""
+    scene, rng, bullet_positions = build_scene(screen, scenario)
+    update_times = []
+    draw_times = []
+    clock = time.perf_counter
+    keys = InputKeys() if scenario.moving_player else None
+    wander_rng = random.Random(scenario.seed)
+    last_position = None
+
+    for tick in range(warmup + ticks):
+        if scenario.bullets:
+            _top_up_bullets(scene, scenario.bullets, bullet_positions, rng)
+        if keys is not None:
+            # 玩家随机游走：每秒或被挡住时换一个方向
+            position = scene.player.rect.topleft
+            if tick % FPS == 0 or position == last_position:
+                keys.mask = wander_rng.choice((INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT))
+            last_position = position
+        # 炮弹打到司令部会结束游戏，压测中忽略
+        scene.game_over = False
+
+        start = clock()
+        scene.update(keys)
+        update_time = clock() - start
+        scene.game_over = False  # 不计入绘制游戏结束遮罩
+        start = clock()
+        scene.draw()
+        draw_time = clock() - start
+
+        if tick >= warmup:
+            update_times.append(update_time)
+            draw_times.append(draw_time)
+
+    return {
+        'params': scenario.params(),
+        'ticks': ticks,
+        'update': _percentiles(update_times),
+        'draw': _percentiles(draw_times),
+    }
+
+
+def run_benchmarks(scenarios=None, ticks=3000):
+    screen = init_headless()
+    results = {}
+    for scenario in scenarios or DEFAULT_SCENARIOS:
+        results[scenario.name] = run_scenario(screen, scenario, ticks)
+    return {'ticks': ticks, 'scenarios': results}
+
+
+def compare_to_baseline(results, baseline, threshold, metric='p95_ms'):
+    """与基线比较，返回超过阈值的退化项列表"""
+    regressions = []
+    for name, current in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        for phase in ('update', 'draw'):
+            old = previous[phase][metric]
+            new = current[phase][metric]
+            if old > 0 and new > old * (1 + threshold):
+                regressions.append(f"{name}.{phase}.{metric}: {old:.3f}ms -> {new:.3f}ms (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TankWar update()/draw() 场景基准测试")
+    parser.add_argument('--ticks', type=int, default=3000, help="每个场景计时的帧数")
+    parser.add_argument('--only', nargs='*', help="只运行指定名称的场景")
+    parser.add_argument('--scenario', action='append', default=[],
+                        help="自定义场景 name:敌人数:炮弹数:摧毁比例[:列x行]，可重复（给出尺寸时使用随机地图）")
+    parser.add_argument('--output', help="把 JSON 结果写入文件（默认输出到标准输出）")
+    parser.add_argument('--baseline', help="基线 JSON 文件，退化超过阈值时返回非零")
+    parser.add_argument('--threshold', type=float, default=0.2, help="允许的退化比例（默认 0.2 即 20%%）")
+    parser.add_argument('--metric', default='p95_ms', choices=('p50_ms', 'p95_ms', 'p99_ms'))
+    args = parser.parse_args(argv)
+
+    scenarios = list(DEFAULT_SCENARIOS)
+    for spec in args.scenario:
+        name, enemies, bullets, destroyed, *size = spec.split(':')
+        map_size = tuple(int(value) for value in size[0].lower().split('x')) if size else None
+        scenarios.append(Scenario(name, int(enemies), int(bullets), float(destroyed), map_size=map_size))
+    if args.only:
+        scenarios = [scenario for scenario in scenarios if scenario.name in args.only]
+
+    results = run_benchmarks(scenarios, args.ticks)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline, args.threshold, args.metric)
+        if regressions:
+            print("性能退化：", file=sys.stderr)
+            for line in regressions:
+                print("  " + line, file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
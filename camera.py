@@ -0,0 +1,78 @@
+import pygame
+from config import *
+from spatial import SpatialHash
+
+
+class Camera:
+    """跟随玩家的滚动镜头，viewport 是屏幕在世界坐标中对应的区域"""
+
+    def __init__(self, world_rect, size=(SCREEN_WIDTH, SCREEN_HEIGHT)):
+        self.world_rect = pygame.Rect(world_rect)
+        self.viewport = pygame.Rect((0, 0), size)
+        self.moved = True  # 上次绘制后视口是否移动过（移动后整屏都要重绘）
+
+    def follow(self, rect):
+        """让 rect 居中显示，视口不超出世界范围（世界比屏幕小时贴左上角）"""
+        world = self.world_rect
+        view = self.viewport
+        x = min(max(rect.centerx - view.width // 2, world.left), max(world.right - view.width, world.left))
+        y = min(max(rect.centery - view.height // 2, world.top), max(world.bottom - view.height, world.top))
+        if (x, y) != view.topleft:
+            view.topleft = (x, y)
+            self.moved = True
+
+    def apply(self, rect):
+        """世界坐标矩形 -> 屏幕坐标矩形"""
+        return rect.move(-self.viewport.x, -self.viewport.y)
+
+
+class CameraGroup(pygame.sprite.LayeredUpdates):
+    """按图层排序的精灵组，绘制时减去镜头偏移，只绘制视口内的精灵
+
+    组内精灵同时登记在空间索引中，绘制时按视口查询，不遍历整个组；
+    精灵移动后调用 reindex() 标记，索引在下次绘制时才更新（不绘制的无头模拟没有额外开销）。
+    与 Group.draw 一样用一次 Surface.blits 批量绘制。
+    """
+
+    def __init__(self, *sprites, **kwargs):
+        self.index = SpatialHash()  # 世界坐标空间索引
+        self._order = {}  # 精灵 -> (图层, 加入序号)，与 sprites() 的绘制顺序一致
+        self._added = 0
+        self._stale = set()  # 移动后还没更新索引的精灵
+        super().__init__(*sprites, **kwargs)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self._added += 1
+        self._order[sprite] = (self._spritelayers[sprite], self._added)
+        self.index.insert(sprite, sprite.rect)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        del self._order[sprite]
+        self._stale.discard(sprite)
+        self.index.remove(sprite)
+
+    def reindex(self, sprites):
+        """标记位置变化过的精灵，绘制前统一更新空间索引"""
+        self._stale.update(sprites)
+
+    def _flush_index(self):
+        move = self.index.move
+        for sprite in self._stale:
+            move(sprite, sprite.rect)  # 覆盖的桶不变时不做任何事
+        self._stale.clear()
+
+    def draw(self, surface, view=None):
+        """绘制与 view（世界坐标，默认为屏幕区域）相交的精灵，返回绘制区域列表（屏幕坐标）"""
+        if view is None:
+            view = surface.get_rect()
+        visible = view.colliderect
+        offset = (-view.x, -view.y)
+        if self._stale:
+            self._flush_index()
+        sprites = sorted((sprite for sprite in self.index.query(view) if visible(sprite.rect)),
+                         key=self._order.__getitem__)
+        rects = surface.blits([(sprite.image, sprite.rect.move(offset)) for sprite in sprites])
+        self.spritedict.update(zip(sprites, rects))
+        return rects
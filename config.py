@@ -6,6 +6,7 @@ import os
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 FPS = 60
+DIRTY_RECT_RENDERING = False  # 脏矩形渲染：只把场景报告的变化区域推送到屏幕
 
 # 颜色定义
 WHITE = (255, 255, 255)
@@ -14,6 +15,7 @@ GREEN = (0, 255, 0)
 RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 YELLOW = (255, 255, 0)
+FOREST_LAYER_COLORKEY = (255, 0, 255)  # 森林覆盖层的透明色
 
 # 地图元素类型
 TILE_EMPTY = 0   # 空地
@@ -30,11 +32,18 @@ TILE_SIZE = 30  # 每个地图格子的像素大小
 TANK_SIZE = 40
 PLAYER_SPEED = 5
 ENEMY_SPEED = 2
+ENTITY_POOL_SIZE = 32  # 坦克实体存储（World）初始槽位数（不够时自动翻倍）
+ENTITY_BATCH_MIN = 24  # 敌人少于这个数量时逐个更新（批量运算的固定开销更大），结果相同
 
 # 炮弹设置
 BULLET_SIZE = 10
 BULLET_SPEED = 8
 BULLET_DAMAGE = 1
+BULLET_POOL_SIZE = 32  # 炮弹引擎初始槽位数（不够时自动翻倍）
+
+# 阵营
+TEAM_PLAYER = 0
+TEAM_ENEMY = 1
 
 # 游戏元素设置
 BRICK_HP = 1
@@ -78,14 +87,118 @@ GAME_PLAYING = 1
 GAME_OVER = 2
 GAME_WIN = 3
 
-# 计算最大行列数（向下取整）
-MAX_COLS = SCREEN_WIDTH // TILE_SIZE
-MAX_ROWS = SCREEN_HEIGHT // TILE_SIZE
-
 UP = 0
 DOWN = 1
 LEFT = 2
 RIGHT = 3
 
+# 玩家输入位掩码（无头模式/回放使用）
+INPUT_UP = 1
+INPUT_DOWN = 2
+INPUT_LEFT = 4
+INPUT_RIGHT = 8
+INPUT_FIRE = 16
+
+# 方向键与输入位的对应关系（开火由 KEYDOWN 事件产生，不在此表中）
+INPUT_KEY_MAP = {
+    pygame.K_UP: INPUT_UP,
+    pygame.K_DOWN: INPUT_DOWN,
+    pygame.K_LEFT: INPUT_LEFT,
+    pygame.K_RIGHT: INPUT_RIGHT,
+}
+
+# 批量对局（batch.py）与脚本玩家
+BATCH_MAX_CHUNK = 16  # 每次分派给工作进程的最多对局数
+BATCH_PROGRESS_INTERVAL = 50  # 每完成多少局输出一次进度
+BOT_ALIGN_TOLERANCE = 8  # 与敌人中心的偏差在此范围内（像素）视为同一行/列
+BOT_STUCK_TICKS = 30  # 脚本玩家原地不动多少帧后随机换方向
+BOT_WANDER_TICKS = 45  # 随机换方向后保持的帧数
+
+# 关卡文件
+LEVEL_DIR = './levels'  # 关卡文本 level_<编号>.txt
+LEVEL_CACHE_DIR = './levels/cache'  # 编译后的二进制关卡缓存
+
+# 后台资源预加载（按进入游戏时用到的先后排列）
+PRELOAD_IMAGES = (
+    ['brick.png', 'iron.png', 'river.png', 'forest.png', 'home.png', 'home_destroyed.png']
+    + [f"tank_L{level}_{direction}.png" for level in (1, 2, 3) for direction in (1, 2, 3, 4)]
+    + [f"enemy_{enemy_type}_{direction}.png"
+       for enemy_type in (ENEMY_NORMAL, ENEMY_FAST, ENEMY_ARMOR, ENEMY_TARGET) for direction in (1, 2, 3, 4)]
+    + ['bullet_up.png', 'bullet_down.png', 'bullet_left.png', 'bullet_right.png']
+    + ['food_star.png', 'food_tank.png', 'food_gun.png', 'food_shell.png']
+)
+PRELOAD_SOUNDS = ['bang.wav', 'hit.wav']
+
+# 音效通道管理
+AUDIO_CHANNELS = 16  # 混音器通道总数
+AUDIO_VOICE_CAP = 6  # 所有分组同时播放的音效上限
+AUDIO_GROUPS = {  # 分组 -> 预留通道数
+    'explosion': 2,
+    'impact': 3,
+}
+SOUND_SETTINGS = {  # 音效 -> (分组, 优先级（越大越重要）, 合并间隔（毫秒）)
+    'hit.wav': ('explosion', 2, 60),
+    'blast.wav': ('explosion', 2, 60),
+    'bang.wav': ('impact', 1, 80),
+}
+DEFAULT_SOUND_SETTINGS = ('impact', 0, 100)
+
+# 精灵绘制图层（数值大的画在上面）
+LAYER_FRUIT = 0
+LAYER_TANK = 1
+
+# 文字渲染缓存
+TEXT_CACHE_SIZE = 256  # 缓存的文字表面数量上限
+GAME_OVER_OVERLAY_COLOR = (0, 0, 0, 180)  # 游戏结束半透明遮罩
+
+# 滚动镜头与视口裁剪
+TERRAIN_CHUNK_TILES = 16  # 地形预渲染区块的边长（格）
+TERRAIN_CHUNK_CACHE = 32  # 最多保留的已渲染区块数
+SPATIAL_CELL_SIZE = 128  # 坦克/果实空间索引的桶大小（像素）
+
+# 随机地图生成
+MAPGEN_MIN_SIZE = 16  # 生成地图的最小行/列数
+MAPGEN_NOISE_SCALE = 12  # 河流/森林区域噪声的格子尺度
+MAPGEN_RIVER_FRACTION = 0.10  # 河流约占的面积比例
+MAPGEN_FOREST_FRACTION = 0.15  # 森林约占的面积比例
+MAPGEN_BRICK_DENSITY = 0.22  # 其余空地中红砖块（2x2 格）的比例
+MAPGEN_IRON_DENSITY = 0.03  # 其余空地中铁墙块（2x2 格）的比例
+MAPGEN_SPAWN_SPACING = 32  # 顶部敌人出生点的间隔（格），至少 3 个
+MAPGEN_MAX_SEGMENT = 16  # 出生点到司令部通道每段的最大长度（格）
+
+# 回放录制
+RECORD_REPLAYS = False  # 每局结束后把回放保存到 REPLAY_DIR
+REPLAY_DIR = './replays'
+
+# 性能分析
+PROFILING = False  # 启动时即开启逐帧分阶段计时（F3 可随时打开/关闭叠加层）
+PROFILE_EXPORT_PATH = None  # 退出时导出计时记录的路径（.csv 或 .jsonl）
+PROFILER_BUFFER_FRAMES = 3600  # 环形缓冲区保存的帧数
+PROFILER_OVERLAY_WINDOW = 60  # 叠加层平均耗时统计的帧数
+PROFILER_HISTOGRAM_BUCKET_MS = 2  # 帧耗时直方图每个桶的宽度（毫秒）
+PROFILER_HISTOGRAM_BUCKETS = 20
+PROFILER_OVERLAY_SIZE = (220, 260)
+
+# 敌人寻路（流场）
+FLOW_BRICK_COST = 4  # 正前方（炮弹能打到）的红砖额外代价：先开炮再前进
+FLOW_SIDE_BRICK_COST = 12  # 炮弹打不到的那一格红砖额外代价
+FLOW_PLAYER_REFRESH_TICKS = 15  # 追踪玩家的流场最多每隔多少帧重建一次
+FLOW_BUILD_STEPS_PER_TICK = 1024  # 分帧重建流场时每帧最多处理的格点数
+ENEMY_HUNTER_TYPES = (ENEMY_FAST,)  # 追踪玩家的敌人类型，其余敌人进攻司令部
+ENEMY_STUCK_TICKS = 45  # 沿流场前进时被卡住多少帧后随机绕行
+ENEMY_FIRE_CHANCE = 0.01  # 敌人每帧随机开炮的概率
+
+# 敌人生成配置（GameScene 的 spawn_profile 参数）：
+#   total_enemies 需要消灭的敌人总数，max_alive 场上同时存在的敌人上限，spawn_interval 生成间隔（毫秒），
+#   spawn_points 出生点：None 使用地图预设的出生点，数字表示从能到达司令部的空地中随机选出的数量
+SPAWN_PROFILES = {
+    'classic': {'total_enemies': 20, 'max_alive': 5, 'spawn_interval': 1500, 'spawn_points': None},
+    'stress': {'total_enemies': 2000, 'max_alive': 200, 'spawn_interval': 50, 'spawn_points': 64},
+}
+DEFAULT_SPAWN_PROFILE = 'classic'
+SPAWN_CLEARANCE = 8  # 随机出生点与玩家出生点、司令部的最小距离（格）
+PATH_CACHE_SIZE = 256  # A* 路径 LRU 缓存条数
+PATH_QUERIES_PER_FRAME = 4  # 每帧最多执行的 A* 搜索次数，超出的推迟到下一帧
+
 # 无敌时间（毫秒）
 INVINCIBLE_TIME = 180  # 约3秒（假设60FPS）
\ No newline at end of file
@@ -0,0 +1,149 @@
+import numpy as np
+import pygame
+from config import *
+
+
+# 组件 -> 字段及类型。每个字段是一个按实体槽位下标的数组，系统对整个数组批量运算；
+# 坦克等对象只是持有 (world, slot) 的视图，属性读写直接落在这些数组上。
+COMPONENTS = {
+    'position': (('x', np.float64), ('y', np.float64)),
+    'size': (('width', np.int32), ('height', np.int32)),
+    'velocity': (('dx', np.float64), ('dy', np.float64), ('speed', np.float64)),
+    'health': (('health', np.int32), ('max_health', np.int32)),
+    'weapon': (('level', np.int8), ('direction', np.int8)),
+    'ai': (('move_timer', np.int32), ('move_interval', np.int32), ('stuck_ticks', np.int32),
+           ('detour_timer', np.int32), ('breaching', bool),
+           ('waypoint_x', np.float64), ('waypoint_y', np.float64),  # 没有目标格点时为 NaN
+           ('last_x', np.float64), ('last_y', np.float64)),  # 上一帧的位置（卡住检测），没有时为 NaN
+}
+NAN_FIELDS = ('waypoint_x', 'waypoint_y', 'last_x', 'last_y')  # 新实体中初始化为 NaN 的字段
+FIELDS = {name: dtype for fields in COMPONENTS.values() for name, dtype in fields}
+
+
+def round_coords(values):
+    """与 pygame.Rect 坐标赋值相同的取整方式（四舍五入，.5 远离 0）"""
+    return np.trunc(values + np.copysign(0.5, values)).astype(np.int64)
+
+
+class Field:
+    """实体视图上的属性：读写所属 World 中同名字段数组的一个元素"""
+
+    __slots__ = ('name',)
+
+    def __init__(self):
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, view, owner=None):
+        if view is None:
+            return self
+        return view.fields[self.name].item(view.slot)  # item() 直接返回 Python 数值
+
+    def __set__(self, view, value):
+        view.fields[self.name][view.slot] = value
+
+
+class World:
+    """实体-组件存储：所有组件字段以结构数组形式保存，实体就是一个槽位
+
+    与 BulletEngine 一样用空闲槽位栈分配实体，容量不足时成倍扩容；
+    销毁的槽位归还后会被新实体复用，视图对象在实体销毁后不应再使用。
+    """
+
+    def __init__(self, capacity=ENTITY_POOL_SIZE):
+        self.capacity = 0
+        self.fields = {name: np.zeros(0, dtype=dtype) for name, dtype in FIELDS.items()}
+        self.alive = np.zeros(0, dtype=bool)
+        self.free = []  # 空闲槽位
+        self.count = 0  # 存活实体数
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        """扩容到 capacity 个槽位"""
+        extra = capacity - self.capacity
+        for name, array in self.fields.items():
+            self.fields[name] = np.concatenate((array, np.zeros(extra, dtype=array.dtype)))
+        self.alive = np.concatenate((self.alive, np.zeros(extra, dtype=bool)))
+        # 倒序压栈，优先使用小槽位
+        self.free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def spawn(self):
+        """分配一个实体，所有字段清零，返回槽位"""
+        if not self.free:
+            self._grow(max(self.capacity * 2, 1))
+        slot = self.free.pop()
+        for array in self.fields.values():
+            array[slot] = 0
+        for name in NAN_FIELDS:
+            self.fields[name][slot] = np.nan
+        self.alive[slot] = True
+        self.count += 1
+        return slot
+
+    def destroy(self, slot):
+        """销毁实体并归还槽位"""
+        if not self.alive[slot]:
+            return
+        self.alive[slot] = False
+        self.free.append(slot)
+        self.count -= 1
+
+    def clear(self):
+        """销毁所有实体，槽位恢复到新建时的分配顺序（重开一局时复用）"""
+        self.alive[:] = False
+        self.free = list(range(self.capacity - 1, -1, -1))
+        self.count = 0
+
+    def move(self, slots, game_map):
+        """移动系统：slots 中的实体按速度试探移动，碰到阻挡坦克的地形时原地不动并清零速度
+
+        试探位置与逐个移动 Rect 时一致：取整后的当前位置加上速度再取整。
+        返回每个实体是否移动成功的掩码，移动成功的实体由调用方同步 rect。
+        """
+        if not slots.size:
+            return np.zeros(0, dtype=bool)
+        fields = self.fields
+        x = fields['x'][slots]
+        y = fields['y'][slots]
+        dx = fields['dx'][slots]
+        dy = fields['dy'][slots]
+        left = round_coords(round_coords(x) + dx)
+        top = round_coords(round_coords(y) + dy)
+        blocked = game_map.rects_block_tank(left, top, fields['width'][slots], fields['height'][slots])
+
+        moved = ~blocked
+        fields['x'][slots[moved]] = x[moved] + dx[moved]
+        fields['y'][slots[moved]] = y[moved] + dy[moved]
+        fields['dx'][slots[blocked]] = 0
+        fields['dy'][slots[blocked]] = 0
+        return moved
+
+
+class EntityView(pygame.sprite.Sprite):
+    """实体视图基类：状态都在 World 的数组中，精灵对象只保存 world/slot、图片和 rect
+
+    rect 是位置组件的取整副本（供精灵组绘制和碰撞使用），位置变化后调用 sync_rect() 同步。
+    """
+
+    x = Field()
+    y = Field()
+    width = Field()
+    height = Field()
+
+    def __init__(self, world=None):
+        super().__init__()
+        self.world = world if world is not None else World(1)  # 单独创建（不在场景中）时使用自己的存储
+        self.fields = self.world.fields  # 扩容时字典中的数组会被替换，字典本身不变
+        self.slot = self.world.spawn()
+
+    def sync_rect(self):
+        """把位置组件同步到 rect（Rect 坐标赋值会四舍五入）"""
+        self.rect.topleft = (self.x, self.y)
+
+    def release(self):
+        """销毁实体（移出所有精灵组并归还槽位）"""
+        self.kill()
+        self.world.destroy(self.slot)
@@ -1,5 +1,6 @@
 import pygame
 from config import *
+from hud import TextCache
 
 
 class EndScene:
@@ -35,26 +36,28 @@ class EndScene:
             self.restart_button.width = 250  # 鼠标悬停时稍微放大按钮
 
     def draw(self):
-        """绘制场景"""
+        """绘制场景，返回本帧变化的区域（只有重新开始按钮会因悬停改变）"""
         self.screen.fill(BLACK)
 
         # 绘制结果
         if self.victory:
-            result = self.title_font.render("win!", True, GREEN)
+            result = TextCache.render(self.title_font, "win!", GREEN)
         else:
-            result = self.title_font.render("lose!", True, RED)
+            result = TextCache.render(self.title_font, "lose!", RED)
 
         result_rect = result.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4))
         self.screen.blit(result, result_rect)
 
         # 绘制重新开始按钮
         pygame.draw.rect(self.screen, BLUE, self.restart_button)
-        restart_text = self.font.render("back", True, WHITE)
+        restart_text = TextCache.render(self.font, "back", WHITE)
         restart_text_rect = restart_text.get_rect(center=self.restart_button.center)
         self.screen.blit(restart_text, restart_text_rect)
 
         # 绘制退出按钮
         pygame.draw.rect(self.screen, RED, self.quit_button)
-        quit_text = self.font.render("exit", True, WHITE)
+        quit_text = TextCache.render(self.font, "exit", WHITE)
         quit_text_rect = quit_text.get_rect(center=self.quit_button.center)
-        self.screen.blit(quit_text, quit_text_rect)
\ No newline at end of file
+        self.screen.blit(quit_text, quit_text_rect)
+
+        return [self.restart_button.copy()]
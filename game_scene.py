@@ -1,50 +1,145 @@
 import pygame
 import random
+from itertools import compress
+
+import numpy as np
 from config import *
 from map import GameMap
-from tanks import PlayerTank, EnemyTank
-from projectiles import Bullet
-from structures import Brick, Iron, River, Forest, Headquarters
+from mapgen import generate_level, player_cell, spawn_cells
+from camera import Camera, CameraGroup
+from ecs import World
+from hud import TextCache, HudLabel
+from tanks import PlayerTank, EnemyTank, update_enemies
+from projectiles import BulletEngine
+from pathfinding import FlowField, PathService, FOOTPRINT, UNREACHABLE
 from items import Fruit, create_random_fruit
+from replay import ReplayRecorder, input_mask
 
 
 class GameScene:
     """游戏主场景"""
-    def __init__(self, screen, level=1):
+    def __init__(self, screen, level=1, seed=None, record=False, map_size=None, spawn_profile=None):
         self.screen = screen
-        self.map = GameMap(level)
+        self.level = level
+        self.record = record  # 是否录制回放
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self.map_seed = self.seed  # 随机地图和随机出生点使用创建场景时的种子，重开一局时不变
+        self.map_size = map_size
+        if map_size is None:
+            self.map = GameMap(level)
+            player_start = (SCREEN_WIDTH // 2, SCREEN_HEIGHT - 200)
+            # 敌人生成位置（示例位置，可自定义）
+            self.spawn_positions = [
+                (50, 50),
+                (SCREEN_WIDTH // 2 - 20, 50),
+                (SCREEN_WIDTH - 100, 50),
+                (50, SCREEN_HEIGHT - 100),
+                (SCREEN_WIDTH - 100, SCREEN_HEIGHT - 100)
+            ]
+        else:
+            # 按对局种子随机生成 map_size=(列, 行) 的地图，出生点保证能到达司令部
+            cols, rows = map_size
+            self.map = GameMap(level, generate_level(cols, rows, self.seed))
+            player_start = tuple(value * TILE_SIZE for value in player_cell(cols, rows))
+            self.spawn_positions = [(col * TILE_SIZE, row * TILE_SIZE) for col, row in spawn_cells(cols, rows)]
         self.headquarters = self.map.headquarters
-        self.player = PlayerTank(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 200)
-        self.enemies = []
-        self.fruits = []
-        self.bullets = []
+        self.bullets = BulletEngine(self.map, self.map.world_rect)  # 场上所有炮弹（结构数组，批量更新）
+        self.player_start = player_start
+        self.world = World()  # 坦克的组件数组（位置、速度、生命值、AI 状态），移动由系统批量处理
+        self.player = PlayerTank(*player_start, world=self.world)
+        self.player.bullet_engine = self.bullets
+        # 敌人寻路流场（所有敌人共享）：进攻司令部 / 追踪玩家
+        self.headquarters_field = FlowField(self.map, self.headquarters.rect)
+        self.player_field = FlowField(self.map, self.player.rect)
+        self.paths = PathService(self.map)  # 单独目标的 A* 寻路（带缓存和每帧预算）
+        # 敌人数量、同时在场上限、生成间隔和出生点由生成配置决定（名称或配置字典）
+        if spawn_profile is None or isinstance(spawn_profile, str):
+            self.spawn_profile_name = spawn_profile or DEFAULT_SPAWN_PROFILE
+            spawn_profile = SPAWN_PROFILES[self.spawn_profile_name]
+        elif record:
+            raise ValueError("录制回放时生成配置必须是 SPAWN_PROFILES 中的名称")
+        else:
+            self.spawn_profile_name = None  # 自定义配置字典
+        self.spawn_profile = spawn_profile
+        if spawn_profile['spawn_points'] is not None:
+            self.spawn_positions = self._random_spawn_positions(spawn_profile['spawn_points'])
+        self.camera = Camera(self.map.world_rect)  # 跟随玩家的镜头，只绘制视口内的内容
+        # 敌人和果实放在精灵组中：碰撞用 spritecollide/groupcollide，kill() 同时移出所有组
+        self.enemies = pygame.sprite.Group()
+        self.fruits = pygame.sprite.Group()
+        self.entities = CameraGroup()  # 场上所有坦克和果实，按图层批量绘制
+        self.entities.add(self.player, layer=LAYER_TANK)
         self.explosions = []
+        self.total_enemies = spawn_profile['total_enemies']
+        self.max_alive_enemies = spawn_profile['max_alive']
+        self.font = pygame.font.SysFont(None, 36)
+        self.title_font = pygame.font.SysFont(None, 72)
+        # 界面文字只在数值变化时重新取缓存的文字表面
+        self.hud_labels = {
+            'lives': HudLabel(self.font, "Life: {}", RED, (10, 10)),
+            'health': HudLabel(self.font, "tolerance: {}", RED, (10, 40)),
+            'destroyed': HudLabel(self.font, "destroyed: {}/{}", WHITE, (10, 70)),
+            'level': HudLabel(self.font, "level: {}", WHITE, (10, 100)),
+        }
+        self._game_over_overlay = None  # 游戏结束遮罩（第一次用到时创建，之后复用）
+        self.spawn_interval = spawn_profile['spawn_interval']  # 生成间隔（毫秒）
+        self.spawn_interval_ticks = self.spawn_interval * FPS // 1000  # 生成间隔（帧）
+        self.profiler = None  # 分阶段计时器，为空时不计时
+        self._start_match(self.seed)
+
+    def _start_match(self, seed):
+        """初始化一局的计数和状态（新建场景和重开时共用）"""
+        # 每局独立的随机数生成器，相同种子+相同输入可以完全复现一局
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.recorder = None
+        if self.record:
+            self.recorder = ReplayRecorder(seed, self.level, self.map_size, self.map_seed, self.spawn_profile_name)
+        self._fire_pressed = False  # 本帧是否按下开火（录制回放用）
         self.enemies_destroyed = 0
-        self.total_enemies = 20
         self.spawned_enemies = 0
+        self.kills_by_type = {}  # 敌人类型 -> 被摧毁数量（批量对局统计用）
+        self.fruits_collected = 0  # 玩家吃到的果实
+        self.defeat_reason = None  # 失败原因：'headquarters' / 'lives'
         self.last_spawn_time = 0
+        self.ticks = 0  # 已模拟的逻辑帧数（所有计时都以帧为单位，与真实时间无关）
         self.game_over = False
         self.victory = False
-        self.font = pygame.font.SysFont(None, 36)
-        self.title_font = pygame.font.SysFont(None, 72)
         self.non_target_counter = 0  # 连续非目标坦克计数器
-        self.spawn_interval = 1500  # 生成间隔（毫秒）
+        self._last_dirty_rects = []  # 上一帧绘制过的动态区域（脏矩形模式用）
+
+    def reset(self, seed=None):
+        """原地重开一局：复用地图、流场、炮弹池和已加载的图片，只恢复初始状态
+
+        随机生成的地图保持不变（地图由创建场景时的种子决定）。
+        """
+        self.bullets.clear()
+        self.enemies.empty()
+        self.fruits.empty()
+        self.entities.empty()
+        self.explosions.clear()
+
+        self.map.reset()
+        self.headquarters = self.map.headquarters
+        self.world.clear()
+        self.player = PlayerTank(*self.player_start, world=self.world)
+        self.player.bullet_engine = self.bullets
+        self.entities.add(self.player, layer=LAYER_TANK)
+        self.headquarters_field.reset_terrain()
+        self.player_field.reset_terrain()
+        self.player_field.set_target(self.player.rect)
+        self.paths.clear()
+        self.camera.moved = True
+        self._start_match(seed if seed is not None else random.getrandbits(32))
 
     def _spawn_enemy(self):
         """生成敌人（带数量限制和目标坦克规则）"""
-        # 总敌人未达上限，且当前存活敌人少于5辆
-        if self.enemies_destroyed < self.total_enemies and len(self.enemies) < 5:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.last_spawn_time > self.spawn_interval:
-                # 随机选择生成位置（示例位置，可自定义）
-                spawn_positions = [
-                    (50, 50),
-                    (SCREEN_WIDTH // 2 - 20, 50),
-                    (SCREEN_WIDTH - 100, 50),
-                    (50, SCREEN_HEIGHT - 100),
-                    (SCREEN_WIDTH - 100, SCREEN_HEIGHT - 100)
-                ]
-                pos = random.choice(spawn_positions)
+        # 已生成的敌人未达总数，且当前存活敌人少于同时在场上限
+        if self.spawned_enemies < self.total_enemies and len(self.enemies) < self.max_alive_enemies:
+            current_time = self.ticks
+            if current_time - self.last_spawn_time > self.spawn_interval_ticks:
+                # 随机选择生成位置
+                pos = self.rng.choice(self.spawn_positions)
 
                 # 检查是否需要强制生成目标坦克
                 if self.non_target_counter >= 3:
@@ -54,255 +149,294 @@ class GameScene:
                     # 随机生成非目标坦克（普通/快速/装甲）或目标坦克（概率可调整）
                     # 非目标类型占比75%，目标类型占比25%（可通过权重调整）
                     possible_types = [ENEMY_NORMAL, ENEMY_FAST, ENEMY_ARMOR] * 3 + [ENEMY_TARGET]
-                    enemy_type = random.choice(possible_types)
+                    enemy_type = self.rng.choice(possible_types)
                     if enemy_type != ENEMY_TARGET:
                         self.non_target_counter += 1
                     else:
                         self.non_target_counter = 0  # 生成目标坦克后重置计数器
 
                 # 创建敌人并添加到列表
-                enemy = EnemyTank(pos[0], pos[1], enemy_type)
-                self.enemies.append(enemy)
+                self.add_enemy(EnemyTank(pos[0], pos[1], enemy_type, self.rng, self.world))
+                self.spawned_enemies += 1
                 self.last_spawn_time = current_time
 
+    def _random_spawn_positions(self, count):
+        """从能到达司令部的空地中随机选出 count 个出生点（像素坐标）
+
+        坦克停在格点上覆盖 FOOTPRINT x FOOTPRINT 格，这些格子都不能阻挡坦克；
+        离玩家出生点和司令部太近的格点不选。按创建场景时的种子选取，重开一局时不变（与随机地图一致）。
+        """
+        rows, cols = self.map.tank_blocking.shape
+        reachable = np.array(self.headquarters_field.distance).reshape(rows, cols) < UNREACHABLE
+        candidates = self.map.free_cells(FOOTPRINT) & reachable
+
+        row_index, col_index = np.indices((rows, cols))
+        for rect in (self.player.rect, self.headquarters.rect):
+            near = ((np.abs(col_index - rect.x // TILE_SIZE) < SPAWN_CLEARANCE) &
+                    (np.abs(row_index - rect.y // TILE_SIZE) < SPAWN_CLEARANCE))
+            candidates &= ~near
+
+        cells = np.argwhere(candidates)
+        if not cells.size:
+            return self.spawn_positions  # 没有合适的空地时退回地图预设的出生点
+        rng = np.random.default_rng(self.seed)
+        chosen = np.sort(rng.choice(len(cells), size=min(count, len(cells)), replace=False))
+        return [(int(col) * TILE_SIZE, int(row) * TILE_SIZE) for row, col in cells[chosen]]
+
+    def add_enemy(self, enemy):
+        """把敌人加入场景"""
+        enemy.bullet_engine = self.bullets
+        if enemy.enemy_type in ENEMY_HUNTER_TYPES:
+            enemy.flow_field = self.player_field
+        else:
+            enemy.flow_field = self.headquarters_field
+        enemy.path_service = self.paths
+        self.enemies.add(enemy)
+        self.entities.add(enemy, layer=LAYER_TANK)
+
     def handle_event(self, event):
         """处理事件，包括射击"""
         if event.type == pygame.QUIT:
             return None
         elif event.type == pygame.KEYDOWN:
             if event.key == pygame.K_SPACE:
-                self.player.shoot()  # 调用 shoot() 方法，内部已处理数量限制
+                self.fire()
 
         return GAME_PLAYING if not self.game_over else GAME_OVER
 
-    def update(self):
+    def fire(self):
+        """玩家开火（对应一次空格键按下）"""
+        self._fire_pressed = True
+        self.player.shoot()  # 调用 shoot() 方法，内部已处理数量限制
+
+    def update(self, keys=None):
+        """推进一个逻辑帧；keys 为按键状态，为空时读取键盘"""
         if self.game_over:
             return
 
-        self._spawn_enemy()
-        # 更新玩家
-        if not self.game_over:
-            self.player.handle_input()  # 处理输入并设置移动量
-            if not self._check_tank_map_collision(self.player):
-                self.player.apply_movement()  # 直接应用移动量
-
-        # 更新敌人（敌人的移动逻辑在 EnemyTank.update() 中）
-        for enemy in self.enemies[:]:
-            enemy.update()  # 敌人AI逻辑
-            if not self._check_tank_map_collision(enemy):
-                enemy.image = enemy.images[enemy.direction]
-                enemy.apply_movement()
-            else:
-                enemy.dy = 0
-                enemy.dx = 0
-
-
-
-        # 更新敌人炮弹
-        for enemy in self.enemies[:]:
-            bullets_to_remove = []
-            for bullet in enemy.bullets:
-                if not bullet.update():
-                    bullets_to_remove.append(bullet)
-                    continue
-
-                # 检查与地图元素的碰撞
-                hit_structure = None
-                for structure in self.map.structures:
-                    if pygame.sprite.collide_rect(bullet, structure):
-                        hit_structure = structure
-                        break
-                #检查与司令部的碰撞
-                if pygame.sprite.collide_rect(bullet, self.headquarters):
-                    self.game_over  = True
-                if hit_structure:
-                    # 炮弹可以穿过森林和河流，不处理碰撞
-                    if isinstance(hit_structure, Forest) or isinstance(hit_structure, River):
-                        continue
-
-                    enemy.bullets.remove(bullet)
-                    if isinstance(hit_structure, Brick):
-                        if hit_structure.hit(bullet.damage):
-                            self.map.structures.remove(hit_structure)
-                    elif isinstance(hit_structure, Iron):
-                        pass  # 铁墙阻挡但不摧毁
-                    elif isinstance(hit_structure, Headquarters):
-                        if hit_structure.hit(bullet.damage):
-                            self.game_over = True
-                    continue  # 跳过后续碰撞检测
-
-                # 检查与玩家的碰撞
-                if pygame.sprite.collide_rect(bullet, self.player):
-                    enemy.bullets.remove(bullet)
-                    if self.player.hit(bullet.damage):
-                        if self.player.lives > 0:
-                            self.player.lives -= 1
-                            self.player.reset()
-                        else:
-                            self.game_over = True
-
-        # 更新玩家炮弹
-        bullets_to_remove = []
-        for bullet in self.player.bullets:
-            if not bullet.update():
-                bullets_to_remove.append(bullet)
-                continue
-
-            # 检查与地图元素的碰撞
-            hit_structure = None
-            for structure in self.map.structures:
-                if pygame.sprite.collide_rect(bullet, structure):
-                    hit_structure = structure
-                    break
-            #  检查与司令部的碰撞
-            if pygame.sprite.collide_rect(bullet, self.headquarters):
-                self.game_over = True
-            if hit_structure:
-                # 炮弹可以穿过森林和河流，不处理碰撞
-                if isinstance(hit_structure, Forest) or isinstance(hit_structure, River):
-                    continue
-                bullets_to_remove.append(bullet)  # 标记为需要移除
-                if isinstance(hit_structure, Brick):
-                    if hit_structure.hit(bullet.damage):
-                        self.map.structures.remove(hit_structure)
-                elif isinstance(hit_structure, Iron):
-                    pass  # 铁墙阻挡但不摧毁
-                elif isinstance(hit_structure, Headquarters):
-                    if hit_structure.hit(bullet.damage):
-                        self.game_over = True
-                continue  # 跳过后续碰撞检测
-
-            # 检查与敌人坦克的碰撞
-            hit_enemy = None
-            for enemy in self.enemies[:]:
-                if pygame.sprite.collide_rect(bullet, enemy):
-                    hit_enemy = enemy
-                    break
-
-            if hit_enemy:
-                bullets_to_remove.append(bullet)  # 标记为需要移除
-                self.player.bullets.remove(bullet)
-                if hit_enemy.hit(bullet.damage):
-                    self.enemies.remove(hit_enemy)
-                    self.enemies_destroyed += 1
-                    if hit_enemy.enemy_type == ENEMY_TARGET:
-                        fruit = create_random_fruit(hit_enemy.x, hit_enemy.y)
-                        self.fruits.append(fruit)
-                    # 检查是否胜利
-                    if self.enemies_destroyed >= self.total_enemies:
-                        self.victory = True
-        # 统一移除炮弹
-        for bullet in bullets_to_remove:
-            if bullet in self.player.bullets:
-                self.player.bullets.remove(bullet)
-
-        # 更新果实
-        for fruit in self.fruits[:]:
-            if not fruit.update():
-                self.fruits.remove(fruit)
-                continue
-
-            # 检查玩家是否吃到果实
-            if pygame.sprite.collide_rect(fruit, self.player):
-                fruit.apply_effect(self.player)
-                self.fruits.remove(fruit)
+        if keys is None:
+            keys = pygame.key.get_pressed()
+        if self.recorder is not None:
+            self.recorder.record(input_mask(keys, self._fire_pressed))
+        self._fire_pressed = False
+
+        self.ticks += 1
+        profiler = self.profiler
+        if profiler is None:
+            self._spawn_enemy()
+            self._update_player(keys)
+            self._update_enemies()
+            self._update_bullets()
+            self._update_fruits()
+        else:
+            profiler.measure('spawn', self._spawn_enemy)
+            profiler.measure('player', self._update_player, keys)
+            profiler.measure('enemy_ai', self._update_enemies)
+            profiler.measure('bullets', self._update_bullets)
+            profiler.measure('fruits', self._update_fruits)
+        self.entities.reindex((self.player,))  # 玩家移动或被击中后回到出生点
 
         # 检查游戏胜利条件
         if self.enemies_destroyed >= self.total_enemies and not self.game_over:
             self.victory = True
             self.game_over = True
 
-    #
-    # game_scene.py
-    def _check_tank_map_collision(self, tank):
-        old_rect = tank.rect.copy()
+    def _update_player(self, keys):
+        """更新玩家"""
+        if not self.game_over:
+            self.player.handle_input(keys)  # 处理输入并设置移动量
+            self.player.move(self.map)  # 碰到地形时不移动
+
+    def _update_enemies(self):
+        """更新敌人坦克"""
+        # 玩家移动到新的格子后重建追踪流场（限制频率，大地图上分多帧完成）
+        if self.ticks % FLOW_PLAYER_REFRESH_TICKS == 0:
+            self.player_field.retarget(self.player.rect)
+        self.player_field.advance()
+
+        self.paths.begin_frame()  # 设置了 path_goal 的敌人本帧的 A* 寻路预算
+
+        # 敌人AI逻辑（在 EnemyTank.update() 中设置方向和移动量），再由移动系统批量处理地形碰撞
+        enemies = self.enemies.sprites()
+        update_enemies(self.world, enemies)
+        if len(enemies) < ENTITY_BATCH_MIN:
+            moved = [enemy.move(self.map) for enemy in enemies]
+        else:
+            moved = self.world.move(np.array([enemy.slot for enemy in enemies], dtype=np.intp), self.map).tolist()
+            for enemy in compress(enemies, moved):
+                enemy.sync_rect()
+        moved = list(compress(enemies, moved))
+        for enemy in moved:
+            enemy.image = enemy.images[enemy.direction]
+        self.entities.reindex(moved)  # 只有移动过的敌人需要更新空间索引
+
+    def _update_bullets(self):
+        """批量推进所有炮弹，再按扫掠路径处理与地图、司令部、坦克的碰撞
+
+        每颗炮弹只结算本帧路径上最先碰到的目标，速度再快也不会穿过墙或坦克。
+        """
+        engine = self.bullets
+        live = engine.step()
+        if not live.size:
+            return
 
-        # 应用移动量
-        tank.rect.x += tank.dx
-        tank.rect.y += tank.dy
+        # 每颗炮弹最先碰到的目标：槽位 -> (移动距离, 优先级, 类型, 目标)
+        hits = {}
 
-        # 检查碰撞
-        collision = any(
-            not structure.can_pass_tank and tank.rect.colliderect(structure.rect)
-            for structure in self.map.structures
-        )
+        def offer(slots, distances, priority, kind, targets):
+            for slot, distance, target in zip(slots, distances, targets):
+                best = hits.get(slot)
+                if best is None or (distance, priority) < best[:2]:
+                    hits[slot] = (distance, priority, kind, target)
 
-        if collision:
-            tank.rect = old_rect  # 恢复位置
-            tank.reset_movement()  # 重置移动量（dx/dy=0）
-            return True
-        return False
+        # 司令部
+        slots, distances = engine.sweep_rect(live, self.headquarters.rect)
+        offer(slots.tolist(), distances.tolist(), 0, 'headquarters', [None] * slots.size)
 
-    def draw(self):
-        """绘制场景"""
-        self.screen.fill(BLACK)
-
-        # 绘制地图元素
-        for structure in self.map.structures:
-            self.screen.blit(structure.image, structure.rect)
-            # 调试：绘制铁墙的碰撞矩形（仅开发阶段使用）
-            # if isinstance(structure, Iron):
-            #     pygame.draw.rect(self.screen, RED, structure.rect, 1)
-            # if isinstance(structure, River):
-            #     pygame.draw.rect(self.screen, RED, structure.rect, 1)
-            # if isinstance(structure, Brick):
-            #     pygame.draw.rect(self.screen, RED, structure.rect, 1)
-
-        # 绘制司令部
-        self.screen.blit(self.map.headquarters.image, self.map.headquarters.rect)
-
-        # 绘制果实
-        for fruit in self.fruits:
-            self.screen.blit(fruit.image, fruit.rect)
-
-        # 绘制玩家
-        self.screen.blit(self.player.image, self.player.rect)
-        pygame.draw.rect(
-                self.screen,  # 目标表面
-                (0, 255, 0),  # 绿色
-                self.player.rect,  # 玩家坦克的rect
-                2  # 边框宽度
-            )
-
-        # 绘制玩家炮弹
-        for bullet in self.player.bullets:
-            self.screen.blit(bullet.image, bullet.rect)
-            # pygame.draw.rect(self.screen, RED, bullet.rect, 1)
-        # 绘制敌人
-        for enemy in self.enemies:
-            self.screen.blit(enemy.image, enemy.rect)
+        # 地图元素（森林和河流不阻挡炮弹，逐格遍历只返回碰到阻挡地形的炮弹）
+        slots, distances, cols, rows = engine.sweep_terrain(live)
+        offer(slots.tolist(), distances.tolist(), 1, 'terrain', zip(cols.tolist(), rows.tolist()))
 
-            # 绘制敌人炮弹
-            for bullet in enemy.bullets:
-                self.screen.blit(bullet.image, bullet.rect)
+        # 敌人炮弹与玩家
+        slots, distances = engine.sweep_rect(live, self.player.rect, TEAM_ENEMY)
+        offer(slots.tolist(), distances.tolist(), 2, 'player', [None] * slots.size)
 
-        # 绘制UI
-        lives_text = self.font.render(f"Life: {self.player.lives}", True, RED)
-        self.screen.blit(lives_text, (10, 10))
+        # 玩家炮弹与敌人坦克（玩家炮弹最多两颗，逐个检测）
+        enemies = self.enemies.sprites()
+        enemy_rects = [enemy.rect for enemy in enemies]
+        for bullet in self.player.bullets:
+            slot = bullet.slot
+            for index in engine.swept_rect(slot).collidelistall(enemy_rects):
+                distance = engine.contact_distance(slot, enemy_rects[index])
+                offer([slot], [distance], 3, 'enemy', [enemies[index]])
+
+        for slot in sorted(hits):
+            _, _, kind, target = hits[slot]
+            bullet = engine.handles[slot]
+            if not engine.alive[slot]:
+                continue  # 发射者已被摧毁，炮弹随之消失
+            if kind == 'enemy' and not target.alive():
+                continue  # 敌人已被本帧更早的炮弹摧毁
+            damage = bullet.damage
+            engine.kill(bullet)
+
+            if kind == 'headquarters':
+                self.game_over = True
+                self.defeat_reason = self.defeat_reason or 'headquarters'
+            elif kind == 'terrain':
+                self.map.damage_tile(target[0], target[1], damage)  # 红砖掉血，铁墙阻挡但不摧毁
+            elif kind == 'player':
+                if self.player.hit(damage):
+                    if self.player.lives > 0:
+                        self.player.lives -= 1
+                        self.player.reset()
+                    else:
+                        self.game_over = True
+                        self.defeat_reason = self.defeat_reason or 'lives'
+            elif target.hit(damage):
+                self._destroy_enemy(target)
+
+        engine.cull(live)  # 没撞到东西但已出界的炮弹
+
+    def _destroy_enemy(self, enemy):
+        """敌人被摧毁"""
+        # 被摧毁敌人的炮弹随之消失
+        self.bullets.kill_owned(enemy)
+        self.enemies_destroyed += 1
+        self.kills_by_type[enemy.enemy_type] = self.kills_by_type.get(enemy.enemy_type, 0) + 1
+        if enemy.enemy_type == ENEMY_TARGET:
+            fruit = create_random_fruit(enemy.x, enemy.y, self.rng)
+            self.fruits.add(fruit)
+            self.entities.add(fruit, layer=LAYER_FRUIT)
+        enemy.release()  # 移出所有精灵组并归还实体槽位
+        # 检查是否胜利
+        if self.enemies_destroyed >= self.total_enemies:
+            self.victory = True
 
-        lives_text = self.font.render(f"tolerance: {self.player.health}", True, RED)
-        self.screen.blit(lives_text, (10, 40))
+    def _update_fruits(self):
+        """更新果实"""
+        self.fruits.update()  # 到期的果实自行 kill()
 
-        enemies_text = self.font.render(f"destroyed: {self.enemies_destroyed}/{self.total_enemies}", True, WHITE)
-        self.screen.blit(enemies_text, (10, 70))
+        # 检查玩家是否吃到果实
+        for fruit in pygame.sprite.spritecollide(self.player, self.fruits, True):
+            fruit.apply_effect(self.player)
+            self.fruits_collected += 1
 
-        level_text = self.font.render(f"level: {self.player.level}", True, WHITE)
-        self.screen.blit(level_text, (10, 100))
+    def draw(self):
+        """绘制场景，返回本帧变化的屏幕区域（None 表示整屏）"""
+        screen = self.screen
+        profiler = self.profiler
+        camera = self.camera
+        camera.follow(self.player.rect)
+        view = camera.viewport
+        if profiler is None:
+            # 绘制视口内预渲染的地形区块（含背景和司令部，覆盖整个屏幕），返回重绘过的格子
+            dirty = self.map.draw_terrain(screen, view)
+            self._draw_entities(screen, dirty)
+            # 绘制森林覆盖层（坦克藏在森林下）
+            self.map.draw_forest(screen, view)
+            self._draw_hud(screen, dirty)
+        else:
+            dirty = profiler.measure('draw_terrain', self.map.draw_terrain, screen, view)
+            profiler.measure('draw_entities', self._draw_entities, screen, dirty)
+            profiler.measure('draw_forest', self.map.draw_forest, screen, view)
+            profiler.measure('draw_hud', self._draw_hud, screen, dirty)
 
         # 如果游戏结束，显示游戏结束信息
         if self.game_over:
-            game_over_surf = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-            game_over_surf.fill((0, 0, 0, 180))
-            self.screen.blit(game_over_surf, (0, 0))
-
-            if self.victory:
-                result_text = self.title_font.render("win!", True, GREEN)
-            else:
-                result_text = self.title_font.render("boom!", True, RED)
+            self._draw_game_over(screen)
+            self._last_dirty_rects = []
+            return None  # 半透明遮罩覆盖整屏
+
+        # 上一帧的位置也要刷新，才能擦掉移动前的图像
+        rects = dirty + self._last_dirty_rects
+        self._last_dirty_rects = dirty
+        if camera.moved:
+            camera.moved = False
+            return None  # 镜头滚动后整屏内容都变了
+        return rects
+
+    def _draw_entities(self, screen, dirty):
+        """绘制视口内的果实、坦克和炮弹，把绘制区域（屏幕坐标）加入 dirty"""
+        view = self.camera.viewport
+
+        # 果实在下、坦克在上，一次批量绘制视口内的精灵
+        dirty.extend(self.entities.draw(screen, view))
+
+        # 玩家坦克的绿色边框
+        pygame.draw.rect(
+                screen,  # 目标表面
+                (0, 255, 0),  # 绿色
+                self.camera.apply(self.player.rect),  # 玩家坦克的rect
+                2  # 边框宽度
+            )
 
-            result_text2 = self.title_font.render("press any key to go on~!", True, WHITE)
-            result_rect2 = result_text2.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
-            result_rect = result_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
-            self.screen.blit(result_text2, result_rect2)
-            self.screen.blit(result_text, result_rect)
+        # 批量绘制视口内的炮弹
+        dirty.extend(self.bullets.draw(screen, view))
 
+    def _draw_hud(self, screen, dirty):
+        """绘制界面文字，把绘制区域加入 dirty"""
+        # 绘制UI
+        labels = self.hud_labels
+        dirty.append(labels['lives'].draw(screen, self.player.lives))
+        dirty.append(labels['health'].draw(screen, self.player.health))
+        dirty.append(labels['destroyed'].draw(screen, self.enemies_destroyed, self.total_enemies))
+        dirty.append(labels['level'].draw(screen, self.player.level))
+
+    def _draw_game_over(self, screen):
+        """绘制游戏结束遮罩和提示文字"""
+        if self._game_over_overlay is None:
+            self._game_over_overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+            self._game_over_overlay.fill(GAME_OVER_OVERLAY_COLOR)
+        screen.blit(self._game_over_overlay, (0, 0))
+
+        if self.victory:
+            result_text = TextCache.render(self.title_font, "win!", GREEN)
+        else:
+            result_text = TextCache.render(self.title_font, "boom!", RED)
+
+        result_text2 = TextCache.render(self.title_font, "press any key to go on~!", WHITE)
+        result_rect2 = result_text2.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50))
+        result_rect = result_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 20))
+        screen.blit(result_text2, result_rect2)
+        screen.blit(result_text, result_rect)
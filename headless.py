@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import argparse
+
+import pygame
+from config import *
+from game_scene import GameScene
+from profiler import FrameProfiler
+
+
+class InputKeys:
+    """把输入位掩码包装成和 pygame.key.get_pressed() 一样按键值下标访问的对象"""
+
+    __slots__ = ('mask',)
+
+    def __init__(self, mask=0):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        return bool(self.mask & INPUT_KEY_MAP.get(key, 0))
+
+
+def init_headless():
+    """使用 dummy 视频/音频驱动初始化 pygame（不打开窗口，不初始化混音器）"""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    pygame.display.init()
+    pygame.font.init()
+    # 图片 convert() 需要设置过显示模式，dummy 驱动下不会创建真实窗口
+    screen = pygame.display.get_surface()
+    if screen is None:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    return screen
+
+
+class HeadlessRunner:
+    """无头固定步长模拟器：不受 FPS 限制，用程序提供的输入驱动 GameScene.update"""
+
+    def __init__(self, level=1, render=False, seed=None, record=False, profile=False, map_size=None,
+                 spawn_profile=None):
+        self.screen = init_headless()
+        self.scene = GameScene(self.screen, level, seed=seed, record=record, map_size=map_size,
+                               spawn_profile=spawn_profile)
+        if profile:
+            self.scene.profiler = FrameProfiler()
+        self.render = render  # 是否同时执行 draw()（默认只模拟逻辑）
+        self.keys = InputKeys()
+
+    def step(self, mask=0):
+        """以给定输入位掩码推进一帧"""
+        scene = self.scene
+        self.keys.mask = mask
+        # 开火对应一次 KEYDOWN 事件
+        if mask & INPUT_FIRE and not scene.game_over:
+            scene.fire()
+        scene.update(self.keys)
+        if self.render:
+            scene.draw()
+        if scene.profiler is not None:
+            scene.profiler.end_frame()
+
+    def run(self, max_ticks, input_fn=None):
+        """运行至多 max_ticks 帧或直到游戏结束
+
+        input_fn(tick, scene) 返回该帧的输入位掩码，为空时无输入。
+        返回运行统计信息。
+        """
+        scene = self.scene
+        start = time.perf_counter()
+        ticks = 0
+        while ticks < max_ticks and not scene.game_over:
+            self.step(input_fn(ticks, scene) if input_fn else 0)
+            ticks += 1
+        elapsed = time.perf_counter() - start
+
+        return {
+            'ticks': ticks,
+            'seconds': elapsed,
+            'ticks_per_second': ticks / elapsed if elapsed > 0 else 0.0,
+            'game_seconds': ticks / FPS,
+            'game_over': scene.game_over,
+            'victory': scene.victory,
+            'enemies_destroyed': scene.enemies_destroyed,
+            'seed': scene.seed,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TankWar 无头模拟")
+    parser.add_argument('--ticks', type=int, default=FPS * 600, help="最多模拟的帧数")
+    parser.add_argument('--level', type=int, default=1)
+    parser.add_argument('--map-size', help="使用随机生成的地图，尺寸 列x行（如 512x512）")
+    parser.add_argument('--render', action='store_true', help="同时执行绘制")
+    parser.add_argument('--seed', type=int, default=None, help="对局随机种子")
+    parser.add_argument('--profile', help="导出分阶段计时记录（.csv 或 .jsonl）")
+    parser.add_argument('--spawn-profile', default=DEFAULT_SPAWN_PROFILE, choices=sorted(SPAWN_PROFILES),
+                        help="敌人生成配置")
+    args = parser.parse_args(argv)
+
+    map_size = tuple(int(value) for value in args.map_size.lower().split('x')) if args.map_size else None
+    runner = HeadlessRunner(args.level, render=args.render, seed=args.seed, profile=bool(args.profile),
+                            map_size=map_size, spawn_profile=args.spawn_profile)
+    stats = runner.run(args.ticks)
+    if args.profile:
+        runner.scene.profiler.export(args.profile)
+    print(f"模拟 {stats['ticks']} 帧（{stats['game_seconds']:.1f} 游戏秒），"
+          f"耗时 {stats['seconds']:.2f}s，{stats['ticks_per_second']:.0f} 帧/秒")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+from collections import OrderedDict
+
+from config import *
+
+
+class TextCache:
+    """渲染好的文字表面缓存（进程级），键为 (字体, 文字, 颜色)
+
+    返回的 Surface 被所有调用方共享，不要直接在上面绘制。
+    """
+
+    _surfaces = OrderedDict()  # 最近使用的在后
+    _hits = 0
+    _misses = 0
+
+    @staticmethod
+    def render(font, text, color):
+        key = (font, text, color)
+        surface = TextCache._surfaces.get(key)
+        if surface is not None:
+            TextCache._surfaces.move_to_end(key)
+            TextCache._hits += 1
+            return surface
+
+        TextCache._misses += 1
+        surface = TextCache._surfaces[key] = font.render(text, True, color)
+        if len(TextCache._surfaces) > TEXT_CACHE_SIZE:
+            TextCache._surfaces.popitem(last=False)
+        return surface
+
+    @staticmethod
+    def stats():
+        """返回文字缓存统计信息（misses 即实际光栅化的次数）"""
+        return {
+            'hits': TextCache._hits,
+            'misses': TextCache._misses,
+            'entries': len(TextCache._surfaces),
+        }
+
+
+class HudLabel:
+    """界面上的一行文字：监视的数值变化时才重新取文字表面"""
+
+    def __init__(self, font, template, color, position):
+        self.font = font
+        self.template = template  # str.format 模板
+        self.color = color
+        self.position = position
+        self.values = None
+        self.surface = None
+
+    def draw(self, surface, *values):
+        """绘制文字，返回绘制区域"""
+        if values != self.values:
+            self.values = values
+            self.surface = TextCache.render(self.font, self.template.format(*values), self.color)
+        return surface.blit(self.surface, self.position)
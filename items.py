@@ -29,15 +29,16 @@ class Fruit(pygame.sprite.Sprite):
         # self.rect = self.image.get_rect(topleft=(x, y))
 
         fruit_filename = self._get_image_filename(self.fruit_type)
-        fruit_image = self.load_image(fruit_filename, self.color)
-        fruit_image = pygame.transform.scale(fruit_image, (FRUIT_SIZE, FRUIT_SIZE))
+        fruit_image = self.load_image(fruit_filename, self.color, size=(FRUIT_SIZE, FRUIT_SIZE))
 
         self.image = fruit_image
         self.rect = self.image.get_rect(topleft=(x, y))
 
     def update(self):
-        """更新果实状态"""
+        """更新果实状态，到期后移出所有精灵组"""
         self.lifetime -= 1
+        if self.lifetime <= 0:
+            self.kill()
         return self.lifetime > 0
 
     def apply_effect(self, player):
@@ -66,8 +67,8 @@ class Fruit(pygame.sprite.Sprite):
 
     @staticmethod
     def load_image(filename, default_color, size=(30, 30)):
-        """加载建筑图片，失败时返回默认颜色的Surface"""
-        image, _ = ResourceLoader.load_image(filename)
+        """加载缩放到 size 的果实图片，失败时返回默认颜色的Surface"""
+        image, _ = ResourceLoader.load_image(filename, size=size)
         if image:
             return image
         else:
@@ -75,10 +76,10 @@ class Fruit(pygame.sprite.Sprite):
             surface = pygame.Surface(size)
             surface.fill(default_color)
             return surface
-def create_random_fruit(x, y):
-    """创建随机类型的果实"""
+def create_random_fruit(x, y, rng=None):
+    """创建随机类型的果实（rng 为对局随机数生成器，默认使用全局 random）"""
     fruit_types = [FRUIT_STAR, FRUIT_TANK, FRUIT_GUN, FRUIT_SHELL]
-    fruit_type = random.choice(fruit_types)
+    fruit_type = (rng or random).choice(fruit_types)
     return Fruit(x, y, fruit_type)
 
 
@@ -0,0 +1,160 @@
+import os
+import re
+import sys
+import mmap
+import struct
+import argparse
+
+import numpy as np
+from config import *
+
+
+# 关卡文本格式：每行一排格子，每个字符一个格子；以 # 开头的行和空行忽略
+LEVEL_SYMBOLS = {
+    '.': TILE_EMPTY,
+    'B': TILE_BRICK,
+    'I': TILE_IRON,
+    'R': TILE_RIVER,
+    'F': TILE_FOREST,
+    'H': TILE_HEADQUARTERS,
+}
+TILE_SYMBOLS = {tile: symbol for symbol, tile in LEVEL_SYMBOLS.items()}
+
+# 编译后的二进制格式（小端）：
+#   文件头：魔数 b'TWLV'、版本(B)、列数(H)、行数(H)、源文件大小(I)、源文件修改时间(Q, 纳秒)
+#   数据：行优先排列的地形字节，每格一个字节
+LEVEL_MAGIC = b'TWLV'
+LEVEL_VERSION = 1
+LEVEL_HEADER = struct.Struct('<4sBHHIQ')
+LEVEL_FILE_PATTERN = re.compile(r'level_(\d+)\.txt$')
+
+
+def level_path(level):
+    return os.path.join(LEVEL_DIR, f"level_{level}.txt")
+
+
+def cache_path(level):
+    return os.path.join(LEVEL_CACHE_DIR, f"level_{level}.twl")
+
+
+def available_levels():
+    """已发布的关卡编号（按 levels 目录中的文本文件）"""
+    if not os.path.isdir(LEVEL_DIR):
+        return []
+    levels = []
+    for name in os.listdir(LEVEL_DIR):
+        match = LEVEL_FILE_PATTERN.match(name)
+        if match:
+            levels.append(int(match.group(1)))
+    return sorted(levels)
+
+
+def parse_level_text(text):
+    """解析关卡文本，返回 (列数, 行数, 地形字节)"""
+    rows = []
+    for number, line in enumerate(text.splitlines(), 1):
+        line = line.rstrip()
+        if not line or line.startswith('#'):
+            continue
+        try:
+            rows.append(bytes(LEVEL_SYMBOLS[symbol] for symbol in line))
+        except KeyError as e:
+            raise ValueError(f"第 {number} 行包含未知地形字符 {e.args[0]!r}") from None
+        if len(rows[-1]) != len(rows[0]):
+            raise ValueError(f"第 {number} 行宽度 {len(rows[-1])} 与第一行 {len(rows[0])} 不一致")
+    if not rows:
+        raise ValueError("关卡文件中没有地形数据")
+    return len(rows[0]), len(rows), b''.join(rows)
+
+
+def format_level_text(tiles, title=None):
+    """把地形数组 (行, 列) 转成关卡文本"""
+    lookup = np.array([ord(TILE_SYMBOLS.get(tile, '.')) for tile in range(256)], dtype=np.uint8)
+    lines = [f"# {title}"] if title else []
+    lines.extend(row.tobytes().decode('ascii') for row in lookup[np.asarray(tiles)])
+    return '\n'.join(lines) + '\n'
+
+
+def compile_level(level):
+    """把关卡文本编译成二进制缓存文件，返回缓存路径"""
+    source = level_path(level)
+    with open(source, encoding='utf-8') as f:
+        cols, rows, data = parse_level_text(f.read())
+    stat = os.stat(source)
+
+    target = cache_path(level)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    temp = target + '.tmp'
+    with open(temp, 'wb') as f:
+        f.write(LEVEL_HEADER.pack(LEVEL_MAGIC, LEVEL_VERSION, cols, rows, stat.st_size, stat.st_mtime_ns))
+        f.write(data)
+    os.replace(temp, target)  # 原子替换，读取方不会看到写了一半的文件
+    return target
+
+
+def _map_cache(path, source_stat):
+    """内存映射缓存文件并校验，无效（损坏或源文件已修改）时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None  # 不存在或为空文件
+
+    if len(mapped) < LEVEL_HEADER.size:
+        return None
+    magic, version, cols, rows, source_size, source_mtime = LEVEL_HEADER.unpack_from(mapped)
+    if magic != LEVEL_MAGIC or version != LEVEL_VERSION or len(mapped) != LEVEL_HEADER.size + cols * rows:
+        return None
+    if source_stat is not None and (source_size, source_mtime) != (source_stat.st_size, source_stat.st_mtime_ns):
+        return None
+    tiles = np.frombuffer(mapped, dtype=np.uint8, count=cols * rows, offset=LEVEL_HEADER.size).reshape(rows, cols)
+    if tiles.size and tiles.max() > max(LEVEL_SYMBOLS.values()):
+        return None
+    return tiles
+
+
+def load_level(level):
+    """加载关卡地形，返回只读的 uint8 数组 (行, 列)
+
+    优先内存映射已编译的缓存；缓存不存在、损坏或比文本旧时重新编译。
+    只发布了缓存没有文本时直接使用缓存。
+    """
+    source = level_path(level)
+    try:
+        source_stat = os.stat(source)
+    except FileNotFoundError:
+        source_stat = None
+
+    tiles = _map_cache(cache_path(level), source_stat)
+    if tiles is not None:
+        return tiles
+    if source_stat is None:
+        raise FileNotFoundError(f"关卡 {level} 不存在: {source}")
+
+    try:
+        tiles = _map_cache(compile_level(level), source_stat)
+    except OSError as e:
+        print(f"无法写入关卡缓存: {e}")
+        tiles = None
+    if tiles is None:
+        # 缓存目录不可写时直接使用解析结果
+        with open(source, encoding='utf-8') as f:
+            cols, rows, data = parse_level_text(f.read())
+        tiles = np.frombuffer(data, dtype=np.uint8).reshape(rows, cols)
+    return tiles
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TankWar 关卡预编译")
+    parser.add_argument('levels', nargs='*', type=int, help="要编译的关卡编号（默认全部）")
+    args = parser.parse_args(argv)
+
+    for level in args.levels or available_levels():
+        path = compile_level(level)
+        tiles = load_level(level)
+        print(f"关卡 {level}: {tiles.shape[1]}x{tiles.shape[0]} -> {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
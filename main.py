@@ -1,15 +1,21 @@
 import pygame
+import os
 import sys
+import time
 from config import *
 from start_scene import StartScene
 from game_scene import GameScene
 from end_scene import EndScene
-from resources import ResourceLoader
+from resources import ResourceLoader, AssetPreloader
+from profiler import FrameProfiler
+from scene_manager import SceneManager
 
 class TankWarGame:
     """坦克大战游戏主类"""
 
-    def __init__(self):
+    def __init__(self, dirty_rendering=DIRTY_RECT_RENDERING):
+        self.start_time = time.perf_counter()
+        self.first_frame_seconds = None  # 启动到第一帧显示的耗时
         pygame.init()
         # 强制初始化混音器并设置参数
         try:
@@ -22,53 +28,25 @@ class TankWarGame:
 
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("TankWar")
+        # 图片和音效在后台线程解码，开始界面立即显示加载进度
+        self.preloader = AssetPreloader().start()
 
         self.clock = pygame.time.Clock()
         self.running = True
+        self.dirty_rendering = dirty_rendering  # 是否启用脏矩形渲染
+        self.full_redraw = True  # 下一帧强制整屏刷新（启动和场景切换后）
+        self.pixels_pushed = 0  # 上一帧推送到屏幕的像素数
+        self.total_pixels_pushed = 0
+        self.frames_drawn = 0
+        self.profiler = FrameProfiler() if PROFILING else None  # 分阶段计时器（F3 切换）
         self.current_scene = None
         self.scene_state = GAME_START
 
         # 加载资源
         self._load_resources()
 
-        # 初始化场景
-        self._init_scenes()  # 初始化场景，但不创建游戏场景实例
-
-        def _init_scenes(self):
-            """初始化场景（延迟创建游戏场景，避免复用旧实例）"""
-            self.scenes = {
-                GAME_START: StartScene(self.screen),
-                GAME_PLAYING: None,  # 动态创建
-                GAME_OVER: None  # 动态创建
-            }
-            self.current_scene = self.scenes[GAME_START]
-
-        def reset_game(self):
-            """完全重置游戏，创建全新的游戏场景和结束场景"""
-            self.scenes[GAME_PLAYING] = GameScene(self.screen)  # 新建游戏场景
-            self.scenes[GAME_OVER] = EndScene(self.screen, victory=False)  # 新建结束场景
-            self.scene_state = GAME_PLAYING  # 直接进入游戏场景（或根据需求返回开始场景）
-
-        def handle_events(self):
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-
-                next_state = self.current_scene.handle_event(event)
-
-                if next_state is not None:
-                    if next_state == GAME_PLAYING:
-                        # 从开始场景或结束场景进入游戏时，重置游戏
-                        self.reset_game()
-                    elif next_state == GAME_OVER:
-                        # 传递胜利状态
-                        self.scenes[GAME_OVER] = EndScene(
-                            self.screen,
-                            self.scenes[GAME_PLAYING].victory
-                        )
-
-                    self.scene_state = next_state
-                    self.current_scene = self.scenes.get(next_state, self.scenes[GAME_START])
+        # 注册场景（每个场景第一次进入时才创建）
+        self._init_scenes()
 
     def _load_resources(self):
         """加载游戏资源"""
@@ -79,20 +57,22 @@ class TankWarGame:
             print(f"加载背景音乐失败: {e}")
 
     def _init_scenes(self):
-        """初始化游戏场景"""
-        self.scenes = {
-            GAME_START: StartScene(self.screen),
-            GAME_PLAYING: GameScene(self.screen),
-            GAME_OVER: EndScene(self.screen, False)
-        }
-
-        self.current_scene = self.scenes[self.scene_state]
+        """注册场景，游戏场景在第一次进入游戏时创建，只等待它用到的资源"""
+        self.scenes = SceneManager({
+            GAME_START: lambda: StartScene(self.screen, self.preloader),
+            GAME_PLAYING: self._new_game_scene,
+            GAME_OVER: lambda: EndScene(self.screen, False),
+        })
+        self.current_scene = self.scenes.switch(self.scene_state)
 
     def handle_events(self):
         """处理游戏事件"""
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self._toggle_profiler()
+                continue
 
             # 处理场景事件
             next_state = self.current_scene.handle_event(event)
@@ -103,18 +83,51 @@ class TankWarGame:
 
                 # 如果切换到游戏结束场景，传递胜利状态
                 if self.scene_state == GAME_OVER:
-                    self.scenes[GAME_OVER] = EndScene(self.screen, self.scenes[GAME_PLAYING].victory)
-                # 如果切换到游戏开始场景，重置游戏
-                if self.scene_state == GAME_START:
-                    self.scenes[GAME_PLAYING] = GameScene(self.screen)
-                    self.scenes[GAME_OVER] = EndScene(self.screen, False)
-
-                self.current_scene = self.scenes[self.scene_state]
+                    game = self.scenes.get(GAME_PLAYING)
+                    self.scenes.get(GAME_OVER).victory = game.victory
+                    self._save_replay(game)
+                # 再次进入游戏时原地重置上一局的游戏场景
+                if self.scene_state == GAME_PLAYING:
+                    game = self.scenes.existing(GAME_PLAYING)
+                    if game is not None and game.ticks:
+                        self.scenes.reset(GAME_PLAYING)
+
+                self.current_scene = self.scenes.switch(self.scene_state)
+                self.full_redraw = True
             elif next_state is None:
                 self.running = False
 
 
 
+    def _new_game_scene(self):
+        """创建游戏场景并挂接计时器"""
+        scene = GameScene(self.screen, record=RECORD_REPLAYS)
+        scene.profiler = self.profiler
+        return scene
+
+    def _toggle_profiler(self):
+        """打开/关闭计时叠加层；未配置 PROFILING 时关闭叠加层即停止计时"""
+        if self.profiler is None:
+            self.profiler = FrameProfiler()
+        self.profiler.toggle_overlay()
+        if not self.profiler.overlay_visible and not PROFILING:
+            self.profiler = None
+        game = self.scenes.existing(GAME_PLAYING)
+        if game is not None:
+            game.profiler = self.profiler
+        self.full_redraw = True
+
+    def _save_replay(self, scene):
+        """保存一局的回放（启用 RECORD_REPLAYS 时）"""
+        if scene.recorder is None:
+            return
+        path = os.path.join(REPLAY_DIR, f"replay_{time.strftime('%Y%m%d_%H%M%S')}_{scene.seed}.twr")
+        try:
+            scene.recorder.save(path)
+            print(f"回放已保存: {path}")
+        except OSError as e:
+            print(f"保存回放失败: {e}")
+
     def update(self):
         """更新游戏状态"""
         if self.running:
@@ -123,17 +136,71 @@ class TankWarGame:
     def draw(self):
         """绘制游戏画面"""
         if self.running:
-            self.current_scene.draw()
+            dirty_rects = self.current_scene.draw()
+            if self.profiler is not None and self.profiler.overlay_visible:
+                overlay_rect = self.profiler.draw_overlay(self.screen)
+                if dirty_rects is not None:
+                    dirty_rects.append(overlay_rect)
+
+            if self.profiler is None:
+                self._present(dirty_rects)
+            else:
+                self.profiler.measure('present', self._present, dirty_rects)
+
+    def _present(self, dirty_rects):
+        """把画面推送到屏幕（脏矩形模式下只推送变化区域）"""
+        if self.dirty_rendering and dirty_rects is not None and not self.full_redraw:
+            screen_rect = self.screen.get_rect()
+            dirty_rects = [rect.clip(screen_rect) for rect in dirty_rects]
+            pygame.display.update(dirty_rects)
+            pixels = sum(rect.width * rect.height for rect in dirty_rects)
+        else:
             pygame.display.flip()
+            pixels = self.screen.get_width() * self.screen.get_height()
+            self.full_redraw = False
+
+        self.pixels_pushed = pixels
+        self.total_pixels_pushed += pixels
+        self.frames_drawn += 1
+        if self.first_frame_seconds is None:
+            self.first_frame_seconds = time.perf_counter() - self.start_time
+            print(f"首帧耗时: {self.first_frame_seconds * 1000:.0f}ms")
+
+    def render_stats(self):
+        """返回屏幕推送统计（用于验证脏矩形渲染的效果）"""
+        average = self.total_pixels_pushed / self.frames_drawn if self.frames_drawn else 0
+        return {
+            'dirty_rendering': self.dirty_rendering,
+            'frames': self.frames_drawn,
+            'last_frame_pixels': self.pixels_pushed,
+            'average_frame_pixels': average,
+            'first_frame_ms': self.first_frame_seconds * 1000 if self.first_frame_seconds is not None else None,
+        }
+
+    def timing_stats(self):
+        """返回启动和场景创建/重置/切换的耗时（毫秒）"""
+        stats = {'first_frame_ms': self.first_frame_seconds * 1000 if self.first_frame_seconds is not None else None}
+        stats.update(self.scenes.timings)
+        return stats
 
     def run(self):
         """运行游戏主循环"""
         while self.running:
-            self.handle_events()
+            profiler = self.profiler
+            if profiler is None:
+                self.handle_events()
+            else:
+                profiler.measure('events', self.handle_events)
             self.update()
             self.draw()
+            if profiler is not None:
+                profiler.end_frame()
             self.clock.tick(FPS)
 
+        if self.profiler is not None and PROFILE_EXPORT_PATH:
+            self.profiler.export(PROFILE_EXPORT_PATH)
+            print(f"计时记录已导出: {PROFILE_EXPORT_PATH}")
+
 
 if __name__ == "__main__":
     game = TankWarGame()
@@ -1,129 +1,328 @@
 # map.py
 import random
+from collections import OrderedDict
 
+import numpy as np
 import pygame
 from config import *
-from structures import Brick, Iron, River, Forest, Headquarters
+from structures import Structure, Headquarters, TILE_IMAGE_FILES
+from levels import load_level
+from audio import AudioManager
+
+
+# 各地形类型的属性表（按 TILE_* 下标访问）
+TILE_TYPES = (TILE_EMPTY, TILE_BRICK, TILE_IRON, TILE_RIVER, TILE_FOREST, TILE_HEADQUARTERS)
+TANK_BLOCKING = np.zeros(len(TILE_TYPES), dtype=bool)  # 坦克不能通过
+TANK_BLOCKING[[TILE_BRICK, TILE_IRON, TILE_RIVER, TILE_HEADQUARTERS]] = True
+BULLET_BLOCKING = np.zeros(len(TILE_TYPES), dtype=bool)  # 炮弹不能通过（司令部单独判定）
+BULLET_BLOCKING[[TILE_BRICK, TILE_IRON]] = True
+DESTRUCTIBLE_TILES = np.zeros(len(TILE_TYPES), dtype=bool)  # 可被炮弹摧毁
+DESTRUCTIBLE_TILES[TILE_BRICK] = True
+TILE_MAX_HP = np.zeros(len(TILE_TYPES), dtype=np.int16)
+TILE_MAX_HP[TILE_BRICK] = BRICK_HP
+TILE_MAX_HP[TILE_IRON] = IRON_HP
 
 
 class GameMap:
-    """游戏地图类，负责管理地图数据和生成地图元素"""
-    def __init__(self, level=1):
+    """游戏地图类，负责管理地图数据和生成地图元素
+
+    地形保存在紧凑的二维数组中（地形类型、血量、坦克/炮弹阻挡掩码），
+    只有司令部是 Sprite 对象。
+    """
+    def __init__(self, level=1, matrix=None):
         self.level = level
         self.tile_size = TILE_SIZE  # 初始化格子尺寸
-        self.structures = []  # 存储所有地图结构
         self.headquarters = None  # 司令部对象
-        self.matrix = self._load_map_matrix(level)  # 加载地图矩阵
+        # 初始地图矩阵（只读）：直接给出的地形数组（如随机生成的地图），否则加载关卡文件
+        self.matrix = matrix if matrix is not None else self._load_map_matrix(level)
+        # 地形数组覆盖地图和整个屏幕，下标为 [行, 列]
+        rows = max(self.matrix.shape[0], -(-SCREEN_HEIGHT // self.tile_size))
+        cols = max(self.matrix.shape[1], -(-SCREEN_WIDTH // self.tile_size))
+        self.tiles = np.zeros((rows, cols), dtype=np.uint8)  # 地形类型
+        self.tile_hp = np.zeros((rows, cols), dtype=np.int16)  # 地形血量
+        self.tank_blocking = np.zeros((rows, cols), dtype=bool)  # 阻挡坦克的格子
+        self.bullet_blocking = np.zeros((rows, cols), dtype=bool)  # 阻挡炮弹的格子（供炮弹引擎向量化查表）
+        self._tile_listeners = []  # 地形变化回调 fn(列, 行)，如寻路流场
+
+        # 世界范围（像素），地图比屏幕小时按屏幕大小
+        self.world_rect = pygame.Rect(0, 0, max(self.matrix.shape[1] * self.tile_size, SCREEN_WIDTH),
+                                      max(self.matrix.shape[0] * self.tile_size, SCREEN_HEIGHT))
+
+        # 地形按区块预渲染（首次进入视口时创建）：每块包含静态地形层和森林覆盖层
+        self.chunk_tiles = TERRAIN_CHUNK_TILES  # 区块边长（格）
+        self._chunks = OrderedDict()  # (区块列, 区块行) -> (区块区域, 地形层, 森林覆盖层或 None)，最近使用的在后
+        self._tile_images = None  # 地形类型 -> 图片
+        self._dirty_cells = set()  # 已渲染区块中需要重新渲染的格子
+        self._drawn_hq_image = None  # 地形层上当前绘制的司令部图片
         self._generate_structures()  # 生成地图元素
 
     def _load_map_matrix(self, level=1):
-        if level == 1:
-            # 地形类型定义
-            EMPTY = 0  # 空地
-            BRICK = 1  # 红砖（可摧毁）
-            IRON = 2  # 铁墙（不可摧毁）
-            RIVER = 3  # 河流（坦克不可通过，子弹可通过）
-            FOREST = 4  # 森林（坦克/子弹均可通过）
-            HQ = 5  # 司令部（不可摧毁）
-
-            # 顶部围墙（行0）
-            top_wall = [IRON] * 26
-
-            # 中间区域（行1-18）
-            middle_rows = [
-                # 行1-2：对称河流+森林混合带
-                [IRON, EMPTY, FOREST, EMPTY, FOREST, EMPTY, FOREST, RIVER, FOREST, RIVER, EMPTY, EMPTY, EMPTY, EMPTY,
-                 EMPTY, EMPTY, RIVER, FOREST, RIVER, FOREST, EMPTY, FOREST, EMPTY, FOREST, EMPTY, IRON],
-                [IRON, EMPTY, FOREST, EMPTY, FOREST, EMPTY, FOREST, RIVER, FOREST, RIVER, EMPTY, EMPTY, EMPTY, EMPTY,
-                 EMPTY, EMPTY, RIVER, FOREST, RIVER, FOREST, EMPTY, FOREST, EMPTY, FOREST, EMPTY, IRON],
-
-                # 行3-7：红砖矩阵+纵向通道
-                [IRON, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, EMPTY, EMPTY, EMPTY, EMPTY,
-                 BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, IRON],
-                [IRON, BRICK, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, BRICK, BRICK, EMPTY, EMPTY, EMPTY, EMPTY,
-                 BRICK, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, BRICK, BRICK, IRON],
-                [IRON, BRICK, EMPTY, BRICK, BRICK, BRICK, BRICK, BRICK, EMPTY, BRICK, BRICK, EMPTY, BRICK, BRICK, BRICK,
-                 BRICK, EMPTY, BRICK, BRICK, BRICK, BRICK, BRICK, EMPTY, BRICK, BRICK, IRON],
-                [IRON, BRICK, EMPTY, BRICK, EMPTY, EMPTY, EMPTY, BRICK, EMPTY, BRICK, BRICK, EMPTY, BRICK, EMPTY, EMPTY,
-                 EMPTY, BRICK, EMPTY, BRICK, EMPTY, EMPTY, EMPTY, BRICK, EMPTY, BRICK, IRON],
-                [IRON, BRICK, EMPTY, BRICK, BRICK, BRICK, BRICK, BRICK, EMPTY, BRICK, BRICK, EMPTY, BRICK, BRICK, BRICK,
-                 BRICK, EMPTY, BRICK, BRICK, BRICK, BRICK, BRICK, EMPTY, BRICK, BRICK, IRON],
-
-                # 行8-10：中心湖泊+铁桥通道
-                [IRON, EMPTY, EMPTY, EMPTY, RIVER, RIVER, RIVER, EMPTY, EMPTY, EMPTY, RIVER, RIVER, RIVER, RIVER, RIVER,
-                 RIVER, RIVER, RIVER, RIVER, RIVER, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, IRON],
-                [IRON, EMPTY, IRON, IRON, IRON, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY,
-                 EMPTY, EMPTY, EMPTY, IRON, IRON, IRON, EMPTY, EMPTY, EMPTY, EMPTY, IRON],
-                [IRON, EMPTY, IRON, EMPTY, EMPTY, EMPTY, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK,
-                 BRICK, BRICK, EMPTY, EMPTY, IRON, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, IRON],
-
-                # 行11-15：森林迷宫+横向通道
-                [IRON, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST,
-                 BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, IRON],
-                [IRON, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK,
-                 FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, IRON],
-                [IRON, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, EMPTY, EMPTY, EMPTY, EMPTY,
-                 EMPTY, EMPTY, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, IRON],
-                [IRON, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, EMPTY, EMPTY, EMPTY, EMPTY,
-                 EMPTY, EMPTY, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, IRON],
-                [IRON, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST,
-                 BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, FOREST, BRICK, IRON],
-
-                # 行16-17：司令部前哨防御
-                [EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY,
-                 EMPTY, EMPTY,
-                 EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY, EMPTY],
-                [BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK,
-                 BRICK,
-                 BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK, BRICK],
-            ]
-
-            # 底部围墙（行18，司令部居中）
-            bottom_wall = [IRON] * 12 + [HQ] + [IRON] * 13  # 司令部位于x=12（更靠左，增加防御难度）
-
-            return [top_wall] + middle_rows + [bottom_wall]
-        return []
+        """加载关卡地形（levels 目录中的关卡文件，经二进制缓存内存映射）"""
+        return load_level(level)
 
     # map.py
     def _generate_structures(self):
-        for y, row in enumerate(self.matrix):
-            for x, tile in enumerate(row):
-                # 限制在 MAX_COLS 和 MAX_ROWS 内
-                if x >= MAX_COLS or y >= MAX_ROWS:
-                    continue
-                pos_x = x * self.tile_size
-                pos_y = y * self.tile_size
-
-                if tile == TILE_HEADQUARTERS:
-                    # 创建司令部对象并赋值给 self.headquarters
-                    self.headquarters = Headquarters(pos_x, pos_y)
-                    # 在司令部周围添加保护墙（可选）
-                    for i in (-1, 0, 1):
-                        for j in (-1,):
-                            if i == 0 and j == 0:
-                                continue
-                            self.structures.append(Brick(pos_x + i * self.tile_size, pos_y + j * self.tile_size))
-                elif tile == TILE_BRICK:
-                    self.structures.append(Brick(pos_x, pos_y))
-                elif tile == TILE_IRON:
-                    self.structures.append(Iron(pos_x, pos_y))
-                elif tile == TILE_RIVER:
-                    self.structures.append(River(pos_x, pos_y))
-                elif tile == TILE_FOREST:
-                    self.structures.append(Forest(pos_x, pos_y))
+        """把地图矩阵写入地形数组，只为司令部创建对象"""
+        rows, cols = self.matrix.shape
+        self.tiles[:rows, :cols] = self.matrix
 
-    def is_tile_blocking(self, x, y):
-        """检查指定位置的格子是否阻挡坦克移动"""
-        # 边界检查
-        if x < 0 or x >= len(self.matrix[0]) or y < 0 or y >= len(self.matrix):
-            return True
+        for y, x in np.argwhere(self.tiles == TILE_HEADQUARTERS).tolist():
+            if self.headquarters is not None and self.headquarters.rect.topleft == (x * self.tile_size, y * self.tile_size):
+                self.headquarters.reset()  # 重开时复用司令部对象
+            else:
+                # 创建司令部对象并赋值给 self.headquarters
+                self.headquarters = Headquarters(x * self.tile_size, y * self.tile_size)
+            # 在司令部周围添加保护墙（可选）
+            for i in (-1, 0, 1):
+                for j in (-1,):
+                    if i == 0 and j == 0:
+                        continue
+                    if 0 <= x + i < self.tiles.shape[1] and 0 <= y + j < self.tiles.shape[0]:
+                        self.tiles[y + j, x + i] = TILE_BRICK
+
+        self.tile_hp[:] = TILE_MAX_HP[self.tiles]
+        self.tank_blocking[:] = TANK_BLOCKING[self.tiles]
+        self.bullet_blocking[:] = BULLET_BLOCKING[self.tiles]
+
+    def reset(self):
+        """恢复关卡初始地形（重开一局时复用地图对象和已加载的图片）
+
+        只丢弃预渲染的区块；地形变化回调不会逐格触发，监听者需要自行整体重建。
+        """
+        self.tiles.fill(TILE_EMPTY)
+        self._generate_structures()
+        self._chunks.clear()
+        self._dirty_cells.clear()
+        self._drawn_hq_image = None
+
+    def _cells_for_rect(self, rect):
+        """返回矩形覆盖的所有格子坐标（按行优先顺序）"""
+        size = self.tile_size
+        left = rect.left // size
+        right = (rect.right - 1) // size
+        top = rect.top // size
+        bottom = (rect.bottom - 1) // size
+        return [(col, row) for row in range(top, bottom + 1) for col in range(left, right + 1)]
+
+    def _cell_span(self, rect):
+        """矩形覆盖的格子范围 (左, 右, 上, 下)，已裁剪到网格内，右和下不含"""
+        size = self.tile_size
+        rows, cols = self.tiles.shape
+        left = max(rect.left // size, 0)
+        right = min((rect.right - 1) // size + 1, cols)
+        top = max(rect.top // size, 0)
+        bottom = min((rect.bottom - 1) // size + 1, rows)
+        return left, right, top, bottom
+
+    def set_tile(self, x, y, tile):
+        """设置格子的地形类型，同步更新血量和阻挡掩码"""
+        rows, cols = self.tiles.shape
+        if not (0 <= x < cols and 0 <= y < rows):
+            return
+        self.tiles[y, x] = tile
+        self.tile_hp[y, x] = TILE_MAX_HP[tile]
+        self.tank_blocking[y, x] = TANK_BLOCKING[tile]
+        self.bullet_blocking[y, x] = BULLET_BLOCKING[tile]
+        if (x // self.chunk_tiles, y // self.chunk_tiles) in self._chunks:
+            self._dirty_cells.add((x, y))
+        for listener in self._tile_listeners:
+            listener(x, y)
+
+    def add_tile_listener(self, listener):
+        """注册地形变化回调，格子被修改（如红砖被摧毁）时调用 listener(列, 行)"""
+        self._tile_listeners.append(listener)
+
+    def damage_tile(self, x, y, damage):
+        """格子被炮弹击中，只有可摧毁的地形（红砖）会掉血，返回是否被摧毁"""
+        tile = self.get_tile_at(x, y)
+        if not DESTRUCTIBLE_TILES[tile]:
+            return False  # 铁墙阻挡但不摧毁
+
+        AudioManager.play('bang.wav')
+        self.tile_hp[y, x] -= damage
+        if self.tile_hp[y, x] > 0:
+            return False
+        self.set_tile(x, y, TILE_EMPTY)
+        return True
+
+    def rect_blocks_tank(self, rect):
+        """矩形是否与阻挡坦克的格子重叠（网格外视为可通行）"""
+        left, right, top, bottom = self._cell_span(rect)
+        if left >= right or top >= bottom:
+            return False
+        return bool(self.tank_blocking[top:bottom, left:right].any())
+
+    def rects_block_tank(self, left, top, width, height):
+        """rect_blocks_tank 的批量版本：参数为各矩形的坐标和尺寸数组，返回是否被阻挡的掩码"""
+        size = self.tile_size
+        rows, cols = self.tank_blocking.shape
+        col0 = np.maximum(left // size, 0)
+        col1 = np.minimum((left + width - 1) // size + 1, cols)
+        row0 = np.maximum(top // size, 0)
+        row1 = np.minimum((top + height - 1) // size + 1, rows)
+        # 所有矩形按最大覆盖范围展开成 (矩形, 行偏移, 列偏移)，一次查表
+        span_rows = np.arange(max(int((row1 - row0).max(initial=0)), 0))
+        span_cols = np.arange(max(int((col1 - col0).max(initial=0)), 0))
+        row = row0[:, None, None] + span_rows[None, :, None]
+        col = col0[:, None, None] + span_cols[None, None, :]
+        inside = (row < row1[:, None, None]) & (col < col1[:, None, None])
+        cells = self.tank_blocking[np.minimum(row, rows - 1), np.minimum(col, cols - 1)] & inside
+        return cells.any(axis=(1, 2))
+
+    def free_cells(self, footprint):
+        """坦克能停放的格子掩码 (行, 列)：以该格为左上角的 footprint x footprint 个格子都不阻挡坦克
 
-        tile = self.matrix[y][x]
-        # 阻挡坦克的地形：红砖、铁墙、河流、司令部、边界
-        return tile in (TILE_BRICK, TILE_IRON, TILE_RIVER, TILE_HEADQUARTERS)
+        超出网格的部分视为不可停放。
+        """
+        rows, cols = self.tank_blocking.shape
+        windows = np.lib.stride_tricks.sliding_window_view(~self.tank_blocking, (footprint, footprint))
+        fits = np.zeros((rows, cols), dtype=bool)
+        fits[:rows - footprint + 1, :cols - footprint + 1] = windows.all(axis=(2, 3))
+        return fits
+
+    def first_bullet_blocker(self, rect):
+        """返回矩形覆盖的第一个（行优先）阻挡炮弹的格子 (列, 行)，没有则返回 None"""
+        left, right, top, bottom = self._cell_span(rect)
+        if left >= right or top >= bottom:
+            return None
+        hits = np.flatnonzero(self.bullet_blocking[top:bottom, left:right])
+        if not hits.size:
+            return None
+        row, col = divmod(int(hits[0]), right - left)
+        return left + col, top + row
+
+    def invalidate_rect(self, rect):
+        """标记矩形覆盖的格子，下次绘制时重新渲染"""
+        n = self.chunk_tiles
+        self._dirty_cells.update(cell for cell in self._cells_for_rect(rect)
+                                 if (cell[0] // n, cell[1] // n) in self._chunks)
+
+    def _load_tile_images(self):
+        """加载各地形类型的图片（缩放到格子大小，缓存共享）"""
+        size = (self.tile_size, self.tile_size)
+        self._tile_images = {
+            tile: Structure.load_structure_image(filename, color, size=size, scale=True)
+            for tile, (filename, color) in TILE_IMAGE_FILES.items()
+        }
+
+    def _render_chunk(self, key):
+        """预渲染一个区块的地形层和森林覆盖层（没有森林时覆盖层为 None）"""
+        if self._tile_images is None:
+            self._load_tile_images()
+        n = self.chunk_tiles
+        size = self.tile_size
+        tiles = self.tiles[key[1] * n:(key[1] + 1) * n, key[0] * n:(key[0] + 1) * n]
+        area = pygame.Rect(key[0] * n * size, key[1] * n * size, tiles.shape[1] * size, tiles.shape[0] * size)
+
+        terrain = []
+        forest = []
+        images = self._tile_images
+        for row, col in np.argwhere(tiles).tolist():
+            tile = int(tiles[row, col])
+            if tile == TILE_FOREST:
+                forest.append((images[tile], (col * size, row * size)))
+            elif tile in images:
+                terrain.append((images[tile], (col * size, row * size)))
+
+        terrain_layer = pygame.Surface(area.size).convert()
+        terrain_layer.fill(BLACK)
+        terrain_layer.blits(terrain, False)
+        if self.headquarters and self._headquarters_area().colliderect(area):
+            terrain_layer.blit(self.headquarters.image, self.headquarters.rect.move(-area.x, -area.y))
+
+        # 森林覆盖层使用透明色，绘制在坦克之上
+        forest_layer = None
+        if forest:
+            forest_layer = pygame.Surface(area.size).convert()
+            forest_layer.fill(FOREST_LAYER_COLORKEY)
+            forest_layer.set_colorkey(FOREST_LAYER_COLORKEY, pygame.RLEACCEL)
+            forest_layer.blits(forest, False)
+        return area, terrain_layer, forest_layer
+
+    def _visible_chunks(self, view):
+        """视口覆盖的区块（按需渲染，超出缓存上限时丢弃最久未用的区块）"""
+        chunk_size = self.chunk_tiles * self.tile_size
+        rows, cols = self.tiles.shape
+        left = max(view.left // chunk_size, 0)
+        right = min((view.right - 1) // chunk_size, (cols - 1) // self.chunk_tiles)
+        top = max(view.top // chunk_size, 0)
+        bottom = min((view.bottom - 1) // chunk_size, (rows - 1) // self.chunk_tiles)
+
+        chunks = []
+        for key in ((col, row) for row in range(top, bottom + 1) for col in range(left, right + 1)):
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                chunk = self._chunks[key] = self._render_chunk(key)
+            else:
+                self._chunks.move_to_end(key)
+            chunks.append(chunk)
+        while len(self._chunks) > max(TERRAIN_CHUNK_CACHE, len(chunks)):
+            self._chunks.popitem(last=False)
+        return chunks
+
+    def _headquarters_area(self):
+        """司令部图片实际覆盖的区域（图片比碰撞矩形大）"""
+        return self.headquarters.image.get_rect(topleft=self.headquarters.rect.topleft)
+
+    def _render_dirty_cells(self):
+        """只重新渲染发生变化的格子，返回重绘区域列表（世界坐标）"""
+        size = self.tile_size
+        n = self.chunk_tiles
+        images = self._tile_images
+        rendered = []
+        for cell in self._dirty_cells:
+            chunk = self._chunks.get((cell[0] // n, cell[1] // n))
+            if chunk is None:
+                continue  # 区块已被丢弃，下次进入视口时整块重新渲染
+            area, layer, _ = chunk
+            cell_rect = pygame.Rect(cell[0] * size, cell[1] * size, size, size)
+            rendered.append(cell_rect)
+            layer.set_clip(cell_rect.move(-area.x, -area.y))
+            layer.fill(BLACK)
+            tile = self.get_tile_at(*cell)
+            if tile != TILE_FOREST and tile in images:
+                layer.blit(images[tile], (cell_rect.x - area.x, cell_rect.y - area.y))
+            if self.headquarters and self._headquarters_area().colliderect(cell_rect):
+                layer.blit(self.headquarters.image, self.headquarters.rect.move(-area.x, -area.y))
+            layer.set_clip(None)
+        self._dirty_cells.clear()
+        return rendered
+
+    def draw_terrain(self, surface, view=None):
+        """绘制视口内的地形区块（包含司令部），返回本次重新渲染的格子区域（屏幕坐标）
+
+        view 为屏幕对应的世界区域，默认从世界原点开始。
+        """
+        if view is None:
+            view = surface.get_rect()
+
+        # 司令部被摧毁后图片会被替换，只重绘它所在的格子
+        if self.headquarters and self.headquarters.image is not self._drawn_hq_image:
+            self.invalidate_rect(self._headquarters_area())
+            self._drawn_hq_image = self.headquarters.image
+
+        chunks = self._visible_chunks(view)
+        rendered = self._render_dirty_cells() if self._dirty_cells else []
+        surface.blits([(layer, (area.x - view.x, area.y - view.y)) for area, layer, _ in chunks], False)
+        return [rect.move(-view.x, -view.y) for rect in rendered if rect.colliderect(view)]
+
+    def draw_forest(self, surface, view=None):
+        """绘制视口内的森林覆盖层（在坦克之后绘制，坦克可以藏在森林下）"""
+        if view is None:
+            view = surface.get_rect()
+        surface.blits([(forest, (area.x - view.x, area.y - view.y))
+                       for area, _, forest in self._visible_chunks(view) if forest is not None], False)
+
+    def is_tile_blocking(self, x, y):
+        """检查指定位置的格子是否阻挡坦克移动（红砖、铁墙、河流、司令部、边界）"""
+        rows, cols = self.tiles.shape
+        if 0 <= y < rows and 0 <= x < cols:
+            return bool(self.tank_blocking[y, x])
+        return True
 
     def get_tile_at(self, x, y):
         """获取指定位置的地图元素类型"""
-        if 0 <= y < len(self.matrix) and 0 <= x < len(self.matrix[y]):
-            return self.matrix[y][x]
-        return TILE_EMPTY  # 超出边界视为空地
\ No newline at end of file
+        rows, cols = self.tiles.shape
+        if 0 <= y < rows and 0 <= x < cols:
+            return int(self.tiles[y, x])
+        return TILE_EMPTY  # 超出边界视为空地
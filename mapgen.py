@@ -0,0 +1,170 @@
+import sys
+import time
+import argparse
+
+import numpy as np
+from config import *
+from levels import level_path, format_level_text
+from pathfinding import FOOTPRINT  # 坦克占用的格子边长，通道和地形块都按这个尺寸生成
+
+
+def headquarters_cell(cols, rows):
+    """司令部所在格子 (列, 行)：底边居中"""
+    return cols // 2 - 1, rows - 1
+
+
+def approach_cell(cols, rows):
+    """司令部保护墙正上方的坦克停靠点（2x2 左上角格子）"""
+    hq_col, hq_row = headquarters_cell(cols, rows)
+    return hq_col - 1, hq_row - 3
+
+
+def player_cell(cols, rows):
+    """玩家出生点（2x2 左上角格子），在司令部前的空地上"""
+    hq_col, hq_row = headquarters_cell(cols, rows)
+    return hq_col + 3, hq_row - 3
+
+
+def spawn_cells(cols, rows):
+    """敌人出生点（2x2 左上角格子），沿顶边均匀分布"""
+    count = max(3, cols // MAPGEN_SPAWN_SPACING)
+    columns = np.linspace(1, cols - 1 - FOOTPRINT, count).astype(int)
+    return [(col, 1) for col in columns.tolist()]
+
+
+def _value_noise(rng, rows, cols, scale):
+    """双线性插值的值噪声，取值 [0, 1)"""
+    grid = rng.random((rows // scale + 2, cols // scale + 2))
+    ys = np.arange(rows) / scale
+    xs = np.arange(cols) / scale
+    y0 = ys.astype(int)
+    x0 = xs.astype(int)
+    fy = (ys - y0)[:, None]
+    fx = (xs - x0)[None, :]
+    top = grid[y0][:, x0] * (1 - fx) + grid[y0][:, x0 + 1] * fx
+    bottom = grid[y0 + 1][:, x0] * (1 - fx) + grid[y0 + 1][:, x0 + 1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def _carve(tiles, col0, row0, col1, row1):
+    """开出一段 2 格宽的直通道（森林保留，其余地形清空）"""
+    if col0 > col1:
+        col0, col1 = col1, col0
+    if row0 > row1:
+        row0, row1 = row1, row0
+    segment = tiles[row0:row1 + FOOTPRINT, col0:col1 + FOOTPRINT]
+    segment[segment != TILE_FOREST] = TILE_EMPTY
+
+
+def _carve_corridor(tiles, rng, start, goal):
+    """从 start 到 goal 开出一条曲折的通道（每段横向偏移后纵向前进）"""
+    col, row = start
+    goal_col, goal_row = goal
+    while row != goal_row:
+        step = int(rng.integers(MAPGEN_MAX_SEGMENT // 4, MAPGEN_MAX_SEGMENT + 1))
+        next_row = min(row + step, goal_row) if goal_row > row else max(row - step, goal_row)
+        _carve(tiles, col, row, col, next_row)
+        row = next_row
+        # 横向随机偏移，越接近目标越向目标列靠拢
+        low, high = sorted((col, goal_col))
+        next_col = int(rng.integers(max(1, low - MAPGEN_MAX_SEGMENT), min(tiles.shape[1] - 1 - FOOTPRINT, high + MAPGEN_MAX_SEGMENT) + 1))
+        _carve(tiles, col, row, next_col, row)
+        col = next_col
+    _carve(tiles, col, row, goal_col, row)
+
+
+def generate_level(cols, rows, seed=None):
+    """生成随机地图，返回 uint8 地形数组 (行, 列)，与关卡文件的格式相同
+
+    同一种子得到同一张地图；每个敌人出生点都有不经过阻挡地形的通道连到司令部前。
+    """
+    if cols < MAPGEN_MIN_SIZE or rows < MAPGEN_MIN_SIZE:
+        raise ValueError(f"地图尺寸至少为 {MAPGEN_MIN_SIZE}x{MAPGEN_MIN_SIZE}")
+    rng = np.random.default_rng(seed)
+
+    # 河流和森林按平滑噪声成片分布
+    tiles = np.zeros((rows, cols), dtype=np.uint8)
+    river = _value_noise(rng, rows, cols, MAPGEN_NOISE_SCALE)
+    forest = _value_noise(rng, rows, cols, MAPGEN_NOISE_SCALE)
+    tiles[forest > np.quantile(forest, 1 - MAPGEN_FOREST_FRACTION)] = TILE_FOREST
+    tiles[river > np.quantile(river, 1 - MAPGEN_RIVER_FRACTION)] = TILE_RIVER
+
+    # 其余空地随机放置 2x2 的红砖/铁墙块
+    blocks = rng.random((-(-rows // FOOTPRINT), -(-cols // FOOTPRINT)))
+    walls = np.full(blocks.shape, TILE_EMPTY, dtype=np.uint8)
+    walls[blocks < MAPGEN_BRICK_DENSITY + MAPGEN_IRON_DENSITY] = TILE_BRICK
+    walls[blocks < MAPGEN_IRON_DENSITY] = TILE_IRON
+    walls = walls.repeat(FOOTPRINT, axis=0).repeat(FOOTPRINT, axis=1)[:rows, :cols]
+    empty = tiles == TILE_EMPTY
+    tiles[empty] = walls[empty]
+
+    # 铁墙外框
+    tiles[0, :] = tiles[-1, :] = tiles[:, 0] = tiles[:, -1] = TILE_IRON
+
+    # 司令部前的空地（包括玩家出生点），司令部两侧和上方是红砖
+    hq_col, hq_row = headquarters_cell(cols, rows)
+    tiles[hq_row - 5:hq_row - 1, max(1, hq_col - 5):min(cols - 1, hq_col + 7)] = TILE_EMPTY
+    tiles[hq_row - 1, hq_col - 1:hq_col + 2] = TILE_BRICK
+    tiles[hq_row, hq_col - 1:hq_col + 2] = TILE_BRICK
+    tiles[hq_row, hq_col] = TILE_HEADQUARTERS
+
+    # 每个出生点开出一条通向司令部的通道
+    goal = approach_cell(cols, rows)
+    for spawn in spawn_cells(cols, rows):
+        _carve(tiles, *spawn, *spawn)
+        _carve_corridor(tiles, rng, spawn, goal)
+    return tiles
+
+
+def reachable_cells(tiles, start):
+    """从 start（2x2 左上角格子）出发坦克能到达的停靠点掩码 (行, 列)"""
+    free = (tiles == TILE_EMPTY) | (tiles == TILE_FOREST)
+    fits = free[:-1, :-1] & free[1:, :-1] & free[:-1, 1:] & free[1:, 1:]
+    reached = np.zeros_like(fits)
+    reached[start[1], start[0]] = fits[start[1], start[0]]
+    count = int(reached.sum())
+    while True:
+        grown = reached.copy()
+        grown[1:] |= reached[:-1]
+        grown[:-1] |= reached[1:]
+        grown[:, 1:] |= reached[:, :-1]
+        grown[:, :-1] |= reached[:, 1:]
+        grown &= fits
+        grown_count = int(grown.sum())
+        if grown_count == count:
+            return reached
+        reached, count = grown, grown_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TankWar 随机地图生成")
+    parser.add_argument('--size', default='512x512', help="地图尺寸 列x行")
+    parser.add_argument('--seed', type=int, default=None, help="随机种子")
+    parser.add_argument('--level', type=int, help="把生成结果保存为关卡文件 level_<编号>.txt")
+    parser.add_argument('--verify', action='store_true', help="检查所有出生点都能到达司令部")
+    args = parser.parse_args(argv)
+
+    cols, rows = (int(value) for value in args.size.lower().split('x'))
+    start = time.perf_counter()
+    tiles = generate_level(cols, rows, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"生成 {cols}x{rows} 地图，耗时 {elapsed * 1000:.1f}ms")
+
+    if args.verify:
+        reached = reachable_cells(tiles, approach_cell(cols, rows))
+        blocked = [spawn for spawn in spawn_cells(cols, rows) if not reached[spawn[1], spawn[0]]]
+        if blocked:
+            print(f"出生点无法到达司令部: {blocked}")
+            return 1
+        print(f"{len(spawn_cells(cols, rows))} 个出生点均可到达司令部")
+
+    if args.level is not None:
+        path = level_path(args.level)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(format_level_text(tiles, f"随机地图 {cols}x{rows} 种子 {args.seed}"))
+        print(f"已保存到 {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
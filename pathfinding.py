@@ -0,0 +1,543 @@
+import heapq
+from collections import OrderedDict
+
+import numpy as np
+from config import *
+
+
+# 坦克占用的格子数（边长）：坦克停在格点 (列, 行) 时覆盖 [列, 列+N) x [行, 行+N)
+FOOTPRINT = -(-TANK_SIZE // TILE_SIZE)
+# 坦克中心（炮弹经过）所在的是占用区域中的第几格
+MUZZLE_CELL = (TANK_SIZE // 2) // TILE_SIZE
+
+# 方向 -> 格点位移
+FLOW_STEPS = {UP: (0, -1), DOWN: (0, 1), LEFT: (-1, 0), RIGHT: (1, 0)}
+
+UNREACHABLE = 1 << 30
+NO_DIRECTION = 255
+
+
+def leading_cells(col, row, direction):
+    """坦克从格点 (col, row) 朝 direction 前进一格时新进入的格子，第 MUZZLE_CELL 个在炮弹射线上"""
+    if direction == UP:
+        return [(col + i, row - 1) for i in range(FOOTPRINT)]
+    if direction == DOWN:
+        return [(col + i, row + FOOTPRINT) for i in range(FOOTPRINT)]
+    if direction == LEFT:
+        return [(col - 1, row + i) for i in range(FOOTPRINT)]
+    return [(col + FOOTPRINT, row + i) for i in range(FOOTPRINT)]
+
+
+def step_cost(game_map, col, row, direction):
+    """坦克从格点朝 direction 前进一格的代价：红砖需要先开炮，代价更高；其他阻挡地形不可通过"""
+    cost = 1
+    for i, (x, y) in enumerate(leading_cells(col, row, direction)):
+        tile = game_map.get_tile_at(x, y)
+        if tile == TILE_BRICK:
+            cost += FLOW_BRICK_COST if i == MUZZLE_CELL else FLOW_SIDE_BRICK_COST
+        elif game_map.is_tile_blocking(x, y):
+            return UNREACHABLE
+    return cost
+
+
+class StepCosts:
+    """每个格点朝四个方向前进一格的代价表（按方向存放的扁平列表，下标为 行 * 列数 + 列）"""
+
+    def __init__(self, game_map):
+        self.map = game_map
+        self.rows, self.cols = game_map.tiles.shape
+        self.costs = {}
+        self._build()
+
+    def _build(self):
+        """向量化计算所有格点四个方向的代价"""
+        tiles = self.map.tiles
+        brick = tiles == TILE_BRICK
+        wall = self.map.tank_blocking & ~brick
+        # 四周补一圈不可通过的格子，走出网格的方向自然不可达
+        pad = FOOTPRINT
+        brick = np.pad(brick, pad)
+        wall = np.pad(wall, pad, constant_values=True)
+        rows, cols = self.rows, self.cols
+
+        for direction in FLOW_STEPS:
+            blocked = np.zeros((rows, cols), dtype=bool)
+            cost = np.ones((rows, cols), dtype=np.int64)
+            for i, (col, row) in enumerate(leading_cells(0, 0, direction)):
+                window = (slice(pad + row, pad + row + rows), slice(pad + col, pad + col + cols))
+                blocked |= wall[window]
+                cost += brick[window] * (FLOW_BRICK_COST if i == MUZZLE_CELL else FLOW_SIDE_BRICK_COST)
+            cost[blocked] = UNREACHABLE
+            self.costs[direction] = cost.ravel().tolist()
+
+    def rebuild(self):
+        """地形整体变化（如重开一局）后重新计算全部代价"""
+        self._build()
+
+    def update_cell(self, x, y):
+        """格子 (x, y) 的地形变化后，重新计算前进时会进入该格子的代价
+
+        返回发生变化的 [(方向, 格点下标, 旧代价, 新代价), ...]
+        """
+        changes = []
+        for direction in FLOW_STEPS:
+            for cell_col, cell_row in leading_cells(0, 0, direction):
+                col = x - cell_col
+                row = y - cell_row
+                if not (0 <= col < self.cols and 0 <= row < self.rows):
+                    continue
+                index = row * self.cols + col
+                old_cost = self.costs[direction][index]
+                new_cost = step_cost(self.map, col, row, direction)
+                if new_cost != old_cost:
+                    self.costs[direction][index] = new_cost
+                    changes.append((direction, index, old_cost, new_cost))
+        return changes
+
+
+class FlowBuild:
+    """分帧进行中的流场重建"""
+
+    __slots__ = ('target', 'goal_cells', 'distance', 'flow', 'heap', 'costs', 'changed')
+
+    def __init__(self, target, goal_cells, distance, flow, heap, costs):
+        self.target = target
+        self.goal_cells = goal_cells
+        self.distance = distance
+        self.flow = flow
+        self.heap = heap
+        self.costs = costs  # 开始重建时的代价表副本
+        self.changed = set()  # 重建期间代价变化的边 (方向, 格点下标)
+
+
+class FlowField:
+    """朝一个目标的流场：每个格点保存到目标的代价和下一步方向，敌人查表 O(1)
+
+    代价用反向 Dijkstra 从目标周围的格点算出。红砖可以通过但代价更高（需要先开炮），
+    铁墙、河流、司令部和网格外不可通过。地形变化时只修复受影响的格点，不重新计算整个流场。
+    目标移动时可以用 retarget/advance 分帧重建，重建完成前敌人继续使用旧流场。
+    """
+
+    def __init__(self, game_map, target=None):
+        self.map = game_map
+        self.rows, self.cols = game_map.tiles.shape
+        size = self.rows * self.cols
+        self.distance = [UNREACHABLE] * size
+        self.flow = bytearray([NO_DIRECTION]) * size
+        self.step_costs = StepCosts(game_map)
+        self.costs = self.step_costs.costs  # 方向 -> 每个格点朝该方向前进一格的代价
+        self.target = None  # 目标矩形（像素）
+        self.goal_cells = ()
+        self._pending = None  # 分帧进行中的重建（FlowBuild）
+        self.rebuilds = 0  # 完整重建次数
+        self.retargets = 0  # 分帧重建次数
+        self.repairs = 0  # 增量修复次数
+        game_map.add_tile_listener(self._on_tile_changed)
+        if target is not None:
+            self.set_target(target)
+
+    def edge_cost(self, col, row, direction):
+        """从格点朝 direction 前进一格的代价"""
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return UNREACHABLE
+        return self.costs[direction][row * self.cols + col]
+
+    def _goal_cells(self, rect):
+        """占用区域与目标格相邻或重叠的格点都算到达"""
+        size = self.map.tile_size
+        col = rect.centerx // size
+        row = rect.centery // size
+        return tuple(
+            (c, r)
+            for r in range(row - FOOTPRINT, row + 2)
+            for c in range(col - FOOTPRINT, col + 2)
+            if 0 <= c < self.cols and 0 <= r < self.rows
+        )
+
+    def _seed(self, goal_cells):
+        """目标格点距离为 0 的初始流场和堆"""
+        size = self.rows * self.cols
+        distance = [UNREACHABLE] * size
+        flow = bytearray([NO_DIRECTION]) * size
+        heap = []
+        for col, row in goal_cells:
+            index = row * self.cols + col
+            distance[index] = 0
+            heap.append((0, index))
+        heapq.heapify(heap)
+        return distance, flow, heap
+
+    def set_target(self, rect):
+        """设置目标矩形并立即重建；目标所在格点没变时不重建"""
+        self.target = rect
+        self._pending = None
+        goal_cells = self._goal_cells(rect)
+        if goal_cells != self.goal_cells:
+            self.goal_cells = goal_cells
+            self.rebuild()
+
+    def retarget(self, rect):
+        """开始朝新目标分帧重建（由 advance 推进），完成前敌人仍使用旧流场
+
+        已有重建在进行时不重新开始，否则目标一直移动的大地图上永远建不完；
+        完成后下一次 retarget 再追上目标的最新位置。
+        """
+        if self._pending is not None:
+            return
+        goal_cells = self._goal_cells(rect)
+        if goal_cells == self.goal_cells:
+            self.target = rect
+            return
+        self.retargets += 1
+        distance, flow, heap = self._seed(goal_cells)
+        # 按开始时的代价计算；期间变化的边记下来，换上新流场后再增量修复
+        costs = {direction: list(cost) for direction, cost in self.costs.items()}
+        self._pending = FlowBuild(rect, goal_cells, distance, flow, heap, costs)
+
+    def advance(self, budget=FLOW_BUILD_STEPS_PER_TICK):
+        """分帧重建最多处理 budget 个格点，完成后换上新流场；返回是否仍有重建在进行"""
+        build = self._pending
+        if build is None:
+            return False
+        if self._propagate(build.heap, build.distance, build.flow, build.costs, budget):
+            return True
+
+        self._pending = None
+        self.target = build.target
+        self.goal_cells = build.goal_cells
+        self.distance = build.distance
+        self.flow = build.flow
+        costs = self.costs
+        changes = []
+        for direction, index in build.changed:
+            old_cost = build.costs[direction][index]
+            new_cost = costs[direction][index]
+            if new_cost != old_cost:
+                changes.append((direction, index, old_cost, new_cost))
+        self._repair(changes)
+        return False
+
+    def reset_terrain(self):
+        """地形整体恢复（重开一局）后重新计算代价表和流场"""
+        self._pending = None
+        self.step_costs.rebuild()
+        self.rebuild()
+
+    def rebuild(self):
+        """从目标重新计算整个流场"""
+        self.rebuilds += 1
+        self.distance, self.flow, heap = self._seed(self.goal_cells)
+        self._propagate(heap, self.distance, self.flow, self.costs)
+
+    def _prefers(self, distance, flow, source, dist, index):
+        """代价相同时 source 是否应改为指向 index（距离为 dist）
+
+        取 (距离, 下标) 最小的下一格，与完整重建时的出堆顺序一致，增量修复的结果因此与重建完全相同。
+        """
+        dc, dr = FLOW_STEPS[flow[source]]
+        current = source + dr * self.cols + dc
+        return (dist, index) < (distance[current], current)
+
+    def _propagate(self, heap, distance, flow, costs, budget=None):
+        """反向 Dijkstra：从堆中的格点向能走到它们的格点扩展
+
+        给出 budget 时最多出堆 budget 次，返回堆中是否还有未处理的格点。
+        """
+        cols = self.cols
+        rows = self.rows
+        prefers = self._prefers
+        steps = [(direction, dc, dr, costs[direction]) for direction, (dc, dr) in FLOW_STEPS.items()]
+        remaining = UNREACHABLE if budget is None else budget
+        while heap:
+            if remaining <= 0:
+                return True
+            remaining -= 1
+            dist, index = heapq.heappop(heap)
+            if dist > distance[index]:
+                continue
+            row, col = divmod(index, cols)
+            for direction, dc, dr, cost in steps:
+                # 格点 source 朝 direction 前进一格到达当前格点
+                source_col = col - dc
+                source_row = row - dr
+                if not (0 <= source_col < cols and 0 <= source_row < rows):
+                    continue
+                source = index - dr * cols - dc
+                step = cost[source]
+                if step >= UNREACHABLE:
+                    continue
+                new_dist = dist + step
+                if new_dist < distance[source]:
+                    distance[source] = new_dist
+                    flow[source] = direction
+                    heapq.heappush(heap, (new_dist, source))
+                elif new_dist == distance[source] and flow[source] != direction and \
+                        prefers(distance, flow, source, dist, index):
+                    flow[source] = direction  # 距离不变，不需要继续扩展
+        return False
+
+    def _on_tile_changed(self, x, y):
+        """地形变化：更新受影响格点的代价并增量修复流场"""
+        changes = self.step_costs.update_cell(x, y)
+        if changes and self._pending is not None:
+            self._pending.changed.update((direction, index) for direction, index, _, _ in changes)
+        self._repair(changes)
+
+    def _repair(self, changes):
+        """按变化的边 [(方向, 格点下标, 旧代价, 新代价), ...] 修复流场：先处理代价升高，再处理代价降低"""
+        if not changes or not self.goal_cells:
+            return
+        raised = [change for change in changes if change[3] > change[2]]
+        lowered = [change for change in changes if change[3] < change[2]]
+        if raised:
+            self._repair_raised(raised)
+        if lowered:
+            self._repair_lowered(lowered)
+
+    def _repair_raised(self, changes):
+        """代价升高（新增障碍）：作废沿这些边前进的格点及流场中所有经过它们的格点，再从周围格点重新计算"""
+        distance = self.distance
+        flow = self.flow
+        costs = self.costs
+        cols = self.cols
+        rows = self.rows
+        stack = [index for direction, index, _, _ in changes if flow[index] == direction]
+        invalid = set()
+        while stack:
+            index = stack.pop()
+            if index in invalid:
+                continue
+            invalid.add(index)
+            row, col = divmod(index, cols)
+            for direction, (dc, dr) in FLOW_STEPS.items():
+                if 0 <= col - dc < cols and 0 <= row - dr < rows:
+                    source = index - dr * cols - dc
+                    if flow[source] == direction:
+                        stack.append(source)
+        if not invalid:
+            return  # 变化的边都不在流场上，距离不受影响
+
+        for index in invalid:
+            distance[index] = UNREACHABLE
+            flow[index] = NO_DIRECTION
+        # 每个作废的格点先从未受影响的相邻格点取最优值，再一起向外扩展
+        heap = []
+        for index in invalid:
+            row, col = divmod(index, cols)
+            best = None
+            for direction, (dc, dr) in FLOW_STEPS.items():
+                if not (0 <= col + dc < cols and 0 <= row + dr < rows):
+                    continue
+                target = index + dr * cols + dc
+                step = costs[direction][index]
+                if step >= UNREACHABLE or distance[target] >= UNREACHABLE:
+                    continue
+                key = (distance[target] + step, distance[target], target)
+                if best is None or key < best[0]:
+                    best = (key, direction)
+            if best is not None:
+                distance[index] = best[0][0]
+                flow[index] = best[1]
+                heap.append((distance[index], index))
+        self.repairs += 1
+        heapq.heapify(heap)
+        self._propagate(heap, distance, flow, costs)
+
+    def _repair_lowered(self, changes):
+        """代价降低（障碍被摧毁）：从变化的边开始向外修复，距离只会变小"""
+        distance = self.distance
+        flow = self.flow
+        heap = []
+        cols = self.cols
+        for direction, index, _, new_cost in changes:
+            dc, dr = FLOW_STEPS[direction]
+            row, col = divmod(index, cols)
+            if not (0 <= col + dc < cols and 0 <= row + dr < self.rows):
+                continue
+            target = index + dr * cols + dc
+            new_dist = distance[target] + new_cost
+            if new_dist < distance[index]:
+                distance[index] = new_dist
+                flow[index] = direction
+                heap.append((new_dist, index))
+            elif (new_dist == distance[index] < UNREACHABLE and flow[index] != direction and
+                  flow[index] != NO_DIRECTION and self._prefers(distance, flow, index, distance[target], target)):
+                flow[index] = direction
+        if heap:
+            self.repairs += 1
+            heapq.heapify(heap)
+            self._propagate(heap, distance, flow, self.costs)
+
+    def direction_at(self, col, row):
+        """格点的下一步方向，已在目标处或不可达时返回 None"""
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return None
+        direction = self.flow[row * self.cols + col]
+        return None if direction == NO_DIRECTION else direction
+
+    def distance_at(self, col, row):
+        """格点到目标的代价，不可达时返回 UNREACHABLE"""
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            return UNREACHABLE
+        return self.distance[row * self.cols + col]
+
+
+class CachedPath:
+    """一条缓存的路径；所经过的地形变化后 valid 变为 False，持有者需要重新查询"""
+
+    __slots__ = ('key', 'cells', 'valid')
+
+    def __init__(self, key, cells):
+        self.key = key  # (起点格点, 终点格点)
+        self.cells = cells  # 从起点到终点的格点列表，不可达时为空
+        self.valid = True
+
+
+class PathService:
+    """带缓存的 A* 寻路服务，供需要单独目标的敌人使用（如抢夺果实）
+
+    按坦克占用区域（FOOTPRINT x FOOTPRINT 格）在格点上搜索，代价与流场一致。
+    结果按 (起点, 终点) 放在 LRU 缓存中；地形变化时只作废经过该格子的路径
+    （以及所有不可达的结果）。每帧的搜索次数有预算，超出的查询推迟到下一帧。
+    """
+
+    def __init__(self, game_map, capacity=PATH_CACHE_SIZE, budget=PATH_QUERIES_PER_FRAME):
+        self.map = game_map
+        self.rows, self.cols = game_map.tiles.shape
+        self.step_costs = StepCosts(game_map)
+        self.capacity = capacity
+        self.budget = budget  # 每帧最多执行的搜索次数
+        self.remaining = budget
+        self.cache = OrderedDict()  # (起点, 终点) -> CachedPath，按最近使用排序
+        self.cell_paths = {}  # 格子 -> 经过该格子的缓存键集合
+        self.unreachable = set()  # 结果为不可达的缓存键
+        self.hits = 0
+        self.misses = 0
+        self.deferred = 0  # 因预算用完被推迟的查询数
+        self.invalidated = 0
+        game_map.add_tile_listener(self._on_tile_changed)
+
+    def begin_frame(self):
+        """每帧开始时恢复搜索预算"""
+        self.remaining = self.budget
+
+    def find_path(self, start, goal):
+        """查询从 start 到 goal 格点的路径，返回 CachedPath；本帧预算用完时返回 None"""
+        key = (start, goal)
+        path = self.cache.get(key)
+        if path is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return path
+        if self.remaining <= 0:
+            self.deferred += 1
+            return None
+
+        self.remaining -= 1
+        self.misses += 1
+        path = CachedPath(key, self._search(start, goal))
+        self._store(path)
+        return path
+
+    def clear(self):
+        """清空缓存并重新计算代价表（地形整体恢复后调用）"""
+        for path in self.cache.values():
+            path.valid = False
+        self.cache.clear()
+        self.cell_paths.clear()
+        self.unreachable.clear()
+        self.step_costs.rebuild()
+
+    def _store(self, path):
+        key = path.key
+        self.cache[key] = path
+        if path.cells:
+            for cell in self._covered_cells(path.cells):
+                self.cell_paths.setdefault(cell, set()).add(key)
+        else:
+            self.unreachable.add(key)
+        if len(self.cache) > self.capacity:
+            _, oldest = self.cache.popitem(last=False)
+            self._forget(oldest)
+
+    def _forget(self, path):
+        """把已移出缓存的路径从格子索引中删除并标记为失效"""
+        path.valid = False
+        if not path.cells:
+            self.unreachable.discard(path.key)
+            return
+        for cell in self._covered_cells(path.cells):
+            keys = self.cell_paths.get(cell)
+            if keys is not None:
+                keys.discard(path.key)
+                if not keys:
+                    del self.cell_paths[cell]
+
+    @staticmethod
+    def _covered_cells(cells):
+        """路径上坦克占用过的所有格子"""
+        covered = set()
+        for col, row in cells:
+            for dr in range(FOOTPRINT):
+                for dc in range(FOOTPRINT):
+                    covered.add((col + dc, row + dr))
+        return covered
+
+    def _on_tile_changed(self, x, y):
+        """地形变化：作废经过该格子的路径和所有不可达结果"""
+        self.step_costs.update_cell(x, y)
+        keys = set(self.cell_paths.get((x, y), ())) | self.unreachable
+        for key in keys:
+            path = self.cache.pop(key)
+            self._forget(path)
+            self.invalidated += 1
+
+    def _search(self, start, goal):
+        """A* 搜索（曼哈顿距离启发，每步代价至少为 1），返回格点列表"""
+        cols, rows = self.cols, self.rows
+        start_col, start_row = start
+        goal_col, goal_row = goal
+        if not (0 <= start_col < cols and 0 <= start_row < rows and 0 <= goal_col < cols and 0 <= goal_row < rows):
+            return []
+        start_index = start_row * cols + start_col
+        goal_index = goal_row * cols + goal_col
+        costs = self.step_costs.costs
+        steps = [(dc, dr, dr * cols + dc, costs[direction]) for direction, (dc, dr) in FLOW_STEPS.items()]
+
+        best = {start_index: 0}
+        came_from = {}
+        heap = [(abs(goal_col - start_col) + abs(goal_row - start_row), 0, start_index)]
+        while heap:
+            _, dist, index = heapq.heappop(heap)
+            if index == goal_index:
+                cells = []
+                while index != start_index:
+                    cells.append(divmod(index, cols)[::-1])
+                    index = came_from[index]
+                cells.append(start)
+                cells.reverse()
+                return cells
+            if dist > best[index]:
+                continue
+            row, col = divmod(index, cols)
+            for dc, dr, offset, cost in steps:
+                step = cost[index]
+                if step >= UNREACHABLE:
+                    continue  # 代价表已保证不会走出网格
+                new_dist = dist + step
+                neighbor = index + offset
+                if new_dist < best.get(neighbor, UNREACHABLE):
+                    best[neighbor] = new_dist
+                    came_from[neighbor] = index
+                    estimate = abs(goal_col - col - dc) + abs(goal_row - row - dr)
+                    heapq.heappush(heap, (new_dist + estimate, new_dist, neighbor))
+        return []
+
+    def stats(self):
+        return {
+            'entries': len(self.cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'deferred': self.deferred,
+            'invalidated': self.invalidated,
+        }
@@ -0,0 +1,143 @@
+import csv
+import json
+import time
+from array import array
+
+import pygame
+from config import *
+from hud import HudLabel
+
+
+class FrameProfiler:
+    """逐帧分阶段计时器
+
+    各阶段耗时保存在固定大小的环形缓冲区中（每个阶段一个 array），
+    不启用时场景持有 None，计时代码完全不会执行。
+    """
+
+    def __init__(self, size=PROFILER_BUFFER_FRAMES):
+        self.size = size
+        self.frame_times = array('d', bytes(8 * size))  # 每帧真实耗时（毫秒）
+        self.phase_times = {}  # 阶段名 -> array，每帧该阶段耗时（毫秒）
+        self.frame_numbers = array('q', bytes(8 * size))
+        self.index = 0  # 下一帧写入的位置
+        self.count = 0  # 缓冲区内有效帧数
+        self.frame = 0  # 已记录的总帧数
+        self._current = {}  # 本帧已测得的阶段耗时
+        self._frame_start = time.perf_counter()
+
+        self.overlay_visible = False
+        self._font = None
+        self._overlay = None
+        self._labels = []  # 叠加层每行的文字（数值不变时不重新渲染）
+
+    def measure(self, phase, func, *args):
+        """执行 func(*args) 并把耗时累加到本帧的 phase 阶段"""
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        self._current[phase] = self._current.get(phase, 0.0) + elapsed
+        return result
+
+    def end_frame(self):
+        """结束当前帧，把各阶段耗时写入环形缓冲区"""
+        now = time.perf_counter()
+        index = self.index
+        self.frame_times[index] = (now - self._frame_start) * 1000.0
+        self.frame_numbers[index] = self.frame
+        self._frame_start = now
+
+        current = self._current
+        for phase in current:
+            if phase not in self.phase_times:
+                self.phase_times[phase] = array('d', bytes(8 * self.size))
+        for phase, samples in self.phase_times.items():
+            samples[index] = current.get(phase, 0.0)
+        current.clear()
+
+        self.index = (index + 1) % self.size
+        self.count = min(self.count + 1, self.size)
+        self.frame += 1
+
+    def _ordered_indices(self):
+        """按时间先后返回缓冲区中的有效位置"""
+        start = (self.index - self.count) % self.size
+        return [(start + i) % self.size for i in range(self.count)]
+
+    def averages(self, frames=PROFILER_OVERLAY_WINDOW):
+        """最近 frames 帧中每个阶段的平均耗时（毫秒）"""
+        indices = self._ordered_indices()[-frames:]
+        if not indices:
+            return {}
+        result = {phase: sum(samples[i] for i in indices) / len(indices)
+                  for phase, samples in self.phase_times.items()}
+        result['frame'] = sum(self.frame_times[i] for i in indices) / len(indices)
+        return result
+
+    def histogram(self, bucket_ms=PROFILER_HISTOGRAM_BUCKET_MS, buckets=PROFILER_HISTOGRAM_BUCKETS):
+        """帧耗时直方图：最后一个桶包含所有超出范围的帧"""
+        counts = [0] * buckets
+        for i in self._ordered_indices():
+            counts[min(int(self.frame_times[i] // bucket_ms), buckets - 1)] += 1
+        return counts
+
+    def records(self):
+        """按时间顺序产生每帧记录"""
+        phases = list(self.phase_times)
+        for i in self._ordered_indices():
+            record = {'frame': self.frame_numbers[i], 'frame_ms': round(self.frame_times[i], 4)}
+            for phase in phases:
+                record[phase] = round(self.phase_times[phase][i], 4)
+            yield record
+
+    def export(self, path):
+        """导出缓冲区内的帧记录，按扩展名选择 CSV 或 JSONL"""
+        if path.endswith('.csv'):
+            self.export_csv(path)
+        else:
+            self.export_jsonl(path)
+
+    def export_csv(self, path):
+        fields = ['frame', 'frame_ms'] + list(self.phase_times)
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fields)
+            writer.writeheader()
+            writer.writerows(self.records())
+
+    def export_jsonl(self, path):
+        with open(path, 'w') as f:
+            for record in self.records():
+                f.write(json.dumps(record) + '\n')
+
+    def toggle_overlay(self):
+        self.overlay_visible = not self.overlay_visible
+
+    def draw_overlay(self, screen):
+        """绘制各阶段耗时和帧耗时直方图，返回绘制区域"""
+        if self._font is None:
+            self._font = pygame.font.SysFont(None, 18)
+            self._overlay = pygame.Surface(PROFILER_OVERLAY_SIZE, pygame.SRCALPHA)
+
+        overlay = self._overlay
+        overlay.fill((0, 0, 0, 170))
+        y = 4
+        for row, (phase, ms) in enumerate(self.averages().items()):
+            if row == len(self._labels):
+                self._labels.append(HudLabel(self._font, "{}: {:.1f} ms", WHITE, (6, y)))
+            # 取整到 0.1 毫秒，重复出现的文字直接取缓存
+            self._labels[row].draw(overlay, phase, round(ms, 1))
+            y += 14
+
+        # 帧耗时直方图
+        counts = self.histogram()
+        peak = max(counts) or 1
+        width, height = overlay.get_size()
+        bar_width = (width - 12) // len(counts)
+        bottom = height - 4
+        max_bar = bottom - y - 4
+        for i, count in enumerate(counts):
+            bar_height = max_bar * count // peak
+            color = GREEN if (i + 1) * PROFILER_HISTOGRAM_BUCKET_MS <= 1000 / FPS else RED
+            pygame.draw.rect(overlay, color, (6 + i * bar_width, bottom - bar_height, bar_width - 1, bar_height))
+
+        return screen.blit(overlay, (screen.get_width() - width - 4, 4))
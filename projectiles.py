@@ -1,66 +1,303 @@
+import numpy as np
 import pygame
 from config import *
 from resources import ResourceLoader
 
 
-class Bullet(pygame.sprite.Sprite):
-    """炮弹类"""
-
-    def __init__(self, x, y, direction, level):
-        # 创建炮弹图像
-        super().__init__()
-        self.direction = direction
-        self.level = level
-        self.speed = BULLET_SPEED * level  # 炮弹速度由发射坦克等级决定
-        self.damage = BULLET_DAMAGE
-
-        # bullet_filename = self._get_image_filename(direction)
-        # bullet_image = self.load_structure_image(bullet_filename, RED)
-        # bullet_image = pygame.transform.scale(bullet_image, (BULLET_SIZE, BULLET_SIZE))
-        # self.image = bullet_image
-        # self.rect = self.image.get_rect(topleft=(x, y))
-        # 获取子弹图像路径（假设方向与文件名对应，如"bullet_up.png"）
-        bullet_filename = self._get_image_filename(direction)
-
-        # 关键：使用 convert_alpha() 保留透明通道
-        # bullet_image = self.load_structure_image(bullet_filename, RED).convert_alpha()
-        bullet_image = pygame.image.load(bullet_filename).convert_alpha()
-        bullet_image = pygame.transform.scale(bullet_image, (BULLET_SIZE, BULLET_SIZE))  # 按需缩放
-
-        self.image = bullet_image
-        self.rect = self.image.get_rect(topleft=(x, y))
-
-
-        # 记录初始位置（用于调试）
-        self.start_x = x
-        self.start_y = y
-
-    def update(self):
-        """更新炮弹位置"""
-        # 使用 rect 的移动方法直接更新位置
-        if self.direction == UP:
-            self.rect.y -= self.speed
-        elif self.direction == DOWN:
-            self.rect.y += self.speed
-        elif self.direction == LEFT:
-            self.rect.x -= self.speed
-        elif self.direction == RIGHT:
-            self.rect.x += self.speed
-
-        # 检查是否超出屏幕边界（使用 rect 直接检测）
-        if not self.rect.colliderect(pygame.display.get_surface().get_rect()):
-            return False
-
-        return True
-
-
-
-    def _get_image_filename(self, direction):
-        if direction == UP:
-            return './images/bullet_up.png'
-        elif direction == DOWN:
-            return './images/bullet_down.png'
-        elif direction == LEFT:
-            return './images/bullet_left.png'
-        elif direction == RIGHT:
-            return './images/bullet_right.png'
+# 方向与炮弹图片的对应关系
+BULLET_IMAGE_FILES = {
+    UP: 'bullet_up.png',
+    DOWN: 'bullet_down.png',
+    LEFT: 'bullet_left.png',
+    RIGHT: 'bullet_right.png'
+}
+
+# 方向 -> 单位位移（按方向常量下标访问）
+DIRECTION_DX = np.zeros(4, dtype=np.int32)
+DIRECTION_DY = np.zeros(4, dtype=np.int32)
+for _direction, (_dx, _dy) in {UP: (0, -1), DOWN: (0, 1), LEFT: (-1, 0), RIGHT: (1, 0)}.items():
+    DIRECTION_DX[_direction] = _dx
+    DIRECTION_DY[_direction] = _dy
+
+# 方向 -> 沿移动轴前进一格的步长，以及炮弹最靠后/最靠前一列像素相对坐标的偏移
+DIRECTION_STEP = DIRECTION_DX + DIRECTION_DY
+REAR_EDGE = np.where(DIRECTION_STEP > 0, 0, BULLET_SIZE - 1)
+FRONT_EDGE = np.where(DIRECTION_STEP > 0, BULLET_SIZE - 1, 0)
+
+
+class Bullet:
+    """炮弹句柄：炮弹数据保存在 BulletEngine 的数组中，这里只记录槽位和发射者
+
+    每个槽位对应一个固定的句柄对象，开火时不分配任何对象。
+    """
+
+    __slots__ = ('engine', 'slot', 'owner')
+
+    # 四个方向的炮弹图片，启动时加载一次，所有炮弹共享
+    _images = {}
+
+    def __init__(self, engine, slot):
+        self.engine = engine
+        self.slot = slot
+        self.owner = None  # 发射炮弹的坦克
+
+    @staticmethod
+    def preload_images():
+        """加载并缩放四个方向的炮弹图片（保留透明通道），重复调用无副作用"""
+        if Bullet._images:
+            return
+        for direction, filename in BULLET_IMAGE_FILES.items():
+            image, _ = ResourceLoader.load_image(filename, size=(BULLET_SIZE, BULLET_SIZE), alpha=True)
+            Bullet._images[direction] = image
+
+    @property
+    def rect(self):
+        engine = self.engine
+        return pygame.Rect(int(engine.x[self.slot]), int(engine.y[self.slot]), BULLET_SIZE, BULLET_SIZE)
+
+    @property
+    def direction(self):
+        return int(self.engine.direction[self.slot])
+
+    @property
+    def image(self):
+        return Bullet._images[self.direction]
+
+    @property
+    def damage(self):
+        return int(self.engine.damage[self.slot])
+
+    @property
+    def speed(self):
+        return int(self.engine.speed[self.slot])
+
+    @speed.setter
+    def speed(self, value):
+        self.engine.speed[self.slot] = value
+
+
+class BulletEngine:
+    """炮弹引擎：所有炮弹以结构数组形式保存（x, y, 方向, 速度, 阵营, 伤害），每帧批量推进
+
+    出界剔除和地形查询都是对整个数组的向量化运算，
+    只有真正命中的少数炮弹才回到 Python 中逐个处理。
+    """
+
+    def __init__(self, game_map, bounds=None, capacity=BULLET_POOL_SIZE):
+        Bullet.preload_images()
+        self.map = game_map
+        # 炮弹的有效范围，超出即失效（不依赖显示窗口，无头模式也可用）
+        self.bounds = bounds or pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        self.capacity = 0
+        self.x = np.zeros(0, dtype=np.int32)
+        self.y = np.zeros(0, dtype=np.int32)
+        self.prev_x = np.zeros(0, dtype=np.int32)  # 本帧移动前的位置（扫掠碰撞用）
+        self.prev_y = np.zeros(0, dtype=np.int32)
+        self.direction = np.zeros(0, dtype=np.int8)
+        self.speed = np.zeros(0, dtype=np.int32)
+        self.team = np.zeros(0, dtype=np.int8)
+        self.damage = np.zeros(0, dtype=np.int32)
+        self.alive = np.zeros(0, dtype=bool)
+        self.handles = []
+        self.free = []  # 空闲槽位
+        self.count = 0  # 存活炮弹数
+        self._grow(capacity)
+
+    def _grow(self, capacity):
+        """扩容到 capacity 个槽位"""
+        extra = capacity - self.capacity
+        self.x = np.concatenate((self.x, np.zeros(extra, dtype=np.int32)))
+        self.y = np.concatenate((self.y, np.zeros(extra, dtype=np.int32)))
+        self.prev_x = np.concatenate((self.prev_x, np.zeros(extra, dtype=np.int32)))
+        self.prev_y = np.concatenate((self.prev_y, np.zeros(extra, dtype=np.int32)))
+        self.direction = np.concatenate((self.direction, np.zeros(extra, dtype=np.int8)))
+        self.speed = np.concatenate((self.speed, np.zeros(extra, dtype=np.int32)))
+        self.team = np.concatenate((self.team, np.zeros(extra, dtype=np.int8)))
+        self.damage = np.concatenate((self.damage, np.zeros(extra, dtype=np.int32)))
+        self.alive = np.concatenate((self.alive, np.zeros(extra, dtype=bool)))
+        self.handles.extend(Bullet(self, slot) for slot in range(self.capacity, capacity))
+        # 倒序压栈，优先使用小槽位
+        self.free.extend(range(capacity - 1, self.capacity - 1, -1))
+        self.capacity = capacity
+
+    def spawn(self, owner, x, y, direction, level):
+        """发射一颗炮弹，加入发射者的炮弹列表并返回句柄"""
+        if not self.free:
+            self._grow(max(self.capacity * 2, 1))
+        slot = self.free.pop()
+        self.x[slot] = self.prev_x[slot] = x
+        self.y[slot] = self.prev_y[slot] = y
+        self.direction[slot] = direction
+        self.speed[slot] = BULLET_SPEED * level  # 炮弹速度由发射坦克等级决定
+        self.team[slot] = owner.team
+        self.damage[slot] = BULLET_DAMAGE
+        self.alive[slot] = True
+        self.count += 1
+
+        bullet = self.handles[slot]
+        bullet.owner = owner
+        owner.bullets.append(bullet)
+        return bullet
+
+    def kill(self, bullet):
+        """移除炮弹并归还槽位"""
+        slot = bullet.slot
+        if not self.alive[slot]:
+            return
+        self.alive[slot] = False
+        self.free.append(slot)
+        self.count -= 1
+        bullet.owner.bullets.remove(bullet)
+        bullet.owner = None
+
+    def kill_owned(self, owner):
+        """移除某辆坦克的所有炮弹（如坦克被摧毁）"""
+        for bullet in owner.bullets[:]:
+            self.kill(bullet)
+
+    def clear(self):
+        """移除所有炮弹，槽位恢复到新建时的分配顺序（重开一局时复用炮弹池）"""
+        for slot in np.flatnonzero(self.alive).tolist():
+            self.kill(self.handles[slot])
+        self.free = list(range(self.capacity - 1, -1, -1))
+
+    def step(self):
+        """批量推进所有炮弹，返回存活的槽位；移动前的位置保存在 prev_x/prev_y 中
+
+        出界的炮弹不在这里剔除：它们在离开前仍可能撞上东西，碰撞处理完后再调用 cull()。
+        """
+        slots = np.flatnonzero(self.alive)
+        if not slots.size:
+            return slots
+
+        x = self.x[slots]
+        y = self.y[slots]
+        self.prev_x[slots] = x
+        self.prev_y[slots] = y
+        direction = self.direction[slots]
+        speed = self.speed[slots]
+        self.x[slots] = x + DIRECTION_DX[direction] * speed
+        self.y[slots] = y + DIRECTION_DY[direction] * speed
+        return slots
+
+    def cull(self, slots):
+        """移除 slots 中仍存活但已离开有效范围的炮弹"""
+        slots = slots[self.alive[slots]]
+        if not slots.size:
+            return
+        inside = self._overlaps(self.x[slots], self.y[slots], self.bounds)
+        for slot in slots[~inside].tolist():
+            self.kill(self.handles[slot])
+
+    @staticmethod
+    def _overlaps(x, y, rect):
+        """向量化的矩形相交判断（与 Rect.colliderect 一致）"""
+        return ((x < rect.right) & (x + BULLET_SIZE > rect.left) &
+                (y < rect.bottom) & (y + BULLET_SIZE > rect.top))
+
+    def swept_rect(self, slot):
+        """炮弹本帧扫过的区域（移动前后两个矩形的并集）"""
+        x0, y0 = int(self.prev_x[slot]), int(self.prev_y[slot])
+        x1, y1 = int(self.x[slot]), int(self.y[slot])
+        left, top = min(x0, x1), min(y0, y1)
+        return pygame.Rect(left, top, max(x0, x1) - left + BULLET_SIZE, max(y0, y1) - top + BULLET_SIZE)
+
+    def _contact_distances(self, slots, left, top, right, bottom):
+        """炮弹沿移动方向前进多少像素后开始与矩形（可为数组）重叠，已重叠为 0"""
+        direction = self.direction[slots]
+        dx = DIRECTION_DX[direction]
+        dy = DIRECTION_DY[direction]
+        x = self.prev_x[slots]
+        y = self.prev_y[slots]
+        distance = (np.where(dx > 0, left - x - BULLET_SIZE + 1, x - right + 1) * (dx != 0) +
+                    np.where(dy > 0, top - y - BULLET_SIZE + 1, y - bottom + 1) * (dy != 0))
+        return np.maximum(distance, 0)
+
+    def sweep_rect(self, slots, rect, team=None):
+        """扫掠检测：返回本帧移动路径碰到 rect 的槽位及碰到前移动的距离，可按阵营过滤"""
+        if not slots.size:
+            return slots, slots
+        x0, y0 = self.prev_x[slots], self.prev_y[slots]
+        x1, y1 = self.x[slots], self.y[slots]
+        mask = ((np.minimum(x0, x1) < rect.right) & (np.maximum(x0, x1) + BULLET_SIZE > rect.left) &
+                (np.minimum(y0, y1) < rect.bottom) & (np.maximum(y0, y1) + BULLET_SIZE > rect.top))
+        if team is not None:
+            mask &= self.team[slots] == team
+        slots = slots[mask]
+        return slots, self._contact_distances(slots, rect.left, rect.top, rect.right, rect.bottom)
+
+    def contact_distance(self, slot, rect):
+        """单颗炮弹碰到 rect 前移动的距离"""
+        slots = np.array([slot])
+        return int(self._contact_distances(slots, rect.left, rect.top, rect.right, rect.bottom)[0])
+
+    def sweep_terrain(self, slots):
+        """沿移动方向逐格（DDA）列出炮弹本帧经过的格子，找出第一个阻挡炮弹的格子
+
+        炮弹横向最多覆盖两格，每经过一格查两次表，开销只与经过的格子数有关，与速度无关。
+        返回 (槽位, 碰到前移动的距离, 格子列, 格子行)。
+        """
+        empty = slots[:0]
+        if not slots.size:
+            return empty, empty, empty, empty
+        blocking = self.map.bullet_blocking.ravel()
+        rows, cols = self.map.bullet_blocking.shape
+        size = self.map.tile_size
+
+        direction = self.direction[slots]
+        horizontal = DIRECTION_DX[direction] != 0
+        # 沿移动轴的坐标和横向坐标
+        along_start = np.where(horizontal, self.prev_x[slots], self.prev_y[slots])
+        along_end = np.where(horizontal, self.x[slots], self.y[slots])
+        lateral = np.where(horizontal, self.prev_y[slots], self.prev_x[slots])
+        # 从移动前覆盖的最靠后的格子走到移动后最靠前的格子
+        start = (along_start + REAR_EDGE[direction]) // size
+        end = (along_end + FRONT_EDGE[direction]) // size
+        step = DIRECTION_STEP[direction]
+        limit = np.where(horizontal, cols, rows)
+        # 横向覆盖的两格（贴边的半格夹到网格内）
+        lateral_max = np.where(horizontal, rows, cols) - 1
+        near = np.minimum(np.maximum(lateral // size, 0), lateral_max)
+        far = np.minimum(np.maximum((lateral + BULLET_SIZE - 1) // size, 0), lateral_max)
+        # 沿移动轴 / 横向每格在扁平数组中的跨度
+        along_stride = np.where(horizontal, 1, cols)[:, None]
+        lateral_stride = np.where(horizontal, cols, 1)
+
+        # 每颗炮弹依次经过的格子排成一行（n x 最多经过的格子数），一次查表
+        count = np.abs(end - start) + 1
+        offsets = np.arange(int(count.max()))
+        along = start[:, None] + step[:, None] * offsets
+        # 网格外的格子不阻挡炮弹
+        valid = (offsets < count[:, None]) & (along >= 0) & (along < limit[:, None])
+        along_index = np.minimum(np.maximum(along, 0), limit[:, None] - 1) * along_stride
+        near_hit = blocking[along_index + (near * lateral_stride)[:, None]] & valid
+        hit = near_hit | (blocking[along_index + (far * lateral_stride)[:, None]] & valid)
+
+        found = np.flatnonzero(hit.any(axis=1))
+        first = hit[found].argmax(axis=1)  # 路径上第一个阻挡的格子
+        slots = slots[found]
+        cell = along[found, first]
+        lateral = np.where(near_hit[found, first], near[found], far[found])
+        horizontal = horizontal[found]
+        col = np.where(horizontal, cell, lateral)
+        row = np.where(horizontal, lateral, cell)
+        distance = self._contact_distances(slots, col * size, row * size, (col + 1) * size, (row + 1) * size)
+        return slots, distance, col, row
+
+    def draw(self, screen, view=None):
+        """批量绘制视口内的炮弹，返回绘制区域列表（屏幕坐标）
+
+        view 为屏幕对应的世界区域，默认从世界原点开始。
+        """
+        if view is None:
+            view = screen.get_rect()
+        slots = np.flatnonzero(self.alive)
+        slots = slots[self._overlaps(self.x[slots], self.y[slots], view)]
+        if not slots.size:
+            return []
+        images = Bullet._images
+        return screen.blits([
+            (images[direction], (x, y))
+            for direction, x, y in zip(self.direction[slots].tolist(),
+                                       (self.x[slots] - view.x).tolist(), (self.y[slots] - view.y).tolist())
+        ])
@@ -0,0 +1,167 @@
+import os
+import sys
+import struct
+import argparse
+
+from config import *
+
+
+# 回放文件格式（小端）：
+#   文件头：魔数 b'TWRP'、版本(B)、关卡(B)、随机种子(Q)、总帧数(I)、
+#           地图种子(Q)、随机地图列数(H)、行数(H)（都为 0 表示使用关卡地图）、生成配置名长度(B)，之后是 UTF-8 配置名
+#   数据：若干 (输入位掩码(B), 连续帧数(H)) 游程，按帧顺序排列
+# 版本 1 的文件头只有前五项（关卡地图、classic 生成配置），仍然可以读取。
+REPLAY_MAGIC = b'TWRP'
+REPLAY_VERSION = 2
+REPLAY_HEADER_V1 = struct.Struct('<4sBBQI')
+REPLAY_HEADER = struct.Struct('<4sBBQIQHHB')
+REPLAY_RUN = struct.Struct('<BH')
+MAX_RUN_LENGTH = 0xFFFF
+
+
+def input_mask(keys, fire=False):
+    """把按键状态转换为输入位掩码"""
+    mask = INPUT_FIRE if fire else 0
+    for key, bit in INPUT_KEY_MAP.items():
+        if keys[key]:
+            mask |= bit
+    return mask
+
+
+class ReplayRecorder:
+    """回放录制器：记录随机种子、地图参数和每帧玩家输入（游程编码，按键保持时几乎不占空间）
+
+    map_seed 为生成随机地图的种子（重开一局时地图不变，可能与本局种子不同），
+    spawn_profile 为 SPAWN_PROFILES 中的生成配置名。
+    """
+
+    def __init__(self, seed, level=1, map_size=None, map_seed=None, spawn_profile=DEFAULT_SPAWN_PROFILE):
+        self.seed = seed
+        self.level = level
+        self.map_size = map_size
+        self.map_seed = map_seed if map_seed is not None else seed
+        self.spawn_profile = spawn_profile
+        self.ticks = 0
+        self.runs = []  # [输入位掩码, 连续帧数]
+
+    def record(self, mask):
+        """记录一帧的输入"""
+        self.ticks += 1
+        runs = self.runs
+        if runs and runs[-1][0] == mask and runs[-1][1] < MAX_RUN_LENGTH:
+            runs[-1][1] += 1
+        else:
+            runs.append([mask, 1])
+
+    def to_replay(self):
+        return Replay(self.seed, self.level, [tuple(run) for run in self.runs], self.map_size, self.map_seed,
+                      self.spawn_profile)
+
+    def save(self, path):
+        self.to_replay().save(path)
+
+
+class Replay:
+    """一局游戏的回放数据"""
+
+    def __init__(self, seed, level, runs, map_size=None, map_seed=None, spawn_profile=DEFAULT_SPAWN_PROFILE):
+        self.seed = seed
+        self.level = level
+        self.runs = runs  # [(输入位掩码, 连续帧数), ...]
+        self.map_size = map_size  # 随机地图尺寸 (列, 行)，为空时使用关卡地图
+        self.map_seed = map_seed if map_seed is not None else seed
+        self.spawn_profile = spawn_profile
+
+    @property
+    def ticks(self):
+        return sum(count for _, count in self.runs)
+
+    def inputs(self):
+        """按帧依次产生输入位掩码"""
+        for mask, count in self.runs:
+            for _ in range(count):
+                yield mask
+
+    def to_bytes(self):
+        cols, rows = self.map_size or (0, 0)
+        name = self.spawn_profile.encode('utf-8')
+        data = bytearray(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.level, self.seed, self.ticks,
+                                            self.map_seed, cols, rows, len(name)))
+        data += name
+        for mask, count in self.runs:
+            data += REPLAY_RUN.pack(mask, count)
+        return bytes(data)
+
+    @staticmethod
+    def from_bytes(data):
+        if len(data) < REPLAY_HEADER_V1.size:
+            raise ValueError("回放数据不完整")
+        magic, version, level, seed, ticks = REPLAY_HEADER_V1.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError("不是有效的回放文件")
+        if version == 1:
+            map_size, map_seed, spawn_profile = None, seed, 'classic'
+            offset = REPLAY_HEADER_V1.size
+        elif version == REPLAY_VERSION:
+            if len(data) < REPLAY_HEADER.size:
+                raise ValueError("回放数据不完整")
+            _, _, _, _, _, map_seed, cols, rows, name_length = REPLAY_HEADER.unpack_from(data)
+            map_size = (cols, rows) if cols and rows else None
+            offset = REPLAY_HEADER.size + name_length
+            if len(data) < offset:
+                raise ValueError("回放数据不完整")
+            spawn_profile = bytes(data[REPLAY_HEADER.size:offset]).decode('utf-8')
+        else:
+            raise ValueError(f"不支持的回放版本: {version}")
+        body = memoryview(data)[offset:]
+        if len(body) % REPLAY_RUN.size:
+            raise ValueError("回放数据不完整")
+
+        replay = Replay(seed, level, list(REPLAY_RUN.iter_unpack(body)), map_size, map_seed, spawn_profile)
+        if replay.ticks != ticks:
+            raise ValueError("回放帧数与文件头不一致")
+        return replay
+
+    def save(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+
+    @staticmethod
+    def load(path):
+        with open(path, 'rb') as f:
+            return Replay.from_bytes(f.read())
+
+
+def play_replay(replay, render=False):
+    """无头重放一局（不受 FPS 限制），返回运行统计信息"""
+    from headless import HeadlessRunner  # headless 依赖 game_scene，避免循环导入
+
+    # 随机地图和随机出生点由创建场景时的种子决定，本局种子不同时先按地图种子创建再重开
+    runner = HeadlessRunner(replay.level, render=render, seed=replay.map_seed, map_size=replay.map_size,
+                            spawn_profile=replay.spawn_profile)
+    if replay.seed != replay.map_seed:
+        runner.scene.reset(replay.seed)
+    inputs = replay.inputs()
+    return runner.run(replay.ticks, lambda tick, scene: next(inputs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TankWar 回放播放器")
+    parser.add_argument('path', help="回放文件路径")
+    parser.add_argument('--render', action='store_true', help="同时执行绘制")
+    args = parser.parse_args(argv)
+
+    replay = Replay.load(args.path)
+    stats = play_replay(replay, render=args.render)
+    print(f"种子 {replay.seed}，重放 {stats['ticks']} 帧，耗时 {stats['seconds']:.2f}s，"
+          f"{stats['ticks_per_second']:.0f} 帧/秒，"
+          f"{'胜利' if stats['victory'] else '失败' if stats['game_over'] else '未结束'}，"
+          f"击毁 {stats['enemies_destroyed']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
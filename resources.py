@@ -1,8 +1,14 @@
 import pygame
-from config import RESOURCE_PATH
+from config import RESOURCE_PATH, PRELOAD_IMAGES, PRELOAD_SOUNDS
 
 import sys
 import os
+import time
+import threading
+
+# 预加载任务状态
+PRELOAD_QUEUED = 0
+PRELOAD_LOADING = 1
 
 class ResourceLoader:
     """资源加载工具类"""
@@ -10,18 +16,58 @@ class ResourceLoader:
     # 静态变量存储已加载的音效
     _sounds = {}
 
+    # 静态变量存储已解码/缩放的图片，键为 (name, size, colorkey, alpha)
+    _images = {}
+    _image_hits = 0
+    _image_misses = 0
+
+    # 后台预加载：(类型, 文件名) -> 任务状态，加载完成后移除
+    _preload_state = {}
+    _preload_done = threading.Condition()
+    _decoded = {}  # 后台线程解码好、还未转换像素格式的图片
+
     @staticmethod
-    def load_image(name, colorkey=None):
-        """加载图片资源"""
-        fullname = os.path.join(RESOURCE_PATH['images'], name)
-        try:
-            image = pygame.image.load(fullname)
-        except pygame.error as message:
-            print(f"无法加载图片: {fullname}")
-            raise SystemExit(message)
+    def load_image(name, colorkey=None, size=None, alpha=False):
+        """加载图片资源（进程级缓存）
+
+        返回的Surface在所有调用方之间共享，调用方不要直接在上面绘制；
+        size 不为空时返回已缩放好的图片，alpha 为真时使用 convert_alpha()。
+        """
+        if size is not None:
+            size = tuple(size)
+        key = (name, size, colorkey, alpha)
+        image = ResourceLoader._images.get(key)
+        if image is not None:
+            ResourceLoader._image_hits += 1
+            return image, image.get_rect()
+
+        ResourceLoader._image_misses += 1
+        if size is None:
+            image = ResourceLoader._decode_image(name, colorkey, alpha)
+        else:
+            # 缩放图片复用未缩放的缓存，避免重复解码PNG
+            base, _ = ResourceLoader.load_image(name, colorkey, alpha=alpha)
+            image = pygame.transform.scale(base, size)
+
+        ResourceLoader._images[key] = image
+        return image, image.get_rect()
+
+    @staticmethod
+    def _decode_image(name, colorkey=None, alpha=False):
+        """从磁盘读取并解码图片（优先使用后台预加载的结果）"""
+        ResourceLoader._wait_preloaded(('image', name))
+        # 转换后的图片进入 _images 缓存，解码结果不再保留，避免同一张图片在内存中存两份
+        image = ResourceLoader._decoded.pop(name, None)
+        if image is None:
+            fullname = os.path.join(RESOURCE_PATH['images'], name)
+            try:
+                image = pygame.image.load(fullname)
+            except pygame.error as message:
+                print(f"无法加载图片: {fullname}")
+                raise SystemExit(message)
 
         # 转换为优化后的Surface
-        image = image.convert()
+        image = image.convert_alpha() if alpha else image.convert()
 
         # 设置透明色
         if colorkey is not None:
@@ -29,11 +75,57 @@ class ResourceLoader:
                 colorkey = image.get_at((0, 0))
             image.set_colorkey(colorkey, pygame.RLEACCEL)
 
-        return image, image.get_rect()
+        return image
+
+    @staticmethod
+    def _wait_preloaded(key):
+        """资源正在后台加载时只等待它完成；还在排队时取消排队，由调用方直接加载"""
+        with ResourceLoader._preload_done:
+            state = ResourceLoader._preload_state.get(key)
+            if state == PRELOAD_QUEUED:
+                del ResourceLoader._preload_state[key]
+                return
+            while ResourceLoader._preload_state.get(key) == PRELOAD_LOADING:
+                ResourceLoader._preload_done.wait()
+
+    @staticmethod
+    def _preload(kind, name):
+        """在后台线程加载一个资源：图片只解码，像素格式转换留给主线程"""
+        if kind == 'image':
+            ResourceLoader._decoded[name] = pygame.image.load(os.path.join(RESOURCE_PATH['images'], name))
+        elif pygame.mixer.get_init():
+            ResourceLoader._sounds[name] = pygame.mixer.Sound(os.path.join(RESOURCE_PATH['music'], name))
+
+    @staticmethod
+    def clear_image_cache(name=None):
+        """清空图片缓存；指定 name 时只淘汰该图片的所有尺寸/模式"""
+        if name is None:
+            ResourceLoader._images.clear()
+            return
+        for key in [key for key in ResourceLoader._images if key[0] == name]:
+            del ResourceLoader._images[key]
+
+    @staticmethod
+    def reset_image_cache_stats():
+        """重置图片缓存命中/未命中计数"""
+        ResourceLoader._image_hits = 0
+        ResourceLoader._image_misses = 0
+
+    @staticmethod
+    def image_cache_stats():
+        """返回图片缓存统计信息"""
+        return {
+            'hits': ResourceLoader._image_hits,
+            'misses': ResourceLoader._image_misses,
+            'entries': len(ResourceLoader._images),
+        }
 
     @staticmethod
     def load_sound(name):
         """加载音效资源（延迟初始化）"""
+        if name in ResourceLoader._sounds:
+            return ResourceLoader._sounds[name]
+        ResourceLoader._wait_preloaded(('sound', name))
         if name in ResourceLoader._sounds:
             return ResourceLoader._sounds[name]
 
@@ -89,4 +181,57 @@ class ResourceLoader:
             if filename.lower().endswith(accept):
                 name = os.path.splitext(filename)[0]
                 sounds[name] = ResourceLoader.load_sound(filename)
-        return sounds
\ No newline at end of file
+        return sounds
+
+class AssetPreloader:
+    """后台线程按清单预先解码图片、加载音效，填充 ResourceLoader 的缓存
+
+    主线程需要某个资源时只等待这一个资源，不必等整个清单加载完。
+    """
+
+    def __init__(self, images=PRELOAD_IMAGES, sounds=PRELOAD_SOUNDS):
+        self.jobs = [('image', name) for name in images] + [('sound', name) for name in sounds]
+        self.total = len(self.jobs)
+        self.completed = 0
+        self.seconds = None  # 清单全部加载完的耗时
+        self._start_time = None
+        self._thread = threading.Thread(target=self._run, name='AssetPreloader', daemon=True)
+
+    @property
+    def done(self):
+        return self.completed >= self.total
+
+    @property
+    def progress(self):
+        return self.completed / self.total if self.total else 1.0
+
+    def start(self):
+        with ResourceLoader._preload_done:
+            for key in self.jobs:
+                ResourceLoader._preload_state.setdefault(key, PRELOAD_QUEUED)
+        self._start_time = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+
+    def _run(self):
+        state = ResourceLoader._preload_state
+        done = ResourceLoader._preload_done
+        for key in self.jobs:
+            with done:
+                if state.get(key) != PRELOAD_QUEUED:
+                    self.completed += 1  # 主线程已经直接加载了
+                    continue
+                state[key] = PRELOAD_LOADING
+            try:
+                ResourceLoader._preload(*key)
+            except (pygame.error, OSError) as e:
+                print(f"预加载失败: {key[1]} ({e})")  # 主线程用到时会重新加载并报告
+            finally:
+                with done:
+                    del state[key]
+                    self.completed += 1
+                    done.notify_all()
+        self.seconds = time.perf_counter() - self._start_time
@@ -0,0 +1,56 @@
+import time
+from config import *
+
+
+SCENE_NAMES = {
+    GAME_START: 'start',
+    GAME_PLAYING: 'game',
+    GAME_OVER: 'end',
+}
+
+
+class SceneManager:
+    """场景管理：每个场景第一次进入时才创建，之后一直复用
+
+    factories 为 状态 -> 创建场景的函数。创建、重置和切换的耗时记录在 timings 中（毫秒）。
+    """
+
+    def __init__(self, factories):
+        self.factories = factories
+        self.scenes = {}
+        self.state = None
+        self.current = None
+        self.timings = {}  # 'build_<场景>' / 'reset_<场景>' / 'switch' -> 最近一次耗时
+
+    def get(self, state):
+        """返回 state 对应的场景，还没创建时立即创建"""
+        scene = self.scenes.get(state)
+        if scene is None:
+            start = time.perf_counter()
+            scene = self.scenes[state] = self.factories[state]()
+            self._record(f"build_{SCENE_NAMES[state]}", start)
+        return scene
+
+    def existing(self, state):
+        """返回已创建的场景，没有创建过时返回 None（不会触发创建）"""
+        return self.scenes.get(state)
+
+    def reset(self, state):
+        """原地重置已创建的场景（调用场景的 reset()）"""
+        scene = self.scenes.get(state)
+        if scene is not None:
+            start = time.perf_counter()
+            scene.reset()
+            self._record(f"reset_{SCENE_NAMES[state]}", start)
+        return scene
+
+    def switch(self, state):
+        """切换到 state 对应的场景并返回它"""
+        start = time.perf_counter()
+        self.current = self.get(state)
+        self.state = state
+        self._record('switch', start)
+        return self.current
+
+    def _record(self, name, start):
+        self.timings[name] = (time.perf_counter() - start) * 1000.0
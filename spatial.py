@@ -0,0 +1,65 @@
+from config import *
+
+
+class SpatialHash:
+    """按固定大小的桶索引矩形对象（世界坐标），用于查询视口或某区域内的对象
+
+    对象移动后调用 move()，只有覆盖的桶范围变化时才更新索引。
+    """
+
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.buckets = {}  # (桶列, 桶行) -> {对象: None}（保持插入顺序）
+        self._spans = {}  # 对象 -> 覆盖的桶范围 (左, 上, 右, 下)，右和下包含
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __contains__(self, item):
+        return item in self._spans
+
+    def _span(self, rect):
+        size = self.cell_size
+        return rect.left // size, rect.top // size, (rect.right - 1) // size, (rect.bottom - 1) // size
+
+    def insert(self, item, rect):
+        span = self._span(rect)
+        self._spans[item] = span
+        left, top, right, bottom = span
+        for row in range(top, bottom + 1):
+            for col in range(left, right + 1):
+                self.buckets.setdefault((col, row), {})[item] = None
+
+    def remove(self, item):
+        span = self._spans.pop(item, None)
+        if span is None:
+            return
+        left, top, right, bottom = span
+        for row in range(top, bottom + 1):
+            for col in range(left, right + 1):
+                bucket = self.buckets[(col, row)]
+                del bucket[item]
+                if not bucket:
+                    del self.buckets[(col, row)]
+
+    def move(self, item, rect):
+        """对象位置变化后更新索引"""
+        if self._spans.get(item) != self._span(rect):
+            self.remove(item)
+            self.insert(item, rect)
+
+    def clear(self):
+        self.buckets.clear()
+        self._spans.clear()
+
+    def query(self, rect):
+        """返回 rect 覆盖的桶中的对象（可能包含刚好在 rect 外的对象）"""
+        left, top, right, bottom = self._span(rect)
+        buckets = self.buckets
+        found = {}
+        for row in range(top, bottom + 1):
+            for col in range(left, right + 1):
+                bucket = buckets.get((col, row))
+                if bucket:
+                    found.update(bucket)
+        return list(found)
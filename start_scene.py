@@ -1,12 +1,16 @@
 import pygame
 from config import *
+from hud import TextCache
 
 
 class StartScene:
     """游戏开始场景"""
 
-    def __init__(self, screen):
+    def __init__(self, screen, preloader=None):
         self.screen = screen
+        self.preloader = preloader  # 后台资源预加载器，加载完成前显示进度条
+        self.progress_rect = pygame.Rect(SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 140, 300, 16)
+        self._progress_visible = preloader is not None
         self.font = pygame.font.SysFont(None, 48)
         self.title_font = pygame.font.SysFont(None, 72)
         self.start_button = pygame.Rect(SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2, 200, 50)
@@ -26,27 +30,44 @@ class StartScene:
         pass
 
     def draw(self):
-        """绘制场景"""
+        """绘制场景，画面静态，只有加载进度条会变化，返回变化区域列表"""
         self.screen.fill(BLACK)
 
         # 绘制标题
-        title = self.title_font.render("TankWar", True, GREEN)
+        title = TextCache.render(self.title_font, "TankWar", GREEN)
         title_rect = title.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 4))
         self.screen.blit(title, title_rect)
 
         # 绘制开始按钮
         pygame.draw.rect(self.screen, BLUE, self.start_button)
-        start_text = self.font.render("start", True, WHITE)
+        start_text = TextCache.render(self.font, "start", WHITE)
         start_text_rect = start_text.get_rect(center=self.start_button.center)
         self.screen.blit(start_text, start_text_rect)
 
         # 绘制退出按钮
         pygame.draw.rect(self.screen, RED, self.quit_button)
-        quit_text = self.font.render("exit", True, WHITE)
+        quit_text = TextCache.render(self.font, "exit", WHITE)
         quit_text_rect = quit_text.get_rect(center=self.quit_button.center)
         self.screen.blit(quit_text, quit_text_rect)
 
         # 绘制操作说明
-        controls = self.font.render(" arrow keys to move, spacebar to shoot", True, WHITE)
+        controls = TextCache.render(self.font, " arrow keys to move, spacebar to shoot", WHITE)
         controls_rect = controls.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 50))
-        self.screen.blit(controls, controls_rect)
\ No newline at end of file
+        self.screen.blit(controls, controls_rect)
+
+        return self._draw_progress()
+
+    def _draw_progress(self):
+        """绘制资源加载进度条（加载完成后不再显示），返回变化区域列表"""
+        loader = self.preloader
+        if loader is None or not self._progress_visible:
+            return []
+        if loader.done:
+            self._progress_visible = False
+            return [self.progress_rect]  # 擦掉进度条
+
+        pygame.draw.rect(self.screen, WHITE, self.progress_rect, 1)
+        fill = self.progress_rect.inflate(-4, -4)
+        fill.width = int(fill.width * loader.progress)
+        pygame.draw.rect(self.screen, GREEN, fill)
+        return [self.progress_rect]
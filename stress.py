@@ -0,0 +1,123 @@
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+from config import *
+from headless import HeadlessRunner
+
+try:
+    import resource  # 只有类 Unix 系统提供
+except ImportError:
+    resource = None
+
+
+def peak_rss_mb():
+    """进程的最大常驻内存（MB），平台不支持时返回 None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak / (1024.0 * 1024.0) if sys.platform == 'darwin' else peak / 1024.0
+
+
+def run_stress(spawn_profile, ticks, window, seed=1, map_size=None, render=False, trace_memory=False):
+    """按生成配置持续模拟，每 window 帧记录一次吞吐量、场上数量和内存
+
+    玩家无敌，司令部被击中不结束游戏，只有敌人全部被消灭（胜利）才提前结束。
+    """
+    if trace_memory:
+        tracemalloc.start()
+    runner = HeadlessRunner(render=render, seed=seed, profile=True, map_size=map_size, spawn_profile=spawn_profile)
+    scene = runner.scene
+    scene.player.invincible = True
+    scene.player.invincible_timer = 10 ** 9
+
+    windows = []
+    tick = 0
+    while tick < ticks and not scene.victory:
+        start = time.perf_counter()
+        count = min(window, ticks - tick)
+        for _ in range(count):
+            scene.game_over = False  # 炮弹打到司令部会结束游戏，压测中忽略
+            runner.step()
+            tick += 1
+            if scene.victory:
+                break
+        elapsed = time.perf_counter() - start
+        frames = tick - (windows[-1]['tick'] if windows else 0)
+
+        record = {
+            'tick': tick,
+            'ticks_per_second': frames / elapsed if elapsed > 0 else 0.0,
+            'enemies_alive': len(scene.enemies),
+            'enemies_spawned': scene.spawned_enemies,
+            'enemies_destroyed': scene.enemies_destroyed,
+            'bullets': scene.bullets.count,
+            'phases_ms': scene.profiler.averages(frames),
+            'peak_rss_mb': peak_rss_mb(),
+        }
+        if trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            record['traced_mb'] = current / (1024.0 * 1024.0)
+            record['traced_peak_mb'] = peak / (1024.0 * 1024.0)
+        windows.append(record)
+
+    if trace_memory:
+        tracemalloc.stop()
+    rates = sorted(record['ticks_per_second'] for record in windows)
+    return {
+        'profile': scene.spawn_profile,
+        'map_size': map_size,
+        'seed': seed,
+        'ticks': tick,
+        'victory': scene.victory,
+        'spawn_points': len(scene.spawn_positions),
+        'summary': {
+            'min_ticks_per_second': rates[0] if rates else 0.0,
+            'median_ticks_per_second': rates[len(rates) // 2] if rates else 0.0,
+            'peak_enemies_alive': max((record['enemies_alive'] for record in windows), default=0),
+            'peak_bullets': max((record['bullets'] for record in windows), default=0),
+            'peak_rss_mb': peak_rss_mb(),
+            'peak_traced_mb': max((record['traced_peak_mb'] for record in windows), default=None)
+            if trace_memory else None,
+        },
+        'windows': windows,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TankWar 大规模敌人压力测试（持续吞吐量和内存）")
+    parser.add_argument('--profile', default='stress', choices=sorted(SPAWN_PROFILES), help="敌人生成配置")
+    parser.add_argument('--map-size', default='256x256', help="随机地图尺寸 列x行，none 表示使用关卡 1")
+    parser.add_argument('--ticks', type=int, default=FPS * 120, help="最多模拟的帧数")
+    parser.add_argument('--window', type=int, default=FPS * 5, help="统计窗口（帧）")
+    parser.add_argument('--seed', type=int, default=1, help="对局随机种子")
+    parser.add_argument('--render', action='store_true', help="同时执行绘制")
+    parser.add_argument('--trace-memory', action='store_true', help="用 tracemalloc 统计 Python 内存分配（明显变慢）")
+    parser.add_argument('--output', help="把 JSON 结果写入文件")
+    args = parser.parse_args(argv)
+
+    map_size = None
+    if args.map_size.lower() != 'none':
+        map_size = tuple(int(value) for value in args.map_size.lower().split('x'))
+    results = run_stress(args.profile, args.ticks, args.window, args.seed, map_size, args.render, args.trace_memory)
+
+    for record in results['windows']:
+        print(f"帧 {record['tick']:>7}: {record['ticks_per_second']:7.0f} 帧/秒，"
+              f"敌人 {record['enemies_alive']:>4}（已消灭 {record['enemies_destroyed']}），"
+              f"炮弹 {record['bullets']:>4}，帧耗时 {record['phases_ms'].get('frame', 0.0):.2f}ms")
+    summary = results['summary']
+    rss = summary['peak_rss_mb']
+    print(f"最低 {summary['min_ticks_per_second']:.0f} 帧/秒，中位数 {summary['median_ticks_per_second']:.0f} 帧/秒，"
+          f"最多 {summary['peak_enemies_alive']} 辆敌人同时在场"
+          + (f"，最大内存 {rss:.1f}MB" if rss is not None else ""))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
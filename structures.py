@@ -1,6 +1,16 @@
 import pygame
 from config import *
 from resources import ResourceLoader
+from audio import AudioManager
+
+
+# 地形格子的图片和加载失败时的默认颜色（地形保存在 GameMap 的数组中，不再逐格创建对象）
+TILE_IMAGE_FILES = {
+    TILE_BRICK: ('brick.png', RED),
+    TILE_IRON: ('iron.png', BLUE),
+    TILE_RIVER: ('river.png', BLUE),
+    TILE_FOREST: ('forest.png', GREEN),
+}
 
 
 class Structure(pygame.sprite.Sprite):
@@ -19,12 +29,11 @@ class Structure(pygame.sprite.Sprite):
         else:
             self.image = pygame.Surface((30, 30))
             self.image.fill(WHITE)
-        self.hit_sound = ResourceLoader.load_sound('bang.wav')
 
     @staticmethod
-    def load_structure_image(filename, default_color, size=(30, 30)):
-        """加载建筑图片，失败时返回默认颜色的Surface"""
-        image, _ = ResourceLoader.load_image(filename)
+    def load_structure_image(filename, default_color, size=(30, 30), scale=False):
+        """加载建筑图片，失败时返回默认颜色的Surface；scale 为真时返回缩放到 size 的共享图片"""
+        image, _ = ResourceLoader.load_image(filename, size=size if scale else None)
         if image:
             return image
         else:
@@ -36,63 +45,23 @@ class Structure(pygame.sprite.Sprite):
     def hit(self, damage):
         """被击中处理"""
         self.health -= damage
-
-        try:
-            self.hit_sound.play()
-        except AttributeError:
-            print("无法播放建筑被击中音效")
-
+        AudioManager.play('bang.wav')
         return self.health <= 0
 
 
-class Brick(Structure):
-    """红砖类"""
-    def __init__(self, x, y):
-        brick_image = self.load_structure_image('brick.png', RED)
-        brick_image = pygame.transform.scale(brick_image, (TILE_SIZE, TILE_SIZE))
-
-        super().__init__(x, y, image=brick_image, health=BRICK_HP)
-
-        self.can_pass_tank = False
-        self.can_pass_bullet = False
-
-class Iron(Structure):
-    """铁墙类"""
-    def __init__(self, x, y):
-        # 加载并缩放图片到 TILE_SIZE
-        iron_image = self.load_structure_image('iron.png', BLUE)
-        iron_image = pygame.transform.scale(iron_image, (TILE_SIZE, TILE_SIZE))
-        super().__init__(x, y, image=iron_image, health=IRON_HP)
-        self.can_pass_tank = False  # 坦克不能穿过铁墙
-        self.can_pass_bullet = False  # 子弹不能穿过铁墙
-
-
-class River(Structure):
-    """河流类"""
-    def __init__(self, x, y):
-        river_image = self.load_structure_image('river.png', BLUE)
-        river_image = pygame.transform.scale(river_image, (TILE_SIZE, TILE_SIZE))
-        super().__init__(x, y, image=river_image)
-        self.can_pass_tank = False  # 坦克不能过河
-        self.can_pass_bullet = True  # 子弹可以过河
-
-
-class Forest(Structure):
-    """森林类"""
-    def __init__(self, x, y):
-        forest_image = self.load_structure_image('forest.png', GREEN)
-        forest_image = pygame.transform.scale(forest_image, (TILE_SIZE, TILE_SIZE))
-        super().__init__(x, y, image=forest_image)
-        self.can_pass_tank = True  # 坦克可以穿过森林
-        self.can_pass_bullet = True  # 子弹可以穿过森林
-
-
 class Headquarters(Structure):
     """司令部类"""
 
     def __init__(self, x, y):
         hq_image = self.load_structure_image('home.png', YELLOW, size=(40, 40))
         super().__init__(x, y, image=hq_image, health=HEADQUARTERS_HP)
+        self.intact_image = hq_image
+        self.is_destroyed = False
+
+    def reset(self):
+        """恢复为未被摧毁的状态（重开一局时复用）"""
+        self.health = HEADQUARTERS_HP
+        self.image = self.intact_image
         self.is_destroyed = False
 
     def hit(self, damage):
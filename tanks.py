@@ -1,8 +1,11 @@
 import pygame
 import random
+import numpy as np
 from config import *
-from projectiles import Bullet
 from resources import ResourceLoader
+from audio import AudioManager
+from ecs import EntityView, Field
+from pathfinding import FLOW_STEPS
 
 # 定义方向与图片编号的映射（1=上，2=右，3=下，4=左）
 DIRECTION_MAP = {
@@ -13,12 +16,24 @@ DIRECTION_MAP = {
 }
 
 
-class Tank(pygame.sprite.Sprite):
-    """坦克基类"""
+class Tank(EntityView):
+    """坦克基类：位置、速度、生命值、等级和方向保存在 World 的组件数组中"""
 
+    team = TEAM_ENEMY
 
-    def __init__(self, x, y, color, health, level=TANK_LEVEL_1):
-        super().__init__()
+    dx = Field()  # 水平移动量
+    dy = Field()  # 垂直移动量
+    speed = Field()
+    health = Field()
+    max_health = Field()
+    level = Field()
+    direction = Field()
+
+    # 图片文件名 -> 四个方向的图片，同一种坦克的所有实例共享同一个字典
+    _image_sets = {}
+
+    def __init__(self, x, y, color, health, level=TANK_LEVEL_1, world=None):
+        super().__init__(world)
         self.x = x
         self.y = y
         self.color = color
@@ -26,7 +41,8 @@ class Tank(pygame.sprite.Sprite):
         self.max_health = health
         self.level = level
         self.direction = UP  # 初始方向为上
-        self.bullets = []
+        self.bullets = []  # 本坦克在场上的炮弹句柄
+        self.bullet_engine = None  # 炮弹引擎，由 GameScene 在坦克加入场景时设置
         self.max_bullets = 1
 
         self.shoot_cooldown = 30
@@ -38,20 +54,21 @@ class Tank(pygame.sprite.Sprite):
         self.images = self._load_images()
         self.image = self.images[self.direction]
         self.rect = self.image.get_rect(topleft=(x, y))
-
-        # 延迟加载音效
-        self.shoot_sound = ResourceLoader.load_sound('fire.wav')
-        self.hit_sound = ResourceLoader.load_sound('hit.wav')
+        self.width, self.height = self.rect.size
 
         self.last_direction = None
 
     def _load_images(self):
-        """根据等级和方向加载坦克图片"""
-        images = {}
-        for direction, img_num in DIRECTION_MAP.items():
-            # 生成图片文件名（玩家坦克和敌方坦克在子类中差异）
-            image_name = self._get_image_filename(self.level, img_num)
-
+        """根据等级和方向加载坦克图片（已加载过的同一组图片直接共享）"""
+        # 生成图片文件名（玩家坦克和敌方坦克在子类中差异）
+        image_names = tuple((direction, self._get_image_filename(self.level, img_num))
+                            for direction, img_num in DIRECTION_MAP.items())
+        images = Tank._image_sets.get(image_names)
+        if images is not None:
+            return images
+
+        images = Tank._image_sets[image_names] = {}
+        for direction, image_name in image_names:
             # 加载图片，失败则用默认颜色方块
             image, _ = ResourceLoader.load_image(image_name)
             if not image:
@@ -74,13 +91,27 @@ class Tank(pygame.sprite.Sprite):
         """应用移动量到位置"""
         self.x += self.dx
         self.y += self.dy
-        self.rect.topleft = (self.x, self.y)
+        self.sync_rect()
 
     def reset_movement(self):
         """重置移动（发生碰撞时调用）"""
         self.dx = 0
         self.dy = 0
 
+    def move(self, game_map):
+        """按移动量移动，碰到阻挡坦克的地形时不动并重置移动量，返回是否移动成功
+
+        单辆坦克使用；成批的坦克由 World.move 一次处理，两者规则相同。
+        """
+        rect = self.rect.copy()
+        rect.x += self.dx
+        rect.y += self.dy
+        if game_map.rect_blocks_tank(rect):
+            self.reset_movement()
+            return False
+        self.apply_movement()
+        return True
+
     def _update_shoot_cooldown(self):
         """更新射击冷却时间"""
         if not self.can_shoot:
@@ -95,13 +126,9 @@ class Tank(pygame.sprite.Sprite):
         """射击方法，添加炮弹数量限制"""
         if not self.can_shoot():
             return None
-        # 记录射击时间
-        self.last_shot_time = pygame.time.get_ticks()
         # 创建子弹
         bullet_x, bullet_y = self.get_bullet_spawn_position()
-        bullet = Bullet(bullet_x, bullet_y, self.direction, self.level)
-        self.bullets.append(bullet)  # 直接添加到玩家的炮弹列表
-        return bullet
+        return self.bullet_engine.spawn(self, bullet_x, bullet_y, self.direction, self.level)
 
     def can_shoot(self):
         """检查是否可以射击：地图中没有自己的炮弹时才能发射"""
@@ -123,13 +150,13 @@ class Tank(pygame.sprite.Sprite):
         elif self.direction == RIGHT:
             bullet_x += TANK_SIZE // 2
 
-        return Bullet(bullet_x, bullet_y, self.direction, self.level)
+        return self.bullet_engine.spawn(self, bullet_x, bullet_y, self.direction, self.level)
 
     def hit(self, damage):
         """被击中处理"""
         self.health -= damage
         if self.health <= 0:
-            self.hit_sound.play()
+            AudioManager.play('hit.wav')
         return self.health <= 0
 
     def upgrade(self):
@@ -142,25 +169,29 @@ class Tank(pygame.sprite.Sprite):
 
     def get_bullet_spawn_position(self):
         """计算子弹生成位置（从坦克中心或炮口发射）"""
-        center_x = self.rect.centerx
-        center_y = self.rect.centery
+        rect = self.rect
+        center_x = rect.centerx
+        center_y = rect.centery
         bullet_size = BULLET_SIZE  # 假设在 config.py 中定义
 
         # 根据方向调整子弹位置，使其从炮口发射
-        if self.direction == UP:
-            return (center_x - bullet_size // 2, self.rect.top)
-        elif self.direction == DOWN:
-            return (center_x - bullet_size // 2, self.rect.bottom - bullet_size)
-        elif self.direction == LEFT:
-            return (self.rect.left, center_y - bullet_size // 2)
-        elif self.direction == RIGHT:
-            return (self.rect.right - bullet_size, center_y - bullet_size // 2)
+        direction = self.direction
+        if direction == UP:
+            return (center_x - bullet_size // 2, rect.top)
+        elif direction == DOWN:
+            return (center_x - bullet_size // 2, rect.bottom - bullet_size)
+        elif direction == LEFT:
+            return (rect.left, center_y - bullet_size // 2)
+        elif direction == RIGHT:
+            return (rect.right - bullet_size, center_y - bullet_size // 2)
 
 class PlayerTank(Tank):
     """玩家坦克类（L1-L3等级，方向1-4）"""
 
-    def __init__(self, x, y):
-        super().__init__(x, y, GREEN, 1, TANK_LEVEL_1)
+    team = TEAM_PLAYER
+
+    def __init__(self, x, y, world=None):
+        super().__init__(x, y, GREEN, 1, TANK_LEVEL_1, world)
         self.lives = 3  # 初始三条命
         self.speed = PLAYER_SPEED  # 玩家速度（可在config中定义）
         self.health = self.max_health
@@ -188,7 +219,7 @@ class PlayerTank(Tank):
         """回到出生点"""
         self.x = self.spawn_x
         self.y = self.spawn_y
-        self.rect.topleft = (self.x, self.y)
+        self.sync_rect()
         self.direction = UP  # 重置方向为上
 
     def set_invincible(self, duration_ms):
@@ -198,9 +229,7 @@ class PlayerTank(Tank):
 
         # 创建子弹
         bullet_x, bullet_y = self.get_bullet_spawn_position()
-        bullet = Bullet(bullet_x, bullet_y, self.direction, self.level)
-        self.bullets.append(bullet)  # 直接添加到玩家的炮弹列表
-        return bullet
+        return self.bullet_engine.spawn(self, bullet_x, bullet_y, self.direction, self.level)
     def _get_image_filename(self, level, direction_num):
         """生成玩家坦克图片名：tank_L[等级]_[方向].png"""
         return f"tank_L{level}_{direction_num}.png"
@@ -216,9 +245,14 @@ class PlayerTank(Tank):
             if self.invincible_timer <= 0:
                 self.invincible = False
 
-    def handle_input(self):
-        """处理玩家输入并更新方向和移动量"""
-        keys = pygame.key.get_pressed()
+    def handle_input(self, keys=None):
+        """处理玩家输入并更新方向和移动量
+
+        keys 为按键状态（按 pygame 键值下标访问），为空时读取键盘；
+        无头模式下由程序提供。
+        """
+        if keys is None:
+            keys = pygame.key.get_pressed()
         new_direction = self.direction
         self.dx = 0  # 默认移动量为0
         self.dy = 0
@@ -243,14 +277,62 @@ class PlayerTank(Tank):
 class EnemyTank(Tank):
     """敌方坦克类（四种类型，方向1-4）"""
 
-    def __init__(self, x, y, enemy_type):
+    # AI 状态组件
+    move_timer = Field()
+    move_interval = Field()
+    stuck_ticks = Field()  # 连续没有移动的帧数
+    detour_timer = Field()  # 被卡住后随机绕行的剩余帧数
+    breaching = Field()  # 前方有红砖，边开炮边前进
+    waypoint_x = Field()
+    waypoint_y = Field()
+    last_x = Field()
+    last_y = Field()
+
+    def __init__(self, x, y, enemy_type, rng=None, world=None):
         # 敌方类型映射：1=普通，2=快速，3=装甲，4=精英（对应enemy_1_1.png等）
         self.enemy_type = enemy_type  # 1-4
-        self.speed = self._get_speed_by_type(enemy_type)
+        self.rng = rng or random  # 对局随机数生成器（保证可复现），默认使用全局 random
         health = self._get_health_by_type(enemy_type)
-        super().__init__(x, y, WHITE, health)  # 敌方默认颜色可在config中调整
+        super().__init__(x, y, WHITE, health, world=world)  # 敌方默认颜色可在config中调整
+        self.speed = self._get_speed_by_type(enemy_type)
         self.move_timer = 0
-        self.move_interval = random.randint(200, 400)  # 随机移动间隔
+        self.move_interval = self.rng.randint(200, 400)  # 随机移动间隔
+
+        # 流场寻路（由 GameScene 在敌人加入场景时设置，为空时随机移动）
+        self.flow_field = None
+        self.waypoint = None  # 正在前往的格点（像素坐标）
+        self.breaching = False
+        self.stuck_ticks = 0
+        self.detour_timer = 0
+        self.last_position = None
+
+        # 单独目标的 A* 寻路（如包抄）：由外部设置 path_goal，为空时沿流场前进
+        self.path_service = None
+        self.path_goal = None  # 目标格点
+        self.path = None  # 当前使用的 CachedPath
+        self.path_step = 0  # 当前所在格点在路径中的位置
+
+    @property
+    def waypoint(self):
+        x = self.waypoint_x
+        if x != x:  # NaN 表示没有目标格点
+            return None
+        return x, self.waypoint_y
+
+    @waypoint.setter
+    def waypoint(self, value):
+        self.waypoint_x, self.waypoint_y = (float('nan'), float('nan')) if value is None else value
+
+    @property
+    def last_position(self):
+        x = self.last_x
+        if x != x:
+            return None
+        return x, self.last_y
+
+    @last_position.setter
+    def last_position(self, value):
+        self.last_x, self.last_y = (float('nan'), float('nan')) if value is None else value
 
     def _get_speed_by_type(self, enemy_type):
         """根据敌方类型获取速度"""
@@ -283,11 +365,25 @@ class EnemyTank(Tank):
         return f"enemy_{self.enemy_type}_{direction_num}.png"
 
     def update(self):
-        """敌人AI：随机移动和射击"""
-        # 随机改变方向
+        """敌人AI：沿流场走向目标（没有流场时随机移动）并随机射击"""
+        if self.flow_field is None:
+            self._random_walk()
+        elif self.detour_timer > 0:
+            self.detour_timer -= 1
+            if self.detour_timer == 0:
+                self.waypoint = None  # 绕行结束，重新对齐格点
+        else:
+            self._follow_flow()
+
+        # 随机射击
+        if self.rng.random() < ENEMY_FIRE_CHANCE:
+            self.shoot()
+
+    def _random_walk(self):
+        """随机改变方向"""
         self.move_timer += 1
         if self.move_timer >= self.move_interval:
-            rrr = random.randint(0, 3)
+            rrr = self.rng.randint(0, 3)
             if rrr == 0:
                 self.direction = UP
                 self.dy += -self.speed
@@ -301,8 +397,177 @@ class EnemyTank(Tank):
                 self.direction = RIGHT
                 self.dx += self.speed
             self.move_timer = 0
-            self.move_interval = random.randint(200, 400)
+            self.move_interval = self.rng.randint(200, 400)
 
-        # 随机射击
-        if random.random() < 0.01:  # 1%概率射击
-            self.shoot()
+    def _follow_flow(self):
+        """沿流场前进：每到达一个格点查一次下一步方向，格点之间直线移动"""
+        self.dx = 0
+        self.dy = 0
+        position = (self.x, self.y)
+        waypoint = self.waypoint
+        if waypoint is not None and abs(position[0] - waypoint[0]) + abs(position[1] - waypoint[1]) < 1e-6:
+            # 消除浮点速度累积的误差，准确停在格点上
+            self.x, self.y = position = waypoint
+            self.sync_rect()
+        if waypoint is None or position == waypoint:
+            self._choose_waypoint()
+            waypoint = self.waypoint
+            if waypoint is None:
+                return
+
+        # 被地形挡住（移动系统撤销了移动）太久就随机绕行一段
+        self.stuck_ticks = self.stuck_ticks + 1 if position == self.last_position else 0
+        self.last_position = position
+        if self.stuck_ticks >= ENEMY_STUCK_TICKS:
+            self._start_detour()
+            return
+
+        if self.breaching:
+            self.shoot()  # 前方红砖挡路，先开炮
+        self._steer(position, waypoint)
+
+    def _steer(self, position, waypoint):
+        """朝格点直线前进：先纵向对齐，再横向移动（与 update_enemies 中的批量版本一致）"""
+        target_x, target_y = waypoint
+        speed = self.speed
+        if position[1] != target_y:
+            self.dy = dy = max(-speed, min(speed, target_y - position[1]))
+            self.direction = DOWN if dy > 0 else UP
+        else:
+            self.dx = dx = max(-speed, min(speed, target_x - position[0]))
+            self.direction = RIGHT if dx > 0 else LEFT
+
+    def _choose_waypoint(self):
+        """选择下一个格点：未对齐时先对齐到所在格点，否则按流场前进一格"""
+        size = TILE_SIZE
+        col = int(self.x // size)
+        row = int(self.y // size)
+        self.breaching = False
+        if (self.x, self.y) != (col * size, row * size):
+            self.waypoint = (col * size, row * size)
+            return
+
+        if self.path_goal is not None and self._follow_path(col, row):
+            return
+
+        field = self.flow_field
+        direction = field.direction_at(col, row)
+        if direction is None:
+            self.waypoint = None
+            if field.distance_at(col, row) == 0:
+                self._attack(field.target)  # 已到达目标附近
+            else:
+                self._start_detour()  # 目标不可达
+            return
+
+        dc, dr = FLOW_STEPS[direction]
+        self.waypoint = ((col + dc) * size, (row + dr) * size)
+        self.breaching = field.edge_cost(col, row, direction) > 1
+
+    def _follow_path(self, col, row):
+        """沿 A* 路径前进一格，返回是否已处理（到达或不可达时返回 False，改用流场）"""
+        path = self.path
+        if path is None or not path.valid or path.key[1] != self.path_goal or \
+                self.path_step >= len(path.cells) or path.cells[self.path_step] != (col, row):
+            path = self.path_service.find_path((col, row), self.path_goal)
+            if path is None:
+                self.waypoint = None  # 本帧寻路预算已用完，原地等一帧
+                return True
+            self.path = path
+            self.path_step = 0
+
+        if self.path_step + 1 >= len(path.cells):
+            # 已到达或不可达
+            self.path_goal = None
+            self.path = None
+            return False
+
+        next_col, next_row = path.cells[self.path_step + 1]
+        self.path_step += 1
+        size = TILE_SIZE
+        self.waypoint = (next_col * size, next_row * size)
+        for direction, step in FLOW_STEPS.items():
+            if step == (next_col - col, next_row - row):
+                self.breaching = self.flow_field.edge_cost(col, row, direction) > 1
+        return True
+
+    def _attack(self, target):
+        """转向目标并开火"""
+        rect = self.rect
+        dx = target.centerx - rect.centerx
+        dy = target.centery - rect.centery
+        if abs(dx) > abs(dy):
+            self.direction = RIGHT if dx > 0 else LEFT
+        else:
+            self.direction = DOWN if dy > 0 else UP
+        self.image = self.images[self.direction]
+        self.shoot()
+
+    def _start_detour(self):
+        """随机选一个方向走一段（绕开卡住的位置）"""
+        self.direction = self.rng.choice((UP, DOWN, LEFT, RIGHT))
+        dc, dr = FLOW_STEPS[self.direction]
+        self.dx = dc * self.speed
+        self.dy = dr * self.speed
+        self.detour_timer = self.rng.randint(ENEMY_STUCK_TICKS // 2, ENEMY_STUCK_TICKS * 2)
+        self.stuck_ticks = 0
+        self.waypoint = None
+
+
+def update_enemies(world, enemies):
+    """敌人 AI 系统：结果与依次调用每个敌人的 update() 完全相同
+
+    绝大多数帧里敌人只是沿流场朝下一个格点直线前进，这部分（卡住计数、方向、移动量）
+    对组件数组批量计算；到达格点、被卡住、绕行、随机移动等需要决策的敌人仍逐个调用 update()。
+    随机数和开炮都按敌人顺序逐个处理，随机数序列和炮弹槽位分配与逐个更新一致。
+    敌人较少时批量运算的固定开销更大，直接逐个更新。
+    """
+    if len(enemies) < ENTITY_BATCH_MIN:
+        for enemy in enemies:
+            enemy.update()
+        return
+    fields = world.fields
+    slots = np.array([enemy.slot for enemy in enemies], dtype=np.intp)
+    following = np.array([enemy.flow_field is not None for enemy in enemies], dtype=bool)
+    following &= fields['detour_timer'][slots] == 0
+    x = fields['x'][slots]
+    y = fields['y'][slots]
+    target_x = fields['waypoint_x'][slots]
+    target_y = fields['waypoint_y'][slots]
+    # 有格点、还没到达（也不需要对齐）、没有被卡住太久的敌人直接前进
+    cruising = (following & ~np.isnan(target_x) & (np.abs(x - target_x) + np.abs(y - target_y) >= 1e-6) &
+                ((x != target_x) | (y != target_y)))
+    same_position = (x == fields['last_x'][slots]) & (y == fields['last_y'][slots])
+    stuck = np.where(same_position, fields['stuck_ticks'][slots] + 1, 0)
+    cruising &= stuck < ENEMY_STUCK_TICKS
+
+    moving = slots[cruising]
+    fields['stuck_ticks'][moving] = stuck[cruising]
+    fields['last_x'][moving] = x[cruising]
+    fields['last_y'][moving] = y[cruising]
+    fields['dx'][moving] = 0
+    fields['dy'][moving] = 0
+
+    # 逐个处理需要决策的敌人和开炮；随机开炮前先算出本帧方向（与 update() 的顺序一致）
+    for enemy, batched in zip(enemies, cruising.tolist()):
+        if not batched:
+            enemy.update()
+            continue
+        if enemy.breaching:
+            enemy.shoot()  # 前方红砖挡路，先开炮
+        if enemy.rng.random() < ENEMY_FIRE_CHANCE:
+            enemy._steer((enemy.x, enemy.y), enemy.waypoint)
+            enemy.shoot()
+
+    # 批量朝格点前进：先纵向对齐，再横向移动
+    x = x[cruising]
+    y = y[cruising]
+    target_x = target_x[cruising]
+    target_y = target_y[cruising]
+    speed = fields['speed'][moving]
+    vertical = y != target_y
+    dy = np.where(vertical, np.clip(target_y - y, -speed, speed), 0)
+    dx = np.where(vertical, 0, np.clip(target_x - x, -speed, speed))
+    fields['dx'][moving] = dx
+    fields['dy'][moving] = dy
+    fields['direction'][moving] = np.where(vertical, np.where(dy > 0, DOWN, UP), np.where(dx > 0, RIGHT, LEFT))
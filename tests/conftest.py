@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# 测试直接导入仓库根目录下的模块，资源路径（images、levels 等）相对于仓库根目录
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from headless import init_headless
+
+
+@pytest.fixture(scope='session', autouse=True)
+def screen():
+    """dummy 驱动的显示表面（加载图片 convert() 需要先设置显示模式）"""
+    return init_headless()
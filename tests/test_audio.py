@@ -0,0 +1,67 @@
+import pygame
+import pytest
+
+import audio
+from audio import AudioManager
+from resources import ResourceLoader
+
+
+@pytest.fixture
+def mixer(monkeypatch):
+    """dummy 驱动的混音器；音效都是 10 秒静音，测试期间一直占着通道"""
+    try:
+        pygame.mixer.init(frequency=22050, size=-16, channels=1)
+    except pygame.error:
+        pytest.skip("混音器不可用")
+    monkeypatch.setattr(AudioManager, '_channels', None)
+    monkeypatch.setattr(AudioManager, '_voices', {})
+    monkeypatch.setattr(AudioManager, '_last_played', {})
+    monkeypatch.setattr(AudioManager, '_counters', {})
+    monkeypatch.setattr(audio, 'AUDIO_GROUPS', {'small': 2, 'other': 2})
+    monkeypatch.setattr(audio, 'AUDIO_VOICE_CAP', 3)
+    monkeypatch.setattr(audio, 'SOUND_SETTINGS', {
+        'low_a': ('small', 0, 100), 'low_b': ('small', 0, 100), 'high': ('small', 2, 100),
+        'other_a': ('other', 0, 100), 'other_b': ('other', 1, 100),
+    })
+    silence = pygame.mixer.Sound(buffer=bytes(22050 * 2 * 10))
+    monkeypatch.setattr(ResourceLoader, '_sounds', dict.fromkeys(audio.SOUND_SETTINGS, silence))
+    yield
+    pygame.mixer.stop()
+    pygame.mixer.quit()
+
+
+def _counts(name):
+    return AudioManager.stats()['sounds'][name]
+
+
+def test_repeat_inside_window_is_coalesced(mixer):
+    assert AudioManager.play('low_a', now=0)
+    assert not AudioManager.play('low_a', now=99)
+    assert AudioManager.play('low_a', now=100)
+    assert _counts('low_a') == {'played': 2, 'coalesced': 1, 'dropped': 0, 'preempted': 0}
+
+
+def test_full_group_preempts_only_lower_priority(mixer):
+    assert AudioManager.play('low_a', now=0)
+    assert AudioManager.play('low_b', now=0)
+    assert AudioManager.play('high', now=0)  # 组内两个通道已满，抢占优先级更低的声音
+    assert _counts('low_a')['preempted'] + _counts('low_b')['preempted'] == 1
+
+    assert not AudioManager.play('low_a', now=200)  # 剩下的声音优先级不低于它，丢弃
+    assert not AudioManager.play('low_b', now=200)
+    assert _counts('low_a')['dropped'] + _counts('low_b')['dropped'] == 2
+    assert AudioManager.stats()['voices'] == 2
+
+
+def test_voice_cap_applies_across_groups(mixer):
+    assert AudioManager.play('low_a', now=0)
+    assert AudioManager.play('high', now=0)
+    assert AudioManager.play('other_a', now=0)
+    assert AudioManager.stats()['voices'] == 3  # 达到 AUDIO_VOICE_CAP
+
+    # other 组还有空闲通道，但全局已满：抢占所有分组中优先级最低的声音
+    assert AudioManager.play('other_b', now=0)
+    assert AudioManager.stats()['voices'] == 3
+    assert _counts('low_a')['preempted'] + _counts('other_a')['preempted'] == 1
+    assert not AudioManager.play('low_b', now=0)
+    assert _counts('low_b')['dropped'] == 1
@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+from batch import match_seeds, run_matches
+from config import *
+
+
+def _outcomes(records):
+    """去掉耗时后的对局记录"""
+    return [{key: value for key, value in record.items() if key != 'seconds'} for record in records]
+
+
+def test_results_do_not_depend_on_job_count():
+    seeds = match_seeds(4, seed=1)
+    serial = run_matches(seeds, jobs=1, max_ticks=FPS * 30)
+    parallel = run_matches(seeds, jobs=2, max_ticks=FPS * 30)
+    assert [record['seed'] for record in parallel] == seeds
+    assert _outcomes(parallel) == _outcomes(serial)
+    assert any(record['kills'] for record in serial)
+
+
+def test_stdout_report_is_json():
+    env = dict(os.environ)
+    env.pop('PYGAME_HIDE_SUPPORT_PROMPT', None)
+    result = subprocess.run([sys.executable, 'batch.py', '--matches', '2', '--jobs', '1', '--seed', '1',
+                             '--max-ticks', str(FPS * 5)], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report['matches'] == 2
@@ -0,0 +1,32 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def _run_benchmark(*args):
+    env = dict(os.environ)
+    env.pop('PYGAME_HIDE_SUPPORT_PROMPT', None)
+    return subprocess.run([sys.executable, 'benchmark.py', '--ticks', '5', '--only', 'baseline', *args],
+                          cwd=ROOT, env=env, capture_output=True, text=True)
+
+
+def test_stdout_report_round_trips_through_baseline(tmp_path):
+    first = _run_benchmark()
+    assert first.returncode == 0, first.stderr
+    report = json.loads(first.stdout)  # 标准输出只有 JSON 报告
+    assert list(report['scenarios']) == ['baseline']
+
+    baseline = tmp_path / 'base.json'
+    baseline.write_text(first.stdout)
+    second = _run_benchmark('--baseline', str(baseline), '--threshold', '1000')
+    assert second.returncode == 0, second.stderr
+    json.loads(second.stdout)
+
+    # 基线快得多时判定为退化
+    for phase in ('update', 'draw'):
+        report['scenarios']['baseline'][phase]['p95_ms'] /= 1e6
+    baseline.write_text(json.dumps(report))
+    assert _run_benchmark('--baseline', str(baseline)).returncode == 1
@@ -0,0 +1,34 @@
+import game_scene
+import tanks
+from batch import HunterBot
+from headless import HeadlessRunner
+
+
+def _simulate(monkeypatch, batch_min, ticks=1000):
+    """stress 配置、96x96 随机地图，玩家无敌并由脚本操作；每 100 帧记录一次敌人和炮弹状态"""
+    monkeypatch.setattr(game_scene, 'ENTITY_BATCH_MIN', batch_min)
+    monkeypatch.setattr(tanks, 'ENTITY_BATCH_MIN', batch_min)
+    runner = HeadlessRunner(seed=4, map_size=(96, 96), spawn_profile='stress')
+    scene = runner.scene
+    scene.player.invincible = True
+    scene.player.invincible_timer = 10 ** 9
+    bot = HunterBot(4)
+    snapshots = []
+    most_alive = 0
+    for tick in range(ticks):
+        scene.game_over = False  # 炮弹打到司令部会结束游戏，这里忽略
+        runner.step(bot(tick, scene))
+        most_alive = max(most_alive, len(scene.enemies))
+        if tick % 100 == 99:
+            enemies = sorted((enemy.slot, enemy.x, enemy.y, enemy.direction, enemy.health)
+                             for enemy in scene.enemies)
+            snapshots.append((enemies, scene.bullets.count, scene.enemies_destroyed))
+    return snapshots, most_alive
+
+
+def test_batched_update_matches_per_enemy_update(monkeypatch):
+    batched, most_alive = _simulate(monkeypatch, 24)
+    assert most_alive >= 24  # 确实走了批量路径
+    assert batched[-1][2] > 0
+    per_enemy, _ = _simulate(monkeypatch, 10 ** 9)
+    assert batched == per_enemy
@@ -0,0 +1,82 @@
+import random
+
+import pygame
+import pytest
+
+from config import *
+from map import GameMap
+from mapgen import generate_level
+from pathfinding import FlowField
+
+
+def _bricks(game_map):
+    rows, cols = game_map.tiles.shape
+    return [(col, row) for row in range(rows) for col in range(cols) if game_map.tiles[row, col] == TILE_BRICK]
+
+
+@pytest.mark.parametrize('matrix', [None, generate_level(48, 48, seed=3)], ids=['level_1', 'generated_48x48'])
+def test_repair_matches_full_rebuild(matrix):
+    game_map = GameMap(1, matrix)
+    field = FlowField(game_map, game_map.headquarters.rect)
+    rng = random.Random(7)
+    bricks = _bricks(game_map)
+    for col, row in rng.sample(bricks, min(40, len(bricks))):
+        game_map.set_tile(col, row, TILE_EMPTY)
+        fresh = FlowField(game_map, game_map.headquarters.rect)
+        fresh.rebuild()
+        assert field.distance == fresh.distance, (col, row)
+        assert field.flow == fresh.flow, (col, row)
+    assert field.repairs > 0  # 确实走了增量修复，而不是每次都完整重建
+
+
+def _assert_matches_rebuild(game_map, field, target, note):
+    fresh = FlowField(game_map, target)
+    assert field.distance == fresh.distance, note
+    assert field.flow == fresh.flow, note
+
+
+@pytest.mark.parametrize('matrix', [None, generate_level(48, 48, seed=3)], ids=['level_1', 'generated_48x48'])
+def test_raised_costs_repair_matches_full_rebuild(matrix):
+    game_map = GameMap(1, matrix)
+    target = game_map.headquarters.rect
+    field = FlowField(game_map, target)
+    rng = random.Random(11)
+    rows, cols = game_map.tiles.shape
+    empty = [(col, row) for row in range(rows) for col in range(cols) if game_map.tiles[row, col] == TILE_EMPTY]
+    bricks = _bricks(game_map)
+    for step in range(60):
+        # 空地上新增红砖/铁墙（代价升高），穿插摧毁红砖（代价降低）
+        if step % 3 == 2 and bricks:
+            col, row = bricks.pop(rng.randrange(len(bricks)))
+            game_map.set_tile(col, row, TILE_EMPTY)
+        else:
+            col, row = empty.pop(rng.randrange(len(empty)))
+            game_map.set_tile(col, row, rng.choice((TILE_BRICK, TILE_IRON)))
+        _assert_matches_rebuild(game_map, field, target, (step, col, row))
+    assert field.rebuilds == 1  # 只有构造时完整重建过
+
+
+def test_retarget_spread_over_frames_matches_set_target():
+    game_map = GameMap(1, generate_level(48, 48, seed=3))
+    field = FlowField(game_map, game_map.headquarters.rect)
+    rng = random.Random(5)
+    rows, cols = game_map.tiles.shape
+    empty = [(col, row) for row in range(rows) for col in range(cols) if game_map.tiles[row, col] == TILE_EMPTY]
+    target = pygame.Rect(empty[len(empty) // 2][0] * TILE_SIZE, empty[len(empty) // 2][1] * TILE_SIZE,
+                         TANK_SIZE, TANK_SIZE)
+
+    old_distance = list(field.distance)
+    field.retarget(target)
+    frames = 0
+    while field.advance(100):
+        frames += 1
+        assert field.distance == old_distance  # 重建完成前仍使用旧流场
+        # 重建期间地形变化：新增障碍和摧毁红砖都要在换上新流场后补上
+        col, row = empty.pop(rng.randrange(len(empty)))
+        game_map.set_tile(col, row, TILE_BRICK)
+        bricks = _bricks(game_map)
+        game_map.set_tile(*rng.choice(bricks), TILE_EMPTY)
+        old_distance = list(field.distance)
+    assert frames > 1
+    assert field.target is target
+    _assert_matches_rebuild(game_map, field, target, frames)
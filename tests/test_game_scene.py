@@ -0,0 +1,26 @@
+from batch import HunterBot
+from config import *
+from headless import HeadlessRunner
+
+
+def _play(runner, seed, ticks):
+    """用脚本玩家推进 ticks 帧，返回每帧结束时的状态"""
+    bot = HunterBot(seed)
+    scene = runner.scene
+    states = []
+    for tick in range(ticks):
+        runner.step(bot(tick, scene))
+        states.append((scene.ticks, scene.enemies_destroyed, scene.spawned_enemies, scene.player.rect.topleft,
+                       scene.bullets.count, scene.game_over))
+    return states
+
+
+def test_reset_replays_seed_like_a_fresh_scene():
+    runner = HeadlessRunner(seed=3)
+    _play(runner, 3, FPS * 20)  # 打掉砖块、留下敌人和炮弹
+    runner.scene.reset(4)
+    after_reset = _play(runner, 4, FPS * 40)
+
+    fresh = _play(HeadlessRunner(seed=4), 4, FPS * 40)
+    assert after_reset == fresh
+    assert fresh[-1][1] > 0  # 这段时间内有敌人被摧毁
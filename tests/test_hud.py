@@ -0,0 +1,72 @@
+import pygame
+
+from config import *
+from headless import HeadlessRunner
+from hud import TextCache, HudLabel
+import profiler
+
+
+def _misses():
+    return TextCache.stats()['misses']
+
+
+def test_label_rasterises_only_new_values():
+    surface = pygame.Surface((200, 50))
+    label = HudLabel(pygame.font.Font(None, 30), "hud test: {}/{}", WHITE, (0, 0))
+    label.draw(surface, 1, 20)
+    misses = _misses()
+    for _ in range(10):
+        label.draw(surface, 1, 20)
+    assert _misses() == misses
+
+    label.draw(surface, 2, 20)
+    assert _misses() == misses + 1
+    label.draw(surface, 1, 20)  # 之前的文字还在缓存中
+    assert _misses() == misses + 1
+
+
+def test_scene_hud_rasterises_once_per_value():
+    runner = HeadlessRunner(seed=1, render=True)
+    scene = runner.scene
+    scene.player.invincible = True  # 保持生命和耐久不变
+    scene.player.invincible_timer = 10 ** 9
+    misses = _misses()
+    runner.step()
+    assert _misses() == misses + 4  # 四行 HUD 文字各一次
+
+    for _ in range(FPS * 5):
+        runner.step()
+    assert _misses() == misses + 4
+
+
+
+class CountingFont(pygame.font.Font):
+    """记录 render 调用次数的字体"""
+
+    renders = 0
+
+    def render(self, *args):
+        CountingFont.renders += 1
+        return super().render(*args)
+
+
+def test_profiler_overlay_reuses_text(monkeypatch):
+    clock = iter(range(10 ** 6))
+    monkeypatch.setattr(profiler.time, 'perf_counter', lambda: next(clock) / 1000.0)  # 每次读数前进 1 毫秒
+    frames = profiler.FrameProfiler(size=PROFILER_OVERLAY_WINDOW)
+    monkeypatch.setattr(CountingFont, 'renders', 0)
+    frames._font = CountingFont(None, 18)
+    frames._overlay = pygame.Surface(PROFILER_OVERLAY_SIZE, pygame.SRCALPHA)
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    for _ in range(PROFILER_OVERLAY_WINDOW):
+        frames.measure('update', lambda: None)
+        frames.end_frame()
+
+    frames.draw_overlay(screen)
+    renders = CountingFont.renders
+    assert renders == 2  # update 和 frame 两行
+    for _ in range(PROFILER_OVERLAY_WINDOW):
+        frames.measure('update', lambda: None)
+        frames.end_frame()
+        frames.draw_overlay(screen)
+    assert CountingFont.renders == renders
@@ -0,0 +1,108 @@
+import os
+
+import numpy as np
+import pytest
+
+import levels
+from config import *
+from game_scene import GameScene
+from headless import InputKeys
+from pathfinding import UNREACHABLE
+
+
+LEVEL_TEXT = """# 测试关卡
+IIIII
+I.B.I
+I.F.I
+IRH.I
+IIIII
+"""
+
+CHANGED_TEXT = LEVEL_TEXT.replace('I.B.I', 'I...I')
+
+
+@pytest.fixture
+def level_dir(tmp_path, monkeypatch):
+    """临时关卡目录，关卡 1 为 LEVEL_TEXT"""
+    monkeypatch.setattr(levels, 'LEVEL_DIR', str(tmp_path))
+    monkeypatch.setattr(levels, 'LEVEL_CACHE_DIR', str(tmp_path / 'cache'))
+    (tmp_path / 'level_1.txt').write_text(LEVEL_TEXT, encoding='utf-8')
+    return tmp_path
+
+
+def _expected(text):
+    cols, rows, data = levels.parse_level_text(text)
+    return np.frombuffer(data, dtype=np.uint8).reshape(rows, cols)
+
+
+def test_text_to_cache_round_trip(level_dir):
+    tiles = levels.load_level(1)
+    np.testing.assert_array_equal(tiles, _expected(LEVEL_TEXT))
+    assert tiles[1, 2] == TILE_BRICK and tiles[3, 2] == TILE_HEADQUARTERS
+
+    cache = levels.cache_path(1)
+    assert os.path.exists(cache)
+    compiled_at = os.stat(cache).st_mtime_ns
+    np.testing.assert_array_equal(levels.load_level(1), tiles)
+    assert os.stat(cache).st_mtime_ns == compiled_at  # 第二次直接映射缓存，不重新编译
+
+    assert levels.format_level_text(tiles, "测试关卡") == LEVEL_TEXT
+
+
+def test_cache_without_text_is_used(level_dir):
+    levels.load_level(1)
+    os.remove(levels.level_path(1))
+    np.testing.assert_array_equal(levels.load_level(1), _expected(LEVEL_TEXT))
+
+
+def test_stale_cache_is_recompiled(level_dir):
+    levels.load_level(1)
+    source = levels.level_path(1)
+    stat = os.stat(source)
+    # 大小不变，只有修改时间能发现文本已更新
+    with open(source, 'w', encoding='utf-8') as f:
+        f.write(CHANGED_TEXT)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    tiles = levels.load_level(1)
+    np.testing.assert_array_equal(tiles, _expected(CHANGED_TEXT))
+    assert tiles[1, 2] == TILE_EMPTY
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda data: data[:-3],  # 截断
+    lambda data: b'',  # 空文件
+    lambda data: b'XXXX' + data[4:],  # 魔数错误
+    lambda data: data[:levels.LEVEL_HEADER.size] + b'\xff' * (len(data) - levels.LEVEL_HEADER.size),  # 非法地形
+], ids=['truncated', 'empty', 'bad_magic', 'bad_tiles'])
+def test_corrupt_cache_falls_back_to_text(level_dir, corrupt):
+    levels.load_level(1)
+    cache = levels.cache_path(1)
+    with open(cache, 'rb') as f:
+        data = f.read()
+    with open(cache, 'wb') as f:
+        f.write(corrupt(data))
+
+    np.testing.assert_array_equal(levels.load_level(1), _expected(LEVEL_TEXT))
+    with open(cache, 'rb') as f:
+        assert f.read() == data  # 缓存已重新编译
+
+
+@pytest.mark.parametrize('level', levels.available_levels())
+def test_shipped_level_is_playable(screen, level):
+    """玩家出生点不被地形挡住、能离开出生点，每个敌人出生点都能到达司令部"""
+    scene = GameScene(screen, level)
+    player = scene.player
+    start = player.rect.topleft
+    assert not scene.map.rect_blocks_tank(player.rect)
+    moved = []
+    for mask in (INPUT_UP, INPUT_DOWN, INPUT_LEFT, INPUT_RIGHT):
+        player.x, player.y = start
+        player.sync_rect()
+        scene._update_player(InputKeys(mask))
+        moved.append(player.rect.topleft != start)
+    assert any(moved)
+
+    for x, y in scene.spawn_positions:
+        col, row = x // TILE_SIZE, y // TILE_SIZE
+        assert scene.headquarters_field.distance_at(col, row) < UNREACHABLE, (x, y)
@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+
+from config import *
+from mapgen import generate_level, reachable_cells, approach_cell, player_cell, spawn_cells, headquarters_cell
+
+
+@pytest.mark.parametrize('cols, rows', [(MAPGEN_MIN_SIZE, MAPGEN_MIN_SIZE), (27, 20), (48, 40), (64, 128), (200, 60)])
+@pytest.mark.parametrize('seed', [0, 1, 7, 12345])
+def test_spawns_and_player_reach_headquarters(cols, rows, seed):
+    tiles = generate_level(cols, rows, seed)
+    assert tiles.shape == (rows, cols)
+    hq_col, hq_row = headquarters_cell(cols, rows)
+    assert tiles[hq_row, hq_col] == TILE_HEADQUARTERS
+
+    reached = reachable_cells(tiles, approach_cell(cols, rows))
+    for col, row in spawn_cells(cols, rows) + [player_cell(cols, rows)]:
+        assert reached[row, col], (col, row)
+
+
+def test_same_seed_same_map():
+    np.testing.assert_array_equal(generate_level(48, 40, 5), generate_level(48, 40, 5))
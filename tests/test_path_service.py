@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from config import *
+from map import GameMap
+from game_scene import GameScene
+from pathfinding import PathService
+from tanks import EnemyTank
+
+
+@pytest.fixture
+def game_map():
+    """四周铁墙、中间空地的地图；右下角 (20, 14) 处有一个被铁墙围住的格点"""
+    matrix = np.zeros((20, 27), dtype=np.uint8)
+    matrix[0, :] = matrix[-1, :] = matrix[:, 0] = matrix[:, -1] = TILE_IRON
+    matrix[13:17, 19:23] = TILE_IRON
+    matrix[14:16, 20:22] = TILE_EMPTY
+    return GameMap(1, matrix)
+
+
+def test_changed_tile_evicts_only_paths_crossing_it(game_map):
+    paths = PathService(game_map)
+    crossing = paths.find_path((2, 2), (12, 2))
+    other = paths.find_path((2, 9), (12, 9))
+    assert crossing.cells and other.cells
+
+    game_map.set_tile(7, 3, TILE_BRICK)  # 坦克沿第 2 行前进时占用第 2、3 行
+
+    assert not crossing.valid
+    assert crossing.key not in paths.cache
+    assert all(crossing.key not in keys for keys in paths.cell_paths.values())
+    assert paths.invalidated == 1
+
+    assert other.valid
+    assert paths.find_path((2, 9), (12, 9)) is other
+    assert paths.hits == 1
+
+
+def test_unreachable_result_is_dropped_on_any_change(game_map):
+    paths = PathService(game_map)
+    unreachable = paths.find_path((2, 2), (20, 14))
+    assert unreachable.cells == []
+    assert unreachable.key in paths.unreachable
+
+    game_map.set_tile(3, 16, TILE_BRICK)  # 离两点都很远的格子
+
+    assert not unreachable.valid
+    assert unreachable.key not in paths.cache
+    assert not paths.unreachable
+
+
+def test_lru_eviction_cleans_cell_index(game_map):
+    paths = PathService(game_map, capacity=2)
+    first = paths.find_path((2, 2), (12, 2))
+    second = paths.find_path((2, 9), (12, 9))
+    paths.find_path((2, 2), (12, 2))  # 命中后 first 变为最近使用
+    third = paths.find_path((2, 5), (12, 5))
+
+    assert list(paths.cache) == [first.key, third.key]
+    assert not second.valid and first.valid and third.valid
+    assert all(second.key not in keys for keys in paths.cell_paths.values())
+    assert all(keys for keys in paths.cell_paths.values())  # 没有留下空集合
+
+
+def test_queries_over_budget_are_deferred(game_map):
+    paths = PathService(game_map, budget=2)
+    paths.begin_frame()
+    assert paths.find_path((2, 2), (12, 2)) is not None
+    assert paths.find_path((2, 9), (12, 9)) is not None
+    assert paths.find_path((2, 5), (12, 5)) is None
+    assert paths.deferred == 1
+    assert paths.find_path((2, 2), (12, 2)) is not None  # 缓存命中不消耗预算
+    assert paths.deferred == 1
+
+    paths.begin_frame()
+    assert paths.find_path((2, 5), (12, 5)) is not None
+    assert paths.stats()['misses'] == 3
+
+
+def test_enemy_follows_path_to_goal(screen):
+    scene = GameScene(screen, seed=1)
+    rows, cols = scene.map.tiles.shape
+    for col in range(1, cols - 1):
+        for row in (2, 3):
+            scene.map.set_tile(col, row, TILE_EMPTY)
+    enemy = EnemyTank(2 * TILE_SIZE, 2 * TILE_SIZE, ENEMY_NORMAL, scene.rng, scene.world)
+    scene.add_enemy(enemy)
+    enemy.path_goal = (20, 2)
+
+    positions = []
+    for _ in range(FPS * 10):
+        positions.append((enemy.x, enemy.y))
+        scene._update_enemies()
+        if enemy.path_goal is None:
+            break
+    assert enemy.path_goal is None  # 到达目标后交还给流场
+    assert positions[-1] == (20 * TILE_SIZE, 2 * TILE_SIZE)
+    assert {y for _, y in positions} == {2 * TILE_SIZE}
+    assert scene.paths.misses == 1
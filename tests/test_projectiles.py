@@ -0,0 +1,146 @@
+import numpy as np
+import pygame
+import pytest
+
+from config import *
+from map import GameMap
+from projectiles import BulletEngine
+from game_scene import GameScene
+from tanks import EnemyTank
+
+
+class Owner:
+    """只提供发射者需要的属性"""
+
+    def __init__(self, team=TEAM_ENEMY):
+        self.team = team
+        self.bullets = []
+
+
+def _open_map(bricks=()):
+    """四周铁墙、中间空地的地图，bricks 为红砖格子 (列, 行)"""
+    matrix = np.zeros((20, 27), dtype=np.uint8)
+    matrix[0, :] = matrix[-1, :] = matrix[:, 0] = matrix[:, -1] = TILE_IRON
+    for col, row in bricks:
+        matrix[row, col] = TILE_BRICK
+    return GameMap(1, matrix)
+
+
+def _fire(engine, x, y, direction, speed):
+    bullet = engine.spawn(Owner(), x, y, direction, TANK_LEVEL_1)
+    engine.speed[bullet.slot] = speed
+    return bullet
+
+
+def _tile_rect(col, row):
+    return pygame.Rect(col * TILE_SIZE, row * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+
+
+def test_fast_bullet_does_not_tunnel_through_one_tile_wall():
+    engine = BulletEngine(_open_map([(8, row) for row in range(1, 19)]))
+    bullet = _fire(engine, 200, 95, RIGHT, 100)
+    live = engine.step()
+    # 只看移动后的位置会整个越过 x=240 的一格墙
+    assert not bullet.rect.colliderect(_tile_rect(8, 3))
+    assert bullet.rect.left > _tile_rect(8, 3).right
+
+    slots, distances, cols, rows = engine.sweep_terrain(live)
+    assert slots.tolist() == [bullet.slot]
+    assert (cols.tolist(), rows.tolist()) == ([8], [3])
+    assert distances.tolist() == [240 - (200 + BULLET_SIZE) + 1]
+
+
+@pytest.mark.parametrize('y, hit', [(140, False), (141, True)])
+def test_lateral_edge_on_cell_corner(y, hit):
+    """炮弹下边缘正好与砖块上边缘相接时不算碰到，多覆盖一个像素就算（与 Rect.colliderect 一致）"""
+    engine = BulletEngine(_open_map([(5, 5)]))
+    bullet = _fire(engine, 100, y, RIGHT, 50)
+    slots, distances, cols, rows = engine.sweep_terrain(engine.step())
+    assert bool(slots.size) == hit
+    if hit:
+        assert (cols.tolist(), rows.tolist(), distances.tolist()) == ([5], [5], [41])
+        assert pygame.Rect(100 + 41, y, BULLET_SIZE, BULLET_SIZE).colliderect(_tile_rect(5, 5))
+        assert not pygame.Rect(100 + 40, y, BULLET_SIZE, BULLET_SIZE).colliderect(_tile_rect(5, 5))
+
+
+@pytest.mark.parametrize('speed, hit', [(40, False), (41, True)])
+def test_front_edge_on_cell_corner(speed, hit):
+    """炮弹恰好停在砖块角上（前缘相接）不算碰到，再前进一个像素就碰到"""
+    engine = BulletEngine(_open_map([(5, 5)]))
+    _fire(engine, 100, 141, RIGHT, speed)
+    slots, distances, _, _ = engine.sweep_terrain(engine.step())
+    assert bool(slots.size) == hit
+    if hit:
+        assert distances.tolist() == [41]
+
+
+def test_sweep_rect_reports_contact_distance():
+    engine = BulletEngine(_open_map())
+    bullet = _fire(engine, 100, 100, DOWN, 200)
+    target = pygame.Rect(95, 250, 40, 40)
+    slots, distances = engine.sweep_rect(engine.step(), target)
+    assert slots.tolist() == [bullet.slot]
+    assert distances.tolist() == [250 - (100 + BULLET_SIZE) + 1]
+    assert engine.contact_distance(bullet.slot, target) == distances[0]
+
+
+@pytest.fixture
+def scene(screen):
+    """关卡 1 的场景，清空第 2~5 行作为射击通道"""
+    scene = GameScene(screen, seed=1)
+    rows, cols = scene.map.tiles.shape
+    for row in range(2, 6):
+        for col in range(1, cols - 1):
+            scene.map.set_tile(col, row, TILE_EMPTY)
+    return scene
+
+
+def _place(tank, x, y):
+    tank.x, tank.y = x, y
+    tank.sync_rect()
+
+
+def _add_enemy(scene, x, y):
+    enemy = EnemyTank(x, y, ENEMY_ARMOR, scene.rng, scene.world)
+    scene.add_enemy(enemy)
+    return enemy
+
+
+@pytest.mark.parametrize('player_x, brick_hit', [(300, True), (150, False)])
+def test_enemy_bullet_hits_nearer_of_brick_and_player(scene, player_x, brick_hit):
+    scene.map.set_tile(8, 3, TILE_BRICK)  # x 240~269
+    _place(scene.player, player_x, 80)
+    shooter = _add_enemy(scene, 40, 80)
+    bullet = scene.bullets.spawn(shooter, 100, 100, RIGHT, TANK_LEVEL_1)
+    bullet.speed = 250  # 一帧内同时扫过砖块和玩家
+
+    scene._update_bullets()
+
+    assert scene.bullets.count == 0
+    assert (scene.map.get_tile_at(8, 3) == TILE_EMPTY) == brick_hit
+    assert scene.player.lives == (3 if brick_hit else 2)
+
+
+@pytest.mark.parametrize('enemy_x, brick_hit', [(300, True), (150, False)])
+def test_player_bullet_hits_nearer_of_brick_and_enemy(scene, enemy_x, brick_hit):
+    scene.map.set_tile(8, 3, TILE_BRICK)
+    enemy = _add_enemy(scene, enemy_x, 80)
+    bullet = scene.bullets.spawn(scene.player, 100, 100, RIGHT, TANK_LEVEL_1)
+    bullet.speed = 250
+
+    scene._update_bullets()
+
+    assert scene.bullets.count == 0
+    assert (scene.map.get_tile_at(8, 3) == TILE_EMPTY) == brick_hit
+    assert enemy.health == (3 if brick_hit else 2)
+
+
+def test_fast_bullet_does_not_tunnel_through_enemy(scene):
+    enemy = _add_enemy(scene, 300, 80)
+    bullet = scene.bullets.spawn(scene.player, 100, 100, RIGHT, TANK_LEVEL_1)
+    bullet.speed = 400  # 移动后已在坦克右侧
+
+    scene._update_bullets()
+
+    assert enemy.health == 2
+    assert scene.bullets.count == 0
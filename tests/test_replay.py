@@ -0,0 +1,44 @@
+import pytest
+
+from batch import HunterBot
+from config import *
+from headless import HeadlessRunner
+from replay import Replay, play_replay
+
+
+def _record(runner, seed, max_ticks):
+    """用脚本玩家录制一局，返回运行统计和经过序列化的回放"""
+    stats = runner.run(max_ticks, HunterBot(seed))
+    replay = Replay.from_bytes(runner.scene.recorder.to_replay().to_bytes())
+    return stats, replay
+
+
+def _assert_same_match(stats, replayed):
+    for key in ('ticks', 'game_over', 'victory', 'enemies_destroyed'):
+        assert replayed[key] == stats[key], key
+
+
+@pytest.mark.parametrize('seed, map_size, spawn_profile, max_ticks', [
+    (7, None, DEFAULT_SPAWN_PROFILE, FPS * 50),
+    (3, (48, 40), 'stress', FPS * 50),
+], ids=['level1', 'generated'])
+def test_replay_round_trip(seed, map_size, spawn_profile, max_ticks):
+    runner = HeadlessRunner(seed=seed, record=True, map_size=map_size, spawn_profile=spawn_profile)
+    stats, replay = _record(runner, seed, max_ticks)
+    assert stats['enemies_destroyed'] > 0  # 录制的一局要有实际交战
+    assert (replay.seed, replay.level, replay.ticks) == (seed, 1, stats['ticks'])
+    assert (replay.map_size, replay.spawn_profile) == (map_size, spawn_profile)
+
+    _assert_same_match(stats, play_replay(replay))
+
+
+def test_replay_after_reset_keeps_generated_map():
+    # 原地重开后本局种子和地图种子不同，重放要先按地图种子生成同一张地图
+    runner = HeadlessRunner(seed=3, record=True, map_size=(48, 40), spawn_profile='stress')
+    runner.run(FPS, HunterBot(3))
+    runner.scene.reset(11)
+    stats, replay = _record(runner, 11, FPS * 50)
+    assert (replay.seed, replay.map_seed) == (11, 3)
+    assert stats['enemies_destroyed'] > 0
+
+    _assert_same_match(stats, play_replay(replay))
@@ -0,0 +1,13 @@
+from config import *
+from resources import ResourceLoader, AssetPreloader
+
+
+def test_preloaded_image_is_released_once_converted():
+    name = PRELOAD_IMAGES[0]
+    ResourceLoader.clear_image_cache(name)
+    AssetPreloader(images=[name], sounds=[]).start().wait()
+    assert name in ResourceLoader._decoded
+
+    image, _ = ResourceLoader.load_image(name)
+    assert name not in ResourceLoader._decoded  # 只保留转换后的缓存
+    assert ResourceLoader.load_image(name)[0] is image
@@ -0,0 +1,52 @@
+import pytest
+
+from config import *
+from game_scene import GameScene
+from pathfinding import FlowField, FOOTPRINT, UNREACHABLE
+
+
+def test_total_enemies_is_a_hard_cap(screen):
+    # 同时在场上限大于总数：按已消灭数量判断时会一直生成到 max_alive
+    profile = {'total_enemies': 4, 'max_alive': 10, 'spawn_interval': 50, 'spawn_points': None}
+    scene = GameScene(screen, seed=2, spawn_profile=profile)
+    scene.player.invincible = True
+    scene.player.invincible_timer = 10 ** 9
+    for _ in range(FPS * 10):
+        scene.game_over = False  # 炮弹打到司令部会结束游戏，这里忽略
+        scene.update()
+    assert scene.spawned_enemies == len(scene.enemies) == 4
+
+    # 消灭一部分后也不会补充新的敌人
+    for enemy in scene.enemies.sprites()[:2]:
+        scene._destroy_enemy(enemy)
+    for _ in range(FPS * 5):
+        scene.game_over = False
+        scene.update()
+    assert scene.spawned_enemies == 4
+    assert len(scene.enemies) == 2
+
+
+@pytest.mark.parametrize('map_size', [None, (64, 64)], ids=['level_1', 'generated_64x64'])
+def test_random_spawn_positions(screen, map_size):
+    scene = GameScene(screen, seed=3, map_size=map_size, spawn_profile='stress')
+    positions = scene.spawn_positions
+    assert positions and len(set(positions)) == len(positions) <= SPAWN_PROFILES['stress']['spawn_points']
+
+    field = FlowField(scene.map, scene.headquarters.rect)
+    free = scene.map.free_cells(FOOTPRINT)
+    player_col, player_row = (value // TILE_SIZE for value in scene.player_start)
+    hq_col, hq_row = scene.headquarters.rect.x // TILE_SIZE, scene.headquarters.rect.y // TILE_SIZE
+    for x, y in positions:
+        col, row = x // TILE_SIZE, y // TILE_SIZE
+        assert (col * TILE_SIZE, row * TILE_SIZE) == (x, y)
+        assert free[row, col]
+        assert field.distance_at(col, row) < UNREACHABLE  # 能到达司令部
+        for other_col, other_row in ((player_col, player_row), (hq_col, hq_row)):
+            assert abs(col - other_col) >= SPAWN_CLEARANCE or abs(row - other_row) >= SPAWN_CLEARANCE
+
+    # 出生点由创建场景时的种子决定，原地重开后不变，同一种子重新创建也相同
+    for _ in range(FPS * 5):
+        scene.update()
+    scene.reset(99)
+    assert scene.spawn_positions == positions
+    assert GameScene(screen, seed=3, map_size=map_size, spawn_profile='stress').spawn_positions == positions